@@ -0,0 +1,178 @@
+"""Storage and query scaling benchmarks.
+
+Builds synthetic stores of several sizes and measures EventStorage load,
+save, mutation latency, date queries and peak load memory. Results are
+written as JSON; pass a previous result file to --compare to fail on
+regressions.
+
+    python benchmarks/bench_storage.py --sizes 10000 100000 --output results.json
+    python benchmarks/bench_storage.py --compare results.json
+"""
+
+import argparse
+import calendar
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from cal import __version__
+from cal.models import Event
+from cal.storage import EventStorage
+
+from synthetic import write_store
+
+# Every metric is "lower is better"
+METRICS = {
+    "load_s": "load events.json",
+    "save_s": "save events.json",
+    "add_ms": "add one event",
+    "update_ms": "update one event",
+    "delete_ms": "delete one event",
+    "get_by_date_us": "get_by_date",
+    "get_upcoming_us": "get_upcoming (30 days)",
+    "has_events_month_us": "has_events for a month grid",
+    "search_ms": "search titles and descriptions",
+    "peak_memory_mb": "peak memory while loading",
+}
+
+
+def _best_time(fn: Callable[[], object], repeat: int) -> float:
+    """Best wall time of fn in seconds (least affected by system noise)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _per_call(fn: Callable[[object], object], args: list, repeat: int = 3) -> float:
+    """Best time per call of fn over all args, in seconds."""
+    return _best_time(lambda: [fn(a) for a in args], repeat) / len(args)
+
+
+def run_size(size: int, workdir: Path, repeat: int) -> dict[str, float]:
+    """Run all benchmarks against a store with `size` events."""
+    path = write_store(workdir / f"events-{size}.json", size)
+    # Rewrite it as cal saves it, with long descriptions out of line
+    EventStorage(path).compact()
+    rng = random.Random(size)
+
+    tracemalloc.start()
+    EventStorage(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    load_s = _best_time(lambda: EventStorage(path), repeat)
+    storage = EventStorage(path)
+    save_s = _best_time(storage._save, repeat)
+
+    added = [
+        Event(title=f"Bench {i}", date=date.today() + timedelta(days=i))
+        for i in range(repeat)
+    ]
+    add_s = _per_call(storage.add, added, repeat=1)
+    for event in added:
+        event.date += timedelta(days=1)
+    update_s = _per_call(storage.update, added, repeat=1)
+    delete_s = _per_call(storage.delete, [e.id for e in added], repeat=1)
+
+    today = date.today()
+    query_dates = [today - timedelta(days=rng.randint(-365, 3650)) for _ in range(1000)]
+    months = [(d.year, d.month) for d in query_dates[:100]]
+
+    def month_grid(year_month: tuple[int, int]) -> None:
+        year, month = year_month
+        for week in calendar.Calendar().monthdatescalendar(year, month):
+            for day in week:
+                storage.has_events(day)
+
+    return {
+        "load_s": load_s,
+        "save_s": save_s,
+        "add_ms": add_s * 1e3,
+        "update_ms": update_s * 1e3,
+        "delete_ms": delete_s * 1e3,
+        "get_by_date_us": _per_call(storage.get_by_date, query_dates) * 1e6,
+        "get_upcoming_us": _per_call(
+            lambda d: storage.get_upcoming(d, 30), query_dates[:200]
+        ) * 1e6,
+        "has_events_month_us": _per_call(month_grid, months) * 1e6,
+        "search_ms": _best_time(lambda: storage.search("postmortem"), repeat) * 1e3,
+        "peak_memory_mb": peak / 2**20,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print a comparison table and return the list of regressions."""
+    regressions = []
+    print(f"\n{'size':>9}  {'metric':<22} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for size, metrics in results["results"].items():
+        base_metrics = baseline.get("results", {}).get(size)
+        if not base_metrics:
+            continue
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            if not base:
+                continue
+            ratio = value / base
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{size} events: {METRICS[name]} {ratio:.2f}x slower")
+            print(f"{size:>9}  {name:<22} {base:>12.3f} {value:>12.3f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000],
+        help="store sizes to benchmark (e.g. 10000 100000 1000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="allowed slowdown vs baseline before failing (0.25 = 25%%)",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "cal_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            metrics = run_size(size, Path(tmp), args.repeat)
+            results["results"][str(size)] = metrics
+            print(f"{size} events")
+            for name, value in metrics.items():
+                print(f"  {METRICS[name]:<30} {value:10.3f} {name.rsplit('_', 1)[1]}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"FAIL: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Headless UI benchmarks driven by Textual's pilot.
+
+Runs CalendarApp with ``run_test`` against synthetic stores and records the
+latency of common interactions and the number of widgets in the DOM after
+each. With --compare it checks them against a baseline recorded earlier
+with --output, and fails when an action is slower or leaves more widgets
+than the baseline allows. Timings depend on the machine, so record the
+baseline on the one you compare on; none is shipped.
+
+    python benchmarks/bench_ui.py --sizes 0 10000 --output ui_baseline.json
+    python benchmarks/bench_ui.py --compare ui_baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from cal import __version__
+from cal.app import CalendarApp
+from cal.config import Config
+from cal.storage import EventStorage
+
+from synthetic import generate_events, write_events, write_store
+
+# Slack on top of --tolerance for timer and scheduling noise on short actions
+NOISE_MS = 50
+
+
+def _widgets(app: CalendarApp) -> int:
+    """Widgets in the DOM of every screen on the stack."""
+    return sum(len(screen.query("*")) for screen in app.screen_stack)
+
+
+async def _measure(app: CalendarApp, pilot, action) -> dict[str, float]:
+    """Run an action, wait for the app to settle, and record the cost."""
+    start = time.perf_counter()
+    await action()
+    await pilot.pause()
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    return {"ms": elapsed_ms, "widgets": _widgets(app)}
+
+
+async def run_size(size: int, workdir: Path) -> dict[str, dict]:
+    """Run the navigation and editing scenarios against a store of `size` events."""
+    path = write_store(workdir / f"events-{size}.json", size, seed=1)
+    config = Config(workdir / "config.json")
+
+    results: dict[str, dict] = {}
+    start = time.perf_counter()
+    app = CalendarApp(storage=EventStorage(path), config=config)
+    async with app.run_test(size=(120, 50)) as pilot:
+        await pilot.pause()
+        results["mount"] = {
+            "ms": (time.perf_counter() - start) * 1e3,
+            "widgets": _widgets(app),
+        }
+
+        for key, name in (
+            ("2", "view_day"), ("3", "view_agenda"), ("4", "view_week"), ("1", "view_month")
+        ):
+            results[name] = await _measure(app, pilot, lambda: pilot.press(key))
+
+        async def page_months() -> None:
+            for _ in range(24):
+                await pilot.press("n")
+
+        results["page_24_months"] = await _measure(app, pilot, page_months)
+        await pilot.press("t")
+
+        async def page_weeks(key: str) -> None:
+            for _ in range(24):
+                await pilot.press(key)
+
+        await pilot.press("4")
+        results["page_24_weeks"] = await _measure(app, pilot, lambda: page_weeks("n"))
+        # Back over the same weeks: layouts come from the cache
+        results["page_24_weeks_back"] = await _measure(app, pilot, lambda: page_weeks("p"))
+        await pilot.press("1")
+
+        async def add_event() -> None:
+            await pilot.press("a")
+            await pilot.pause()
+            await pilot.press(*("space" if c == " " else c for c in "Benchmark event"))
+            # The form scrolls: the button may be below the fold
+            app.screen.query_one("#save-btn").scroll_visible(animate=False)
+            await pilot.pause()
+            await pilot.click("#save-btn")
+
+        results["add_event"] = await _measure(app, pilot, add_event)
+    return results
+
+
+async def run_dense_agenda(count: int, workdir: Path) -> dict[str, float]:
+    """Open the agenda with `count` events in its 30-day window."""
+    today = date.today()
+    events = generate_events(count, seed=2, start=today, end=today + timedelta(days=29))
+    path = write_events(workdir / f"agenda-{count}.json", events)
+    app = CalendarApp(storage=EventStorage(path), config=Config(workdir / "config.json"))
+    async with app.run_test(size=(120, 50)) as pilot:
+        await pilot.pause()
+        return await _measure(app, pilot, lambda: pilot.press("3"))
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print a comparison table and return the list of regressions."""
+    regressions = []
+    print(f"\n{'size':>12}  {'action':<20} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, actions in results["results"].items():
+        base_actions = baseline.get("results", {}).get(size)
+        if not base_actions:
+            continue
+        for name, measured in actions.items():
+            base = base_actions.get(name)
+            if not base:
+                continue
+            flag = ""
+            if measured["ms"] > max(base["ms"] * (1 + tolerance), base["ms"] + NOISE_MS):
+                flag = "  REGRESSION"
+                regressions.append(
+                    f"{size}: {name} took {measured['ms']:.0f} ms (baseline {base['ms']:.0f} ms)"
+                )
+            if measured["widgets"] > base["widgets"] * (1 + tolerance):
+                flag = "  REGRESSION"
+                regressions.append(
+                    f"{size}: {name} left {measured['widgets']} widgets (baseline {base['widgets']})"
+                )
+            print(
+                f"{size:>12}  {name:<20} {base['ms']:>8.0f}ms {measured['ms']:>8.0f}ms "
+                f"{measured['ms'] / base['ms']:>6.2f}x{flag}"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 10_000])
+    parser.add_argument(
+        "--agenda-events", type=int, default=5_000,
+        help="events in the agenda's 30-day window for the dense agenda run (0 to skip)",
+    )
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument(
+        "--compare", type=Path,
+        help="baseline results JSON recorded on this machine with --output",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3,
+        help="allowed slowdown or widget growth vs baseline before failing (0.3 = 30%%)",
+    )
+    args = parser.parse_args()
+    if args.compare is not None and not args.compare.exists():
+        parser.error(f"no baseline at {args.compare}; record one with --output first")
+    # Read before --output can overwrite it
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    results = {
+        "meta": {
+            "cal_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results["results"][str(size)] = asyncio.run(run_size(size, Path(tmp)))
+        if args.agenda_events:
+            results["results"]["dense_agenda"] = {
+                "open_agenda": asyncio.run(run_dense_agenda(args.agenda_events, Path(tmp)))
+            }
+
+    for size, actions in results["results"].items():
+        print(f"{size} events" if size.isdigit() else f"{args.agenda_events} events in agenda")
+        for name, measured in actions.items():
+            print(f"  {name:<16} {measured['ms']:9.1f} ms  {measured['widgets']:6d} widgets")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"FAIL: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Startup import-time budget check.
+
+Imports the TUI module in a fresh interpreter with ``-X importtime`` and fails
+if it takes longer than the budget, or if modules that are meant to load
+lazily (holidays, urllib.request, secondary views, screens and the event form) are pulled
+in at startup.
+
+    python benchmarks/import_time.py [--budget-ms 350] [--runs 5]
+"""
+
+import argparse
+import subprocess
+import sys
+
+ENTRY_MODULE = "cal.app"
+
+LAZY_MODULES = [
+    "holidays",
+    "urllib.request",
+    "cal.historical_events",
+    "cal.views.day",
+    "cal.views.agenda",
+    "cal.widgets.event_form",
+    "cal.widgets.perf_overlay",
+    "cal.widgets.free_slots",
+    "cal.widgets.calendar_picker",
+    "cal.widgets.tag_filter",
+    "cal.views.week",
+    "cal.widgets.settings",
+    "cal.regions",
+]
+
+
+def measure() -> tuple[float, set[str]]:
+    """Import the entry module once; return its cumulative time (ms) and all modules."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {ENTRY_MODULE}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_ms = 0.0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.add(name)
+        if name == ENTRY_MODULE:
+            total_ms = int(cumulative) / 1000
+    return total_ms, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=350.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    modules: set[str] = set()
+    for _ in range(args.runs):
+        total_ms, modules = measure()
+        timings.append(total_ms)
+    best = min(timings)
+
+    failures = [f"{name} imported at startup" for name in LAZY_MODULES if name in modules]
+    if best > args.budget_ms:
+        failures.append(f"import took {best:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    print(f"{ENTRY_MODULE}: best of {args.runs} = {best:.1f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""Long-session soak test: hours of simulated use of the headless app.
+
+Runs CalendarApp with ``run_test`` against a synthetic store, with events
+that ended over a year ago in the archive, and replays a seeded mix of
+navigation, view switches, screens opened and closed, edits made in the
+app and edits made by another process. Each action stands for a minute of
+use (see --actions-per-hour), and the polling the app's timers would do in
+that time runs in between, so hours pass in minutes.
+
+After a warm-up (see --warmup) and after every simulated hour, the app is
+brought back to the month view on today, and the DOM node count, RSS,
+traced Python memory and the size of each cache are sampled. The run fails
+if any of them is still growing in the second half of the session, or a
+bounded cache holds more than its limit, and prints the allocation sites
+that grew the most since the first hour.
+
+    python benchmarks/soak.py --hours 8 --size 10000
+    python benchmarks/soak.py --hours 168 --actions-per-hour 20 --output soak.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+from textual.widget import Widget
+
+from cal import __version__, historical_events, holidays_provider
+from cal.app import CalendarApp
+from cal.config import Config
+from cal.models import Event
+from cal.storage import EventStorage
+from cal.views import week
+
+from synthetic import write_store
+
+# Growth allowed between the peak of the first half and the last sample,
+# as (absolute, fraction of the peak). Views show a varying number of
+# events, hence the slack. RSS follows the highest peak of use so far,
+# since freed memory isn't returned to the OS: traced memory is the
+# stricter measure.
+TOLERANCES = {
+    "dom_nodes": (50, 0.05),
+    "widgets_alive": (50, 0.05),
+    "rss_mb": (20.0, 0.15),
+    "traced_mb": (2.0, 0.05),
+}
+# Actions run before the first sample. Textual's render caches take a few
+# hundred to fill, however many of them make up a simulated hour.
+WARMUP_ACTIONS = 360
+# Events that ended this long ago are archived before the run
+ARCHIVE_AFTER_DAYS = 365
+# Soak events kept alive at once, so the store doesn't grow with the run
+LIVE_SOAK_EVENTS = 5
+
+# Unbounded caches must level off, give or take the dates of soak events
+CACHE_TOLERANCE = (LIVE_SOAK_EVENTS, 0.0)
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def cache_sizes(app: CalendarApp) -> dict[str, int]:
+    """Entries held by each cache of the app and its storage."""
+    storage = app.storage
+    sizes = {
+        "cache.holidays": len(app.holiday_provider._holidays_cache),
+        "cache.zones": len(storage._zones._cache),
+        "cache.descriptions": len(storage.descriptions._cache),
+        "storage.date_versions": len(storage._date_versions),
+        "storage.history": len(storage.history._undo) + len(storage.history._redo),
+    }
+    historical = app.query("#historical-event")
+    provider = historical.first().provider if historical else None
+    sizes["cache.historical"] = len(provider._cache) if provider else 0
+    week_grid = app.query("#week-grid")
+    sizes["cache.weeks"] = len(week_grid.first()._cache) if week_grid else 0
+    return sizes
+
+
+def cache_limits(app: CalendarApp) -> dict[str, int]:
+    """Most entries each bounded cache may hold."""
+    storage = app.storage
+    return {
+        "cache.holidays": holidays_provider.CACHE_SIZE,
+        "cache.zones": storage._zones._cache.maxsize,
+        "cache.descriptions": storage.descriptions._cache.maxsize,
+        "storage.history": storage.history._undo.maxlen + storage.history._redo.maxlen,
+        "cache.historical": historical_events.CACHE_SIZE,
+        "cache.weeks": week.CACHE_SIZE,
+    }
+
+
+class Session:
+    """One simulated session: the app, another process's storage and the action mix."""
+
+    def __init__(self, app: CalendarApp, pilot, other: EventStorage, rng: random.Random) -> None:
+        self.app = app
+        self.pilot = pilot
+        self.other = other
+        self.rng = rng
+        # Calls and seconds spent per action
+        self.counts: dict[str, list] = {}
+        self.actions: list[tuple[int, Callable]] = [
+            (30, self.move),
+            (15, self.page),
+            (5, self.today),
+            (15, self.switch_view),
+            (3, self.browse_year),
+            (5, self.open_day),
+            (3, self.toggle_timeline),
+            (12, self.external_edit),
+            (3, self.add_in_app),
+            (3, self.undo),
+            (6, self.open_screen),
+        ]
+
+    async def press(self, *keys: str) -> None:
+        await self.pilot.press(*keys)
+        await self.pilot.pause()
+
+    async def move(self) -> None:
+        await self.press(self.rng.choice(["left", "right", "up", "down"]))
+
+    async def page(self) -> None:
+        await self.press(self.rng.choice("np"))
+
+    async def today(self) -> None:
+        await self.press("t")
+
+    async def switch_view(self) -> None:
+        await self.press(self.rng.choice("1234"))
+
+    async def browse_year(self) -> None:
+        """Page a year ahead or back, e.g. to plan a trip or look one up.
+
+        Going back reaches archived events.
+        """
+        await self.press("1")
+        await self.press(*[self.rng.choice("np")] * 12)
+
+    async def open_day(self) -> None:
+        await self.press("1", "enter")
+        await self.press("escape")
+
+    async def toggle_timeline(self) -> None:
+        await self.press("2", "v")
+
+    async def undo(self) -> None:
+        await self.press("u")
+
+    async def add_in_app(self) -> None:
+        await self.press("1", "a")
+        await self.pilot.press(*("space" if c == " " else c for c in "Soak event"))
+        # The form scrolls: the button may be below the fold
+        self.app.screen.query_one("#save-btn").scroll_visible(animate=False)
+        await self.pilot.pause()
+        await self.pilot.click("#save-btn")
+        await self.pilot.pause()
+
+    async def open_screen(self) -> None:
+        """Open a modal screen and close it again."""
+        await self.press("1", self.rng.choice(["comma", "f", "s", "f12"]))
+        while len(self.app.screen_stack) > 1:
+            await self.press("escape")
+
+    async def external_edit(self) -> None:
+        """Another cal instance adds, edits or deletes an event."""
+        other = self.other
+        other.check_for_changes()
+        soak = [e for e in other.get_all() if e.title.startswith("Soak")]
+        if len(soak) > LIVE_SOAK_EVENTS:
+            other.delete(self.rng.choice(soak).id)
+        elif soak and self.rng.random() < 0.5:
+            event = self.rng.choice(soak)
+            event.description = "Soak notes " * self.rng.randint(1, 40)
+            other.update(event)
+        else:
+            day = date.today() + timedelta(days=self.rng.randint(-30, 30))
+            other.add(Event(title="Soak external", date=day, description="Added elsewhere"))
+
+    async def step(self) -> None:
+        """Run one randomly chosen action, then the app's periodic polling."""
+        weights, actions = zip(*self.actions)
+        action = self.rng.choices(actions, weights)[0]
+        start = time.perf_counter()
+        await action()
+        count = self.counts.setdefault(action.__name__, [0, 0.0])
+        count[0] += 1
+        count[1] += time.perf_counter() - start
+        self.app.storage.check_for_changes()
+        self.app.config.check_for_changes()
+
+    async def settle(self) -> None:
+        """Close any screens and go back to the month view on today."""
+        while len(self.app.screen_stack) > 1:
+            await self.press("escape")
+        await self.press("1", "t")
+
+
+def sample(app: CalendarApp, hour: int) -> dict:
+    gc.collect()
+    return {
+        "hour": hour,
+        "dom_nodes": len(app.screen.query("*")),
+        # Widgets still referenced after leaving the DOM don't show above
+        "widgets_alive": sum(isinstance(o, Widget) for o in gc.get_objects()),
+        "rss_mb": _rss_mb(),
+        "traced_mb": tracemalloc.get_traced_memory()[0] / 2**20,
+        **cache_sizes(app),
+    }
+
+
+def find_growth(samples: list[dict], limits: dict[str, int]) -> list[str]:
+    """Metrics whose last sample exceeds their peak over the first half.
+
+    Bounded caches may grow up to their limit instead.
+    """
+    failures = []
+    half = samples[: len(samples) // 2 + 1]
+    for metric in samples[0]:
+        if metric == "hour":
+            continue
+        if metric in limits:
+            peak = max(s[metric] for s in samples)
+            if peak > limits[metric]:
+                failures.append(f"{metric} exceeded its limit of {limits[metric]}: {peak}")
+            continue
+        absolute, fraction = TOLERANCES.get(metric, CACHE_TOLERANCE)
+        peak = max(s[metric] for s in half)
+        last = samples[-1][metric]
+        if last > peak + max(absolute, fraction * peak):
+            failures.append(f"{metric} kept growing: {peak:g} by hour {half[-1]['hour']}, {last:g} at the end")
+    return failures
+
+
+async def soak(args: argparse.Namespace, workdir: Path) -> tuple[list[dict], dict, dict, tracemalloc.Snapshot, tracemalloc.Snapshot]:
+    path = write_store(workdir / "events.json", args.size, seed=3)
+    archived = EventStorage(path).archive_before(date.today() - timedelta(days=ARCHIVE_AFTER_DAYS))
+    print(f"{archived} of {args.size} events archived", flush=True)
+    app = CalendarApp(storage=EventStorage(path), config=Config(workdir / "config.json"))
+    samples = []
+    async with app.run_test(size=(120, 50)) as pilot:
+        await pilot.pause()
+        session = Session(app, pilot, EventStorage(path), random.Random(args.seed))
+        # An archived year is loaded when a view first reaches it, then kept
+        # like the hot events. Load them all while warming up, so that counts
+        # as data rather than growth; browse_year still pages through them.
+        app.storage.load_archive()
+        print(f"warming up ({args.warmup} actions)", flush=True)
+        for _ in range(args.warmup):
+            await session.step()
+        await session.settle()
+        samples.append(sample(app, 0))
+        first = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        for hour in range(1, args.hours + 1):
+            for _ in range(args.actions_per_hour):
+                await session.step()
+            await session.settle()
+            samples.append(sample(app, hour))
+            if hour == 1:
+                first = tracemalloc.take_snapshot()
+            row = samples[-1]
+            print(
+                f"hour {hour:>3}  {row['dom_nodes']:6d} nodes  {row['widgets_alive']:6d} widgets  "
+                f"{row['rss_mb']:7.1f} MB rss  "
+                f"{row['traced_mb']:7.1f} MB traced  ({time.perf_counter() - start:.0f} s)",
+                flush=True,
+            )
+        last = tracemalloc.take_snapshot()
+        limits = cache_limits(app)
+    return samples, limits, session.counts, first, last
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=int, default=8, help="simulated hours of use")
+    parser.add_argument("--actions-per-hour", type=int, default=60)
+    parser.add_argument("--size", type=int, default=10_000, help="events in the store")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=WARMUP_ACTIONS, help="actions before the first sample")
+    parser.add_argument("--top", type=int, default=10, help="allocation sites to list")
+    parser.add_argument("--output", type=Path, help="write samples JSON here")
+    args = parser.parse_args()
+    if args.hours < 2:
+        parser.error("--hours must be at least 2 to tell warm-up from growth")
+
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        samples, limits, counts, first, last = asyncio.run(soak(args, Path(tmp)))
+    tracemalloc.stop()
+
+    caches = [m for m in samples[0] if m.startswith(("cache.", "storage."))]
+    print("\ncache sizes by hour")
+    for row in samples:
+        print(f"  hour {row['hour']:>3}  " + "  ".join(f"{m}={row[m]}" for m in caches))
+    print("\nactions")
+    for name, (n, seconds) in sorted(counts.items()):
+        print(f"  {name:<16} {n:6d}  {seconds / n * 1e3:8.1f} ms avg")
+    print("\ntop allocation growth since hour 1")
+    for stat in last.compare_to(first, "lineno")[: args.top]:
+        print(f"  {stat.size_diff / 1024:+9.1f} KiB  {stat.count_diff:+7d} blocks  {stat.traceback}")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "meta": {
+                "cal_version": __version__,
+                "python": platform.python_version(),
+                "hours": args.hours,
+                "actions_per_hour": args.actions_per_hour,
+                "size": args.size,
+                "warmup": args.warmup,
+            },
+            "limits": limits,
+            "samples": samples,
+        }, indent=2))
+
+    failures = find_growth(samples, limits)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""In-process stub sync server and sync benchmarks.
+
+StubServer speaks the protocol described in cal.sync over HTTP on a local
+port, keeping events in memory. The benchmark syncs a synthetic store
+against it and reports requests, bytes transferred and events touched per
+sync, next to the bytes a naive sync that downloads and uploads everything
+would move. It also checks the end state: both sides hold the same events.
+
+    python benchmarks/sync_stub.py --size 10000 --edits 50
+    python benchmarks/sync_stub.py --size 100000 --output sync.json
+
+StubServer can also be pointed at by hand (`cal sync --url`) while
+developing:
+
+    python benchmarks/sync_stub.py --serve 8765
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import uuid
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from cal.models import Event
+from cal.storage import EventStorage
+from cal.sync import HTTPTransport, SyncEngine, SyncStats
+
+from synthetic import write_store
+
+# Changes the stub remembers; older tokens get 410 like an expired CalDAV token
+LOG_LIMIT = 100_000
+
+
+class StubServer:
+    """Calendar server holding events in memory, with a change log for tokens."""
+
+    def __init__(self, port: int = 0) -> None:
+        self.events: dict[str, tuple[str, dict]] = {}
+        # (seq, id) of every change, oldest first; tokens are seq numbers
+        self._log: list[tuple[int, str]] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._http = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._http.shutdown()
+        self._http.server_close()
+
+    def _changed(self, event_id: str) -> None:
+        self._seq += 1
+        self._log.append((self._seq, event_id))
+        if len(self._log) > LOG_LIMIT:
+            del self._log[: len(self._log) - LOG_LIMIT]
+
+    def put(self, data: dict) -> str:
+        """Store an event as if another client uploaded it; returns its ETag."""
+        with self._lock:
+            etag = uuid.uuid4().hex[:12]
+            self.events[data["id"]] = (etag, data)
+            self._changed(data["id"])
+            return etag
+
+    def delete(self, event_id: str) -> None:
+        """Delete an event as if another client did."""
+        with self._lock:
+            if self.events.pop(event_id, None) is not None:
+                self._changed(event_id)
+
+    def report(self, token: Optional[str]) -> Optional[dict]:
+        """Changes since a token, or None if it is too old."""
+        with self._lock:
+            if token is None:
+                changes = {i: etag for i, (etag, _) in self.events.items()}
+            else:
+                since = int(token)
+                if self._log and since < self._log[0][0] - 1:
+                    return None
+                changes = {}
+                for seq, event_id in reversed(self._log):
+                    if seq <= since:
+                        break
+                    if event_id not in changes:
+                        item = self.events.get(event_id)
+                        changes[event_id] = item[0] if item else None
+            return {"token": str(self._seq), "changes": changes}
+
+    def fetch(self, ids: list[str]) -> dict:
+        with self._lock:
+            return {"events": {
+                i: {"etag": self.events[i][0], "data": self.events[i][1]}
+                for i in ids if i in self.events
+            }}
+
+    def upload(self, body: dict) -> dict:
+        etags: dict[str, str] = {}
+        conflicts: list[str] = []
+        with self._lock:
+            for item in body["put"] + body["delete"]:
+                current = self.events.get(item["id"])
+                if (current[0] if current else None) != item["if_match"]:
+                    conflicts.append(item["id"])
+                elif "data" in item:
+                    etags[item["id"]] = uuid.uuid4().hex[:12]
+                    self.events[item["id"]] = (etags[item["id"]], item["data"])
+                    self._changed(item["id"])
+                else:
+                    del self.events[item["id"]]
+                    self._changed(item["id"])
+        return {"etags": etags, "conflicts": conflicts}
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                path = self.path.rsplit("/", 1)[-1]
+                if path == "report":
+                    result = server.report(body["token"])
+                elif path == "fetch":
+                    result = server.fetch(body["ids"])
+                elif path == "upload":
+                    result = server.upload(body)
+                else:
+                    self.send_error(404)
+                    return
+                if result is None:
+                    self.send_error(410)
+                    return
+                payload = json.dumps(result).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+
+def _report(name: str, stats: SyncStats, naive_bytes: int) -> dict:
+    moved = stats.bytes_sent + stats.bytes_received
+    touched = stats.fetched + stats.uploaded + stats.deleted + stats.removed
+    print(
+        f"  {name:<16} {stats.seconds * 1e3:9.1f} ms {stats.requests:5d} req "
+        f"{moved / 1024:10.1f} KiB {touched:7d} events   (naive {naive_bytes / 1024:,.0f} KiB)"
+    )
+    return {**stats.as_dict(), "naive_bytes": naive_bytes}
+
+
+def run(size: int, edits: int, workdir: Path, seed: int = 0) -> dict[str, dict]:
+    """Sync a store of `size` events through a series of scenarios."""
+    rng = random.Random(seed)
+    path = write_store(workdir / "events.json", size, seed=seed)
+    storage = EventStorage(path)
+    server = StubServer().start()
+    try:
+        def naive_bytes() -> int:
+            # Download everything and upload everything
+            local = sum(len(json.dumps(e.to_dict())) for e in storage.get_all())
+            return local + sum(len(json.dumps(d)) for _, d in server.events.values())
+
+        results = {}
+        print(f"{size} events, {edits} edits per side")
+
+        engine = SyncEngine(storage, HTTPTransport(server.url), url=server.url)
+        results["initial_upload"] = _report("initial upload", engine.sync(), naive_bytes())
+        results["no_changes"] = _report("no changes", engine.sync(), naive_bytes())
+
+        # Local edits in this process: found from the change journal
+        events = storage.get_all()
+        for event in rng.sample(events, edits):
+            event.title += " (moved)"
+            event.date += timedelta(days=1)
+            storage.update(event)
+        storage.delete_many(e.id for e in rng.sample(storage.get_all(), edits // 5))
+        # Remote edits by another client
+        for event_id in rng.sample(list(server.events), edits):
+            _, data = server.events[event_id]
+            server.put({**data, "description": data["description"] + " (remote)"})
+        for event_id in rng.sample(list(server.events), edits // 5):
+            server.delete(event_id)
+        results["two_way"] = _report("two-way edits", engine.sync(), naive_bytes())
+
+        # A fresh process: no change journal, content hashes are compared
+        fresh = SyncEngine(EventStorage(path), HTTPTransport(server.url), url=server.url)
+        results["fresh_process"] = _report("fresh process", fresh.sync(), naive_bytes())
+
+        local = {e.id: e.to_dict() for e in EventStorage(path).get_all()}
+        # Compared as loaded, since Event normalizes some fields
+        remote = {i: Event.from_dict(d).to_dict() for i, (_, d) in server.events.items()}
+        if local != remote:
+            raise AssertionError(
+                f"Out of sync: {len(local.keys() ^ remote.keys())} ids differ, "
+                f"{sum(local[i] != remote[i] for i in local.keys() & remote.keys())} contents"
+            )
+        print("  both sides hold the same events")
+        return results
+    finally:
+        server.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000, help="events in the store")
+    parser.add_argument("--edits", type=int, default=50, help="events edited on each side")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="only run a stub server")
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        server = StubServer(args.serve)
+        print(f"Serving {server.url} (Ctrl-C to stop)")
+        try:
+            server._http.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.size, args.edits, Path(tmp))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
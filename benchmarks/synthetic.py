@@ -0,0 +1,82 @@
+"""Synthetic event stores for benchmarks.
+
+Events are spread from 2010 to a year ahead of today, denser towards the
+present and mostly on weekdays. About 70% are timed (office hours, on
+quarter-hour slots), the rest all-day, and descriptions range from empty to
+a few sentences of meeting notes.
+"""
+
+import json
+import random
+from datetime import date, time, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from cal.models import Event
+
+TITLES = [
+    "Standup", "1:1", "Planning", "Retro", "Design review", "Lunch",
+    "Dentist", "Gym", "Flight", "Team offsite", "Interview", "Demo",
+    "Birthday", "Dinner", "Oncall handoff", "Budget review", "Call mom",
+]
+
+WORDS = (
+    "agenda notes follow up action items discuss roadmap review budget "
+    "hiring metrics launch blockers design api migration customer incident "
+    "postmortem quarterly goals travel booking confirm venue slides"
+).split()
+
+START = date(2010, 1, 1)
+
+
+def _random_date(rng: random.Random, start: date, end: date) -> date:
+    """Pick a date weighted towards the end of the span, mostly on weekdays."""
+    span = (end - start).days
+    offset = int(rng.triangular(0, span, span * 0.9))
+    day = start + timedelta(days=offset)
+    if day.weekday() >= 5 and rng.random() < 0.7:
+        day -= timedelta(days=day.weekday() - 4)
+    return day
+
+
+def _description(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.4:
+        return ""
+    length = rng.randint(3, 12) if roll < 0.85 else rng.randint(40, 150)
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def generate_events(
+    count: int,
+    seed: int = 0,
+    start: date = START,
+    end: Optional[date] = None,
+) -> Iterator[Event]:
+    """Yield a reproducible stream of synthetic events between two dates."""
+    rng = random.Random(seed)
+    end = end or date.today() + timedelta(days=365)
+    for i in range(count):
+        event_time = None
+        if rng.random() < 0.7:
+            event_time = time(rng.randint(8, 18), rng.choice((0, 15, 30, 45)))
+        yield Event(
+            id=f"evt-{seed}-{i:08d}",
+            title=rng.choice(TITLES),
+            date=_random_date(rng, start, end),
+            time=event_time,
+            description=_description(rng),
+        )
+
+
+def write_events(path: Path, events: Iterable[Event]) -> Path:
+    """Write events straight to an events.json file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"events": [e.to_dict() for e in events]}, f)
+    return path
+
+
+def write_store(path: Path, count: int, seed: int = 0) -> Path:
+    """Write an events.json with the given number of synthetic events."""
+    return write_events(path, generate_events(count, seed))
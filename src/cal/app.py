@@ -1,21 +1,32 @@
 """Main calendar TUI application."""
 
-from datetime import date
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from textual.app import App, ComposeResult
-from textual.widgets import Static, Footer, Header
+from textual.css.query import NoMatches
+from textual.widget import Widget
+from textual.widgets import Static, Header
 from textual.containers import Horizontal, Vertical
 from textual.binding import Binding
 
-from .storage import EventStorage
-from .config import Config
+from . import perf
+from .calendars import CalendarSet, open_calendars
+from .storage import EventStorage, StoreChange
+from .config import Config, ConfigChange
 from .holidays_provider import HolidayProvider
 from .models import Event
+from .reminders import MAX_SLEEP, ReminderScheduler
+from .tags import TagFilter
 from .views.month import MonthView
-from .views.day import DayView
-from .views.agenda import AgendaView
-from .widgets.event_form import EventForm, ConfirmDialog
+from .widgets.footer import AppFooter
+
+if TYPE_CHECKING:
+    from .widgets.settings import HolidaySettings
+
+# Week, day and agenda views, and the event form, are imported when first used
+# to keep startup fast.
 
 
 class CalendarApp(App):
@@ -28,25 +39,41 @@ class CalendarApp(App):
         Binding("1", "view_month", "Month"),
         Binding("2", "view_day", "Day"),
         Binding("3", "view_agenda", "Agenda"),
+        Binding("4", "view_week", "Week"),
         Binding("a", "add_event", "Add"),
         Binding("e", "edit_event", "Edit"),
         Binding("x", "delete_event", "Delete"),
+        Binding("u", "undo", "Undo"),
+        Binding("ctrl+r", "redo", "Redo", show=False),
         Binding("n", "next_month", "Next"),
         Binding("p", "prev_month", "Prev"),
         Binding("t", "goto_today", "Today"),
+        Binding("s", "find_slot", "Free slot"),
+        Binding("v", "toggle_timeline", "Timeline"),
+        Binding("c", "pick_calendars", "Calendars"),
+        Binding("f", "filter_tags", "Filter"),
+        Binding("comma", "open_settings", "Settings"),
         Binding("left", "move_left", "Left", show=False),
         Binding("right", "move_right", "Right", show=False),
         Binding("up", "move_up", "Up", show=False),
         Binding("down", "move_down", "Down", show=False),
         Binding("enter", "select_day", "Select", show=False),
         Binding("escape", "go_back", "Back", show=False),
+        Binding("f12", "toggle_perf", "Perf", show=False),
     ]
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(
+        self,
+        storage: EventStorage | CalendarSet | None = None,
+        config: Config | None = None,
+        **kwargs,
+    ) -> None:
         super().__init__(**kwargs)
-        self.storage = EventStorage()
-        self.config = Config()
+        self.config = config or Config()
+        perf.enable_from_settings(self.config.perf)
+        self.storage = storage or open_calendars(self.config, status_path=self.config.status_file)
         self.holiday_provider = HolidayProvider(self.config)
+        self.tag_filter = TagFilter()
         self._current_view = "month"
 
     def compose(self) -> ComposeResult:
@@ -56,36 +83,77 @@ class CalendarApp(App):
                 yield Static("1: Month", id="tab-month", classes="tab active")
                 yield Static("2: Day", id="tab-day", classes="tab")
                 yield Static("3: Agenda", id="tab-agenda", classes="tab")
+                yield Static("4: Week", id="tab-week", classes="tab")
             with Vertical(id="views-container"):
                 yield MonthView(
                     storage=self.storage,
                     holiday_provider=self.holiday_provider,
                     id="month-view",
                 )
-                yield DayView(
-                    storage=self.storage,
-                    holiday_provider=self.holiday_provider,
-                    id="day-view",
-                )
-                yield AgendaView(storage=self.storage, id="agenda-view")
-        yield Footer()
+        yield AppFooter()
 
     def on_mount(self) -> None:
         self._show_view("month")
+        # The scheduler registers its storage listener first, so it is up to
+        # date by the time _on_storage_change re-arms the timer
+        self._reminders = ReminderScheduler(self.storage)
+        self._reminder_timer = None
+        self._arm_reminders()
+        self.storage.add_listener(self._on_storage_change)
+        # Pick up edits made by other cal instances or sync tools
+        self.set_interval(2, self.storage.check_for_changes)
+        self.config.add_listener(self._on_config_change)
+        self.set_interval(2, self.config.check_for_changes)
+        if self.storage.status_path:
+            # Keep time-relative status fields ("in 25m") current
+            self.storage.write_status()
+            self.set_interval(30, self.storage.write_status)
+        if self.config.archive_after_days is not None:
+            self.call_after_refresh(self._archive_old_events)
         # Defer focus clearing to after render completes - ensures app-level bindings work
         self.call_after_refresh(self.set_focus, None)
 
+    def _view(self, view_name: str) -> Widget | None:
+        """Get a view if it has been mounted."""
+        try:
+            return self.query_one(f"#{view_name}-view")
+        except NoMatches:
+            return None
+
+    def _mount_view(self, view_name: str) -> Widget:
+        """Create and mount a view the first time it is shown."""
+        if view_name == "day":
+            from .views.day import DayView
+
+            view = DayView(
+                storage=self.storage,
+                holiday_provider=self.holiday_provider,
+                id="day-view",
+            )
+        elif view_name == "week":
+            from .views.week import WeekView
+
+            view = WeekView(
+                storage=self.storage,
+                holiday_provider=self.holiday_provider,
+                id="week-view",
+            )
+        else:
+            from .views.agenda import AgendaView
+
+            view = AgendaView(storage=self.storage, id="agenda-view")
+        view.set_filter(self.tag_filter)
+        self.query_one("#views-container").mount(view)
+        return view
+
     def _show_view(self, view_name: str) -> None:
         """Switch to the specified view."""
         self._current_view = view_name
 
         month_view = self.query_one("#month-view", MonthView)
-        day_view = self.query_one("#day-view", DayView)
-        agenda_view = self.query_one("#agenda-view", AgendaView)
-
-        month_view.display = view_name == "month"
-        day_view.display = view_name == "day"
-        agenda_view.display = view_name == "agenda"
+        view = self._view(view_name) or self._mount_view(view_name)
+        for child in self.query_one("#views-container").children:
+            child.display = child is view
 
         for tab in self.query(".tab"):
             tab.remove_class("active")
@@ -93,14 +161,74 @@ class CalendarApp(App):
         tab_id = f"tab-{view_name}"
         self.query_one(f"#{tab_id}").add_class("active")
 
-        if view_name == "day":
-            day_view.set_date(month_view.selected_date)
+        if view_name in ("day", "week"):
+            view.set_date(month_view.selected_date)
+
+    def _archive_old_events(self) -> None:
+        cutoff = date.today() - timedelta(days=self.config.archive_after_days)
+        moved = self.storage.archive_before(cutoff)
+        if moved:
+            self.notify(f"Archived {moved} event(s) from before {cutoff.isoformat()}")
+
+    def on_unmount(self) -> None:
+        # Leave a self-contained events.json for other tools
+        self.storage.compact()
+
+    def _on_storage_change(self, change: StoreChange) -> None:
+        """Refresh only the views showing dates touched by a change."""
+        for view in self.query_one("#views-container").children:
+            if view.shows_any(change.dates):
+                view.refresh_events()
+        if change.external:
+            count = len(change.added | change.updated | change.removed)
+            self.notify(f"Reloaded {count} event(s) changed outside cal")
+        self._arm_reminders()
+
+    def _on_config_change(self, change: ConfigChange) -> None:
+        """Apply changed settings without rebuilding the views.
+
+        The holiday provider has already dropped stale years by the time
+        this runs, since it subscribed first.
+        """
+        keys = change.keys
+        if keys & {"country", "subdivision", "show_holidays"}:
+            for view in self.query_one("#views-container").children:
+                view.refresh_holidays()
+        if "display_timezone" in keys:
+            try:
+                self.storage.set_display_timezone(self.config.display_timezone)
+            except ValueError as e:
+                self.notify(str(e), severity="error")
+        if "calendars" in keys and isinstance(self.storage, CalendarSet):
+            try:
+                entries = self.config.calendars
+            except ValueError as e:
+                self.notify(str(e), severity="error")
+                entries = []
+            for entry in entries:
+                if entry["name"] in self.storage.calendars:
+                    self.storage.set_visible(entry["name"], entry["visible"])
+        if change.external:
+            self.notify(f"Reloaded settings: {', '.join(sorted(keys))}")
+
+    def _arm_reminders(self) -> None:
+        """Set a single timer for the next due reminder."""
+        if self._reminder_timer is not None:
+            self._reminder_timer.stop()
+            self._reminder_timer = None
+        next_fire = self._reminders.next_fire()
+        if next_fire is None:
+            return
+        delay = (next_fire - datetime.now()).total_seconds()
+        if delay <= 0:
+            self.call_later(self._fire_reminders)
+        else:
+            self._reminder_timer = self.set_timer(min(delay, MAX_SLEEP), self._fire_reminders)
 
-    def _refresh_all_views(self) -> None:
-        """Refresh all views after event changes."""
-        self.query_one("#month-view", MonthView).refresh_events()
-        self.query_one("#day-view", DayView).refresh_events()
-        self.query_one("#agenda-view", AgendaView).refresh_events()
+    def _fire_reminders(self) -> None:
+        for reminder in self._reminders.pop_due():
+            self.notify(reminder.message(), title="Reminder", timeout=30)
+        self._arm_reminders()
 
     def action_view_month(self) -> None:
         self._show_view("month")
@@ -111,25 +239,56 @@ class CalendarApp(App):
     def action_view_agenda(self) -> None:
         self._show_view("agenda")
 
+    def action_view_week(self) -> None:
+        self._show_view("week")
+
+    def _select_in_month(self, target_date: date) -> None:
+        """Move the month view's selection, which the day view follows."""
+        month_view = self.query_one("#month-view", MonthView)
+        if target_date != month_view.selected_date:
+            month_view.move_selection((target_date - month_view.selected_date).days)
+
     def action_next_month(self) -> None:
         if self._current_view == "month":
             self.query_one("#month-view", MonthView).next_month()
+        elif self._current_view == "day":
+            # Page through days; the day view follows the month selection
+            self.query_one("#month-view", MonthView).move_selection(1)
+        elif self._current_view == "week":
+            # The week view keeps its own date, so paging does not rebuild
+            # the hidden month grid
+            self._view("week").move_selection(7)
 
     def action_prev_month(self) -> None:
         if self._current_view == "month":
             self.query_one("#month-view", MonthView).prev_month()
+        elif self._current_view == "day":
+            self.query_one("#month-view", MonthView).move_selection(-1)
+        elif self._current_view == "week":
+            self._view("week").move_selection(-7)
+
+    def action_toggle_timeline(self) -> None:
+        if self._current_view != "day":
+            self._show_view("day")
+        self._view("day").toggle_timeline()
 
     def action_goto_today(self) -> None:
         if self._current_view == "month":
             self.query_one("#month-view", MonthView).goto_today()
+        elif self._current_view == "week":
+            self._view("week").set_date(date.today())
 
     def action_move_left(self) -> None:
         if self._current_view == "month":
             self.query_one("#month-view", MonthView).move_selection(-1)
+        elif self._current_view == "week":
+            self._view("week").move_selection(-1)
 
     def action_move_right(self) -> None:
         if self._current_view == "month":
             self.query_one("#month-view", MonthView).move_selection(1)
+        elif self._current_view == "week":
+            self._view("week").move_selection(1)
 
     def action_move_up(self) -> None:
         if self._current_view == "month":
@@ -140,52 +299,175 @@ class CalendarApp(App):
             self.query_one("#month-view", MonthView).move_selection(7)
 
     def action_select_day(self) -> None:
-        if self._current_view == "month":
+        if self._current_view == "week":
+            self._select_in_month(self._view("week").current_date)
+        if self._current_view in ("month", "week"):
             self._show_view("day")
 
     def action_go_back(self) -> None:
-        if self._current_view in ("day", "agenda"):
+        if self._current_view == "week":
+            self._select_in_month(self._view("week").current_date)
+        if self._current_view in ("day", "agenda", "week"):
             self._show_view("month")
 
-    def action_add_event(self) -> None:
-        default_date = date.today()
+    def action_toggle_perf(self) -> None:
+        from .widgets.perf_overlay import PerfOverlay
+
+        try:
+            self.query_one("#perf-overlay", PerfOverlay).toggle()
+        except NoMatches:
+            self.mount(PerfOverlay(id="perf-overlay"))
+
+    def _selected_date(self) -> date:
+        """Get the date the current view points at."""
         if self._current_view == "month":
-            default_date = self.query_one("#month-view", MonthView).selected_date
-        elif self._current_view == "day":
-            default_date = self.query_one("#day-view", DayView).current_date
+            return self.query_one("#month-view", MonthView).selected_date
+        if self._current_view in ("day", "week"):
+            return self._view(self._current_view).current_date
+        return date.today()
+
+    def _calendar_names(self) -> list[str]:
+        if isinstance(self.storage, CalendarSet):
+            return list(self.storage.calendars)
+        return []
+
+    def _open_event_form(self, **defaults) -> None:
+        from .widgets.event_form import EventForm
+
+        form = EventForm(calendars=self._calendar_names(), **defaults)
 
         def on_save(event: Event | None) -> None:
             if event:
-                self.storage.add(event)
-                self._refresh_all_views()
+                if form.calendar is None:
+                    self.storage.add(event)
+                else:
+                    self.storage.add(event, form.calendar)
                 self.notify(f"Added: {event.title}")
 
-        self.push_screen(EventForm(default_date=default_date), on_save)
+        self.push_screen(form, on_save)
+
+    def action_filter_tags(self) -> None:
+        from .widgets.tag_filter import TagFilterPrompt
+
+        def on_filter(tag_filter: TagFilter | None) -> None:
+            if tag_filter is None or tag_filter == self.tag_filter:
+                return
+            self.tag_filter = tag_filter
+            for view in self.query_one("#views-container").children:
+                view.set_filter(tag_filter)
+            self.sub_title = f"tags: {tag_filter}" if tag_filter else ""
+
+        self.push_screen(TagFilterPrompt(self.tag_filter, self.storage.tags()), on_filter)
+
+    def action_open_settings(self) -> None:
+        from .widgets.settings import HolidaySettings, SettingsScreen
+
+        def on_save(settings: HolidaySettings | None) -> None:
+            if settings is None:
+                return
+            region = (settings.country, settings.subdivision)
+            if settings.show_holidays and region != (self.config.country, self.config.subdivision):
+                years = {date.today().year, self._selected_date().year}
+                # Build the new region's holidays off the UI thread, so the
+                # views find them ready when the change is applied
+                self.run_worker(
+                    lambda: self._warm_holidays(settings, years),
+                    thread=True,
+                    exclusive=True,
+                    group="settings",
+                )
+            else:
+                self._apply_settings(settings)
+
+        self.push_screen(SettingsScreen(self.holiday_provider), on_save)
+
+    def _warm_holidays(self, settings: "HolidaySettings", years: set[int]) -> None:
+        for year in years:
+            self.holiday_provider.warm(settings.country, settings.subdivision, year)
+        self.call_from_thread(self._apply_settings, settings)
+
+    def _apply_settings(self, settings: "HolidaySettings") -> None:
+        # One write and one change notification; _on_config_change refreshes
+        with self.config.transaction():
+            self.config.country = settings.country
+            self.config.subdivision = settings.subdivision
+            self.config.show_holidays = settings.show_holidays
+
+    def action_pick_calendars(self) -> None:
+        if len(self._calendar_names()) < 2:
+            self.notify("Only one calendar is configured")
+            return
+
+        from .widgets.calendar_picker import CalendarPicker
+
+        def on_toggle(name: str, visible: bool) -> None:
+            self.storage.set_visible(name, visible)
+            self.config.set_calendar_visible(name, visible)
+
+        self.push_screen(CalendarPicker(list(self.storage.calendars.values()), on_toggle))
+
+    def action_add_event(self) -> None:
+        self._open_event_form(default_date=self._selected_date())
+
+    def action_find_slot(self) -> None:
+        from .widgets.free_slots import FreeSlotPicker
+
+        def on_pick(slot: tuple[datetime, datetime] | None) -> None:
+            if slot:
+                start, end = slot
+                self._open_event_form(
+                    default_date=start.date(),
+                    default_time=start.time(),
+                    default_end_time=end.time(),
+                )
+
+        start_date = max(self._selected_date(), date.today())
+        self.push_screen(
+            FreeSlotPicker(self.storage, self.holiday_provider, start_date), on_pick
+        )
 
     def action_edit_event(self) -> None:
         event = self._get_selected_event()
         if not event:
             self.notify("No event selected", severity="warning")
             return
+        if self.storage.is_archived(event.id):
+            self.notify("Archived events are read-only", severity="warning")
+            return
+        # Views show events in the display zone; edit the stored original
+        event = self.storage.get(event.id) or event
+
+        from .widgets.event_form import EventForm
+
+        calendar = None
+        if isinstance(self.storage, CalendarSet):
+            calendar = self.storage.calendar_of(event.id)
+        form = EventForm(event=event, calendars=self._calendar_names(), calendar=calendar)
 
         def on_save(updated_event: Event | None) -> None:
             if updated_event:
-                self.storage.update(updated_event)
-                self._refresh_all_views()
+                if form.calendar != calendar:
+                    self.storage.move(updated_event, form.calendar)
+                else:
+                    self.storage.update(updated_event)
                 self.notify(f"Updated: {updated_event.title}")
 
-        self.push_screen(EventForm(event=event), on_save)
+        self.push_screen(form, on_save)
 
     def action_delete_event(self) -> None:
         event = self._get_selected_event()
         if not event:
             self.notify("No event selected", severity="warning")
             return
+        if self.storage.is_archived(event.id):
+            self.notify("Archived events are read-only", severity="warning")
+            return
+
+        from .widgets.event_form import ConfirmDialog
 
         def on_confirm(confirmed: bool) -> None:
             if confirmed:
                 self.storage.delete(event.id)
-                self._refresh_all_views()
                 self.notify(f"Deleted: {event.title}")
 
         self.push_screen(
@@ -193,16 +475,38 @@ class CalendarApp(App):
             on_confirm,
         )
 
+    def action_undo(self) -> None:
+        try:
+            ops = self.storage.undo()
+        except ValueError as e:
+            self.notify(f"Cannot undo: {e}", severity="warning")
+            return
+        if ops is None:
+            self.notify("Nothing to undo")
+        else:
+            self.notify(f"Undid {', '.join(op.describe() for op in ops)}")
+
+    def action_redo(self) -> None:
+        try:
+            ops = self.storage.redo()
+        except ValueError as e:
+            self.notify(f"Cannot redo: {e}", severity="warning")
+            return
+        if ops is None:
+            self.notify("Nothing to redo")
+        else:
+            self.notify(f"Redid {', '.join(op.describe() for op in ops)}")
+
     def _get_selected_event(self) -> Event | None:
         """Get the currently selected event based on current view."""
-        if self._current_view == "day":
-            return self.query_one("#day-view", DayView).selected_event
-        elif self._current_view == "agenda":
-            return self.query_one("#agenda-view", AgendaView).selected_event
+        if self._current_view in ("day", "agenda"):
+            return self._view(self._current_view).selected_event
         return None
 
     def on_month_view_date_selected(self, message: MonthView.DateSelected) -> None:
-        self.query_one("#day-view", DayView).set_date(message.date)
+        day_view = self._view("day")
+        if day_view is not None:
+            day_view.set_date(message.date)
 
 
 def main() -> None:
@@ -0,0 +1,90 @@
+"""Compressed per-year archive of past events.
+
+Each year is one gzipped JSON file, ``archive/2019.json.gz``, holding the
+events that start in that year. Archive files are only rewritten when more
+events are archived into them.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+_YEAR_FILE = re.compile(r"^(\d{4})\.json\.gz$")
+
+
+class ArchiveError(Exception):
+    """An archive file exists but cannot be read."""
+
+
+class ArchiveStore:
+    """Directory of read-only per-year archive files."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _path(self, year: int) -> Path:
+        return self.directory / f"{year}.json.gz"
+
+    def scan(self) -> dict[int, tuple]:
+        """Get the archived years with a stat signature of each file."""
+        years: dict[int, tuple] = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return years
+        for entry in entries:
+            match = _YEAR_FILE.match(entry.name)
+            if match:
+                st = entry.stat()
+                years[int(match.group(1))] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return years
+
+    def _read(self, year: int) -> list[dict]:
+        """The event dicts archived for a year ([] if there is no file yet)."""
+        try:
+            with gzip.open(self._path(year), "rt") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            raise ArchiveError(f"Unreadable archive for {year}: {e}") from e
+        if not isinstance(data, dict) or not isinstance(data.get("events", []), list):
+            raise ArchiveError(f"Unreadable archive for {year}: not an archive file")
+        return data.get("events", [])
+
+    def load_year(self, year: int) -> list[Event]:
+        """Load the events archived for a year (none if its file is unreadable)."""
+        try:
+            archived = self._read(year)
+        except ArchiveError as e:
+            logger.error(str(e))
+            return []
+        events = []
+        for data in archived:
+            try:
+                events.append(Event.from_dict(data))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid archived event: {e}")
+        return events
+
+    def add(self, year: int, events: list[Event]) -> None:
+        """Merge events into a year's archive file, replacing it atomically.
+
+        Raises ArchiveError, leaving the file alone, if the existing file
+        can't be read: replacing it would lose the events in it.
+        """
+        merged = {d["id"]: d for d in self._read(year) if isinstance(d, dict) and "id" in d}
+        merged.update((e.id, e.to_dict()) for e in events)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(year)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump({"events": list(merged.values())}, f)
+        os.replace(tmp_path, path)
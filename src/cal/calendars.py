@@ -0,0 +1,472 @@
+"""Several named calendars, each stored in its own file, viewed as one.
+
+A CalendarSet answers the same queries as an EventStorage. Each calendar's
+storage already returns its events in sorted order, so the set combines
+them with a lazy k-way merge instead of concatenating and sorting again.
+Hidden calendars stay loaded; toggling visibility only changes which
+streams are merged.
+"""
+
+import heapq
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import chain, groupby, islice
+from pathlib import Path
+from typing import AbstractSet, Callable, Iterable, Iterator, Optional, TYPE_CHECKING
+
+from . import perf
+from .dateindex import DateIndex, IndexedCalendars
+from .intervals import sweep_conflicts
+from .models import Event
+from .oplog import Operation
+from .status import build_status, write_status
+from .storage import EventStorage, StoreChange, conflict_days
+
+if TYPE_CHECKING:
+    from .config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALENDAR = "default"
+
+
+@dataclass
+class CalendarInfo:
+    """A named calendar and how it is displayed."""
+
+    name: str
+    path: Path
+    color: Optional[str] = None
+    visible: bool = True
+
+
+def _archive_dir(path: Path) -> Path:
+    """Archive directory of a calendar file (events.json keeps the plain one)."""
+    if path.name == "events.json":
+        return path.parent / "archive"
+    return path.parent / f"{path.stem}-archive"
+
+
+class CalendarSet:
+    """The events of several calendars, queried and edited as one storage.
+
+    New events go to the first calendar unless another is named. Undo and
+    redo follow the order changes were made in across calendars.
+    """
+
+    def __init__(
+        self,
+        calendars: list[CalendarInfo],
+        status_path: Optional[Path] = None,
+        history_depth: int = 100,
+        display_timezone: Optional[str] = None,
+    ) -> None:
+        """Open each calendar's storage."""
+        if not calendars:
+            raise ValueError("At least one calendar is required")
+        self.calendars: dict[str, CalendarInfo] = {}
+        self.stores: dict[str, EventStorage] = {}
+        for info in calendars:
+            if info.name in self.calendars:
+                raise ValueError(f"Duplicate calendar name '{info.name}'")
+            self.calendars[info.name] = info
+            self.stores[info.name] = EventStorage(
+                info.path,
+                history_depth=history_depth,
+                archive_dir=_archive_dir(info.path),
+                display_timezone=display_timezone,
+            )
+        self.default = calendars[0].name
+        self.status_path = status_path
+        # Calendars touched by each undoable change, oldest first
+        self._undo: deque[tuple[str, ...]] = deque(maxlen=history_depth)
+        self._redo: deque[tuple[str, ...]] = deque(maxlen=history_depth)
+        # Bumped on every visibility toggle, so cached per-date layouts are
+        # invalidated even though no calendar's own versions changed
+        self._generation = 0
+        self._listeners: list[Callable[[StoreChange], None]] = []
+        for name, store in self.stores.items():
+            store.add_listener(lambda change, name=name: self._forward(name, change))
+
+    def _visible(self) -> list[EventStorage]:
+        return [self.stores[name] for name, info in self.calendars.items() if info.visible]
+
+    def _store_of(self, event_id: str) -> Optional[str]:
+        """Name of the calendar holding an event."""
+        for name, store in self.stores.items():
+            if store.get(event_id) is not None:
+                return name
+        return None
+
+    def calendar_of(self, event_id: str) -> Optional[str]:
+        """Get the name of the calendar an event belongs to."""
+        return self._store_of(event_id)
+
+    def color_of(self, event_id: str) -> Optional[str]:
+        """Get the display color of an event's calendar."""
+        name = self._store_of(event_id)
+        return self.calendars[name].color if name else None
+
+    def tags(self) -> list[str]:
+        """Get every tag used in any calendar, sorted."""
+        return sorted(set().union(*(store.tags() for store in self.stores.values())))
+
+    def ids_with_tag(self, tag: str) -> AbstractSet[str]:
+        """Get the ids of visible events with a tag (do not modify the result)."""
+        sets = [store.ids_with_tag(tag) for store in self._visible()]
+        return sets[0] if len(sets) == 1 else frozenset().union(*sets)
+
+    def event_colors(self, events: list[Event]) -> dict[str, str]:
+        """Map the ids of events in colored calendars to their calendar's color."""
+        colors = {}
+        for event in events:
+            color = self.color_of(event.id)
+            if color:
+                colors[event.id] = color
+        return colors
+
+    # Visibility and change notification
+
+    def set_visible(self, name: str, visible: bool) -> None:
+        """Show or hide a calendar, notifying listeners of the events it holds.
+
+        Nothing is read from disk: the calendar stays loaded while hidden.
+        """
+        info = self.calendars[name]
+        if info.visible == visible:
+            return
+        info.visible = visible
+        self._generation += 1
+        store = self.stores[name]
+        ids = {event.id for event in store.get_all()}
+        change = StoreChange(dates=set(store.indexed_dates()))
+        if visible:
+            change.added = ids
+        else:
+            change.removed = ids
+        self._notify(change)
+        self.write_status()
+
+    def add_listener(self, callback: Callable[[StoreChange], None]) -> None:
+        """Register a callback invoked after events in a visible calendar change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[StoreChange], None]) -> None:
+        """Unregister a change callback."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, change: StoreChange) -> None:
+        for callback in list(self._listeners):
+            callback(change)
+
+    def _forward(self, name: str, change: StoreChange) -> None:
+        if not change.external:
+            self.write_status()
+        if self.calendars[name].visible:
+            self._notify(change)
+
+    def check_for_changes(self) -> Optional[StoreChange]:
+        """Pick up changes other processes wrote to any calendar."""
+        combined: Optional[StoreChange] = None
+        for store in self.stores.values():
+            change = store.check_for_changes()
+            if change:
+                combined = combined or StoreChange(external=True)
+                combined.added |= change.added
+                combined.updated |= change.updated
+                combined.removed |= change.removed
+                combined.dates |= change.dates
+        return combined
+
+    def write_status(self, now: Optional[datetime] = None) -> None:
+        """Refresh the status file, if one is configured."""
+        if self.status_path is None:
+            return
+        try:
+            write_status(self.status_path, build_status(self, now))
+        except OSError as e:
+            logger.warning(f"Could not write status file: {e}")
+
+    def reload(self) -> None:
+        """Discard in-memory state and load every calendar again."""
+        for store in self.stores.values():
+            store.reload()
+
+    def compact(self) -> None:
+        """Fold each calendar's journal into its file."""
+        for store in self.stores.values():
+            store.compact()
+
+    def archive_before(self, cutoff: date) -> int:
+        """Archive every calendar's events that ended before the cutoff."""
+        return sum(store.archive_before(cutoff) for store in self.stores.values())
+
+    # Mutations
+
+    def _recorded(self, names: tuple[str, ...], counts: list[int]) -> None:
+        """Track a change for undo if any calendar recorded a new entry."""
+        if any(self.stores[n].history.recorded != c for n, c in zip(names, counts)):
+            self._undo.append(names)
+            self._redo.clear()
+
+    def _mutate(self, names: tuple[str, ...], apply: Callable[[], None]) -> None:
+        counts = [self.stores[n].history.recorded for n in names]
+        try:
+            apply()
+        finally:
+            self._recorded(names, counts)
+
+    def add(self, event: Event, calendar: Optional[str] = None) -> None:
+        """Add a new event to a calendar (the first one by default)."""
+        name = calendar or self.default
+        self._mutate((name,), lambda: self.stores[name].add(event))
+
+    def update(self, event: Event) -> None:
+        """Update an existing event. Raises ValueError for archived events."""
+        name = self._store_of(event.id)
+        if name is not None:
+            self._mutate((name,), lambda: self.stores[name].update(event))
+
+    def delete(self, event_id: str) -> None:
+        """Delete an event by ID. Raises ValueError for archived events."""
+        name = self._store_of(event_id)
+        if name is not None:
+            self._mutate((name,), lambda: self.stores[name].delete(event_id))
+
+    def move(self, event: Event, calendar: str) -> None:
+        """Move an event, with any edits, to another calendar as one undoable change."""
+        source = self._store_of(event.id)
+        if source is None or source == calendar:
+            self.update(event)
+            return
+        if self.stores[source].is_archived(event.id):
+            raise ValueError("Archived events are read-only")
+        target = self.stores[calendar]
+
+        def apply() -> None:
+            self.stores[source].delete(event.id)
+            target.add(event)
+
+        self._mutate((source, calendar), apply)
+
+    def delete_many(self, event_ids: Iterable[str]) -> int:
+        """Delete several events with one write per calendar, as one undoable change."""
+        by_store: dict[str, list[str]] = {}
+        for event_id in event_ids:
+            name = self._store_of(event_id)
+            if name is not None:
+                by_store.setdefault(name, []).append(event_id)
+        deleted = 0
+
+        def apply() -> None:
+            nonlocal deleted
+            for name, ids in by_store.items():
+                deleted += self.stores[name].delete_many(ids)
+
+        self._mutate(tuple(by_store), apply)
+        return deleted
+
+    def find_duplicates(self) -> list[list[Event]]:
+        """Group duplicate events within each calendar, keeper first.
+
+        Copies of an event in different calendars are not duplicates.
+        """
+        groups = [group for store in self.stores.values() for group in store.find_duplicates()]
+        groups.sort(key=lambda group: group[0].sort_key)
+        return groups
+
+    def _replay(
+        self,
+        source: deque,
+        dest: deque,
+        step: Callable[[EventStorage], Optional[list[Operation]]],
+        revert: Callable[[EventStorage], Optional[list[Operation]]],
+    ) -> Optional[list[Operation]]:
+        """Replay the latest entry of `source` in each of its calendars.
+
+        An entry is applied all or nothing: if a calendar refuses (ValueError),
+        the calendars already replayed are reverted and the entry stays put,
+        so every history stays in step.
+        """
+        while source:
+            names = source[-1]
+            ops: list[Operation] = []
+            replayed: list[EventStorage] = []
+            try:
+                for name in reversed(names) if source is self._undo else names:
+                    store = self.stores[name]
+                    store_ops = step(store)
+                    if store_ops is not None:
+                        replayed.append(store)
+                        ops.extend(store_ops)
+            except ValueError:
+                for store in reversed(replayed):
+                    revert(store)
+                raise
+            dest.append(source.pop())
+            if ops:
+                return ops
+        return None
+
+    @perf.timed("calendars.undo")
+    def undo(self) -> Optional[list[Operation]]:
+        """Revert the latest change in any calendar and return its operations."""
+        return self._replay(self._undo, self._redo, EventStorage.undo, EventStorage.redo)
+
+    @perf.timed("calendars.redo")
+    def redo(self) -> Optional[list[Operation]]:
+        """Reapply the latest undone change and return its operations."""
+        return self._replay(self._redo, self._undo, EventStorage.redo, EventStorage.undo)
+
+    # Queries
+
+    def get(self, event_id: str) -> Optional[Event]:
+        """Get an event by ID from any calendar, hidden or not."""
+        for store in self.stores.values():
+            event = store.get(event_id)
+            if event is not None:
+                return event
+        return None
+
+    def displayed(self, event_id: str) -> Optional[Event]:
+        """Get an event by ID as shown in the display zone."""
+        for store in self.stores.values():
+            event = store.displayed(event_id)
+            if event is not None:
+                return event
+        return None
+
+    @property
+    def display_timezone(self) -> Optional[str]:
+        """The IANA zone events are shown in (None for the system zone)."""
+        return self.stores[self.default].display_timezone
+
+    def set_display_timezone(self, zone_name: Optional[str]) -> None:
+        """Show every calendar's events in another zone. Raises ValueError if unknown."""
+        for store in self.stores.values():
+            store.set_display_timezone(zone_name)
+
+    def is_archived(self, event_id: str) -> bool:
+        """Check whether an event is a read-only archived one."""
+        return any(store.is_archived(event_id) for store in self.stores.values())
+
+    def get_all(self) -> list[Event]:
+        """Get all loaded events of the visible calendars, sorted."""
+        return list(heapq.merge(*(s.get_all() for s in self._visible()), key=lambda e: e.sort_key))
+
+    @perf.timed("calendars.get_by_date")
+    def get_by_date(self, target_date: date) -> list[Event]:
+        """Get the visible events for a specific date."""
+        stores = self._visible()
+        if len(stores) == 1:
+            return stores[0].get_by_date(target_date)
+        return list(heapq.merge(*(s.get_by_date(target_date) for s in stores), key=lambda e: e.sort_key))
+
+    def iter_range(self, start: date, end: date) -> Iterator[Event]:
+        """Iterate visible events between two dates (inclusive) in sorted order.
+
+        Events that began before the range come first on its first date,
+        as they do in each calendar's own stream.
+        """
+        streams = [store.iter_range(start, end) for store in self._visible()]
+        if len(streams) == 1:
+            return streams[0]
+        return heapq.merge(*streams, key=lambda e: (max(e.date, start), e.sort_key))
+
+    @perf.timed("calendars.get_range")
+    def get_range(self, start: date, end: date) -> list[Event]:
+        """Get visible events between two dates (inclusive)."""
+        return list(self.iter_range(start, end))
+
+    def get_upcoming(self, from_date: date, days: int = 30) -> list[Event]:
+        """Get upcoming events within specified days."""
+        return self.get_range(from_date, from_date + timedelta(days=days))
+
+    def get_next(self, now: datetime, count: int = 1) -> list[Event]:
+        """Get the next visible events that have not started yet."""
+        today = now.date()
+        streams = [store.get_next(now, count) for store in self._visible()]
+        merged = heapq.merge(*streams, key=lambda e: (max(e.date, today), e.sort_key))
+        return list(islice(merged, count))
+
+    def indexed_dates(self) -> list[date]:
+        """Get the dates with loaded visible events, without loading archived years."""
+        return [d for d, _ in groupby(heapq.merge(*(s.indexed_dates() for s in self._visible())))]
+
+    @property
+    def data_version(self) -> tuple:
+        """A value that changes whenever visible events, as displayed, change."""
+        return (self._generation, *(s.data_version for s in self._visible()))
+
+    def date_version(self, target_date: date) -> tuple:
+        """Get a value that changes whenever the date's visible events change."""
+        return (self._generation, *(s.date_version(target_date) for s in self._visible()))
+
+    def has_events(self, target_date: date) -> bool:
+        """Check if a date has any visible events."""
+        return any(store.has_events(target_date) for store in self._visible())
+
+    def dates_with_events(self, start: date, end: date) -> list[date]:
+        """Get the dates between start and end (inclusive) with visible events."""
+        merged = heapq.merge(*(s.dates_with_events(start, end) for s in self._visible()))
+        return [d for d, _ in groupby(merged)]
+
+    def get_overlapping(self, start: datetime, end: datetime) -> list[Event]:
+        """Get visible timed events overlapping [start, end), ordered by start."""
+        streams = [store.get_overlapping(start, end) for store in self._visible()]
+        return list(heapq.merge(*streams, key=lambda e: e.start_datetime))
+
+    @perf.timed("calendars.get_conflicts")
+    def get_conflicts(self, start: date, end: date) -> list[tuple[Event, Event]]:
+        """Get pairs of visible timed events that overlap, across calendars too."""
+        stores = self._visible()
+        if len(stores) == 1:
+            return stores[0].get_conflicts(start, end)
+        spans = chain.from_iterable(store.timed_spans(start, end) for store in stores)
+        return [(self.displayed(a), self.displayed(b)) for a, b in sweep_conflicts(spans)]
+
+    def conflict_dates(self, start: date, end: date) -> set[date]:
+        """Get the dates between start and end (inclusive) with overlapping events."""
+        return conflict_days(self.get_conflicts(start, end), start, end)
+
+    def conflicting_ids(self, target_date: date) -> set[str]:
+        """Get the ids of events that overlap another event on a date."""
+        return {e.id for pair in self.get_conflicts(target_date, target_date) for e in pair}
+
+    def search(self, query: str) -> list[Event]:
+        """Find visible events whose title or description contains the query."""
+        return list(heapq.merge(*(s.search(query) for s in self._visible()), key=lambda e: e.sort_key))
+
+
+def _configured(config: "Config") -> list[CalendarInfo]:
+    infos = [
+        CalendarInfo(c["name"], c["path"], c.get("color"), c.get("visible", True))
+        for c in config.calendars
+    ]
+    return infos or [CalendarInfo(DEFAULT_CALENDAR, Path.home() / ".cal" / "events.json")]
+
+
+def open_calendars(config: "Config", status_path: Optional[Path] = None) -> CalendarSet:
+    """Open the calendars listed in the config (or just events.json if none are)."""
+    infos = _configured(config)
+    return CalendarSet(
+        infos,
+        status_path=status_path,
+        history_depth=config.history_depth,
+        display_timezone=config.display_timezone,
+    )
+
+
+def open_indexed(config: "Config") -> IndexedCalendars:
+    """Open the visible calendars' date indexes for queries without a full load.
+
+    Raises IndexUnavailable if a calendar file can't be read that way.
+    """
+    return IndexedCalendars([
+        DateIndex(info.path, _archive_dir(info.path), config.display_timezone)
+        for info in _configured(config)
+        if info.visible
+    ])
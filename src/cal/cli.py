@@ -0,0 +1,393 @@
+"""Command-line entry point for the calendar application."""
+
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+
+def _print_events(events: list[dict]) -> None:
+    from .models import Event
+
+    if not events:
+        print("No events")
+        return
+    for data in events:
+        event = Event.from_dict(data)
+        print(f"{event.date.isoformat()}  {event.display_time:>7}  {event.title}")
+
+
+def _run_daemon(args: argparse.Namespace) -> int:
+    import logging
+    import signal
+
+    from . import perf
+    from .config import Config
+    from .calendars import open_calendars
+    from .daemon import CalendarDaemon
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    config = Config()
+    perf.enable_from_settings(config.perf)
+    storage = open_calendars(config, status_path=config.status_file)
+    daemon = CalendarDaemon(
+        storage=storage, socket_path=args.socket, reminder_hook=config.reminder_hook
+    )
+    # Turn SIGTERM into KeyboardInterrupt so the socket file gets cleaned up
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        daemon.serve_forever()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+QUERY_USAGE = {
+    "date": "date [YYYY-MM-DD]",
+    "range": "range START END (YYYY-MM-DD)",
+    "next": "next [COUNT]",
+    "month": "month [YEAR [MONTH]]",
+}
+
+
+def _run_query(args: argparse.Namespace) -> int:
+    from .client import CalendarClient
+
+    params: dict = {}
+    try:
+        if args.op == "date":
+            day = date.fromisoformat(args.args[0]) if args.args else date.today()
+            params["date"] = day.isoformat()
+        elif args.op == "range":
+            if len(args.args) != 2:
+                print("range needs START and END dates", file=sys.stderr)
+                return 2
+            params["start"], params["end"] = (date.fromisoformat(a).isoformat() for a in args.args)
+        elif args.op == "next":
+            params["count"] = int(args.args[0]) if args.args else 1
+            if params["count"] < 1:
+                raise ValueError
+        elif args.op == "search":
+            params["query"] = " ".join(args.args)
+        elif args.op == "month":
+            today = date.today()
+            year, month = (args.args + [today.year, today.month][len(args.args):])[:2]
+            params["year"], params["month"] = int(year), int(month)
+            date(params["year"], params["month"], 1)
+    except ValueError:
+        print(f"Use cal query {QUERY_USAGE[args.op]}", file=sys.stderr)
+        return 2
+
+    client = CalendarClient(socket_path=args.socket)
+    try:
+        result = client.request(args.op, **params)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result))
+    elif args.op == "month":
+        print("\n".join(result))
+    else:
+        _print_events(result)
+    return 0
+
+
+def _run_reminders(args: argparse.Namespace) -> int:
+    import signal
+    import threading
+
+    from .calendars import open_calendars
+    from .config import Config
+    from .reminders import Reminder, ReminderScheduler, run_hook
+
+    config = Config()
+    hook = args.hook or config.reminder_hook
+    storage = open_calendars(config)
+    scheduler = ReminderScheduler(storage)
+
+    def deliver(reminder: Reminder) -> None:
+        print(f"{reminder.fire_at.strftime('%Y-%m-%d %H:%M')}  {reminder.message()}", flush=True)
+        if hook:
+            run_hook(hook, reminder)
+
+    def watch(stop: threading.Event) -> None:
+        # Storage changes wake the scheduler, so edits from the TUI count
+        while not stop.wait(2):
+            storage.check_for_changes()
+
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(stop,), daemon=True).start()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        scheduler.run(deliver)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        scheduler.stop()
+    return 0
+
+
+# Horizon for `cal archive` when archive_after_days isn't set
+DEFAULT_ARCHIVE_DAYS = 365
+
+
+def _run_archive(args: argparse.Namespace) -> int:
+    from datetime import timedelta
+
+    from .calendars import open_calendars
+    from .config import Config
+
+    config = Config()
+    if args.before:
+        try:
+            cutoff = date.fromisoformat(args.before)
+        except ValueError:
+            print("Use --before YYYY-MM-DD", file=sys.stderr)
+            return 2
+    else:
+        days = args.days if args.days is not None else config.archive_after_days
+        if days is None:
+            days = DEFAULT_ARCHIVE_DAYS
+        cutoff = date.today() - timedelta(days=days)
+
+    moved = open_calendars(config).archive_before(cutoff)
+    print(f"Archived {moved} event(s) that ended before {cutoff.isoformat()}")
+    return 0
+
+
+def _run_dedupe(args: argparse.Namespace) -> int:
+    from .calendars import open_calendars
+    from .config import Config
+    from .dedupe import redundant_ids
+
+    storage = open_calendars(Config())
+    groups = storage.find_duplicates()
+    if not groups:
+        print("No duplicates")
+        return 0
+
+    if args.list:
+        for group in groups:
+            for i, event in enumerate(group):
+                mark = "keep  " if i == 0 else "delete"
+                print(f"{mark}  {event.date.isoformat()}  {event.display_time:>7}  {event.title}  {event.id}")
+            print()
+        return 0
+
+    if args.yes:
+        ids = redundant_ids(groups)
+    else:
+        from .widgets.dedupe_review import DedupeApp
+
+        ids = DedupeApp(groups).run()
+        if not ids:
+            print("Nothing deleted")
+            return 0
+
+    deleted = storage.delete_many(ids)
+    print(f"Deleted {deleted} duplicate event(s) from {len(groups)} group(s)")
+    return 0
+
+
+def _run_sync(args: argparse.Namespace) -> int:
+    from .calendars import open_calendars
+    from .config import Config
+    from .sync import HTTPTransport, SyncEngine, SyncError
+
+    config = Config()
+    url = args.url or config.sync_url
+    if not url:
+        print("No server configured: set sync_url in config.json or pass --url", file=sys.stderr)
+        return 2
+    calendars = open_calendars(config)
+    name = args.calendar or config.sync_calendar or calendars.default
+    if name not in calendars.stores:
+        print(f"Unknown calendar '{name}'", file=sys.stderr)
+        return 2
+
+    engine = SyncEngine(calendars.stores[name], HTTPTransport(url), url=url)
+    try:
+        stats = engine.sync()
+    except SyncError as e:
+        print(f"Sync failed: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(stats.as_dict()))
+    else:
+        print(f"Synced {name}: {stats.summary()}")
+    return 0
+
+
+def _run_stats(args: argparse.Namespace) -> int:
+    from datetime import timedelta
+
+    from .calendars import open_calendars
+    from .config import Config
+    from .stats import EventStats
+    from .tags import TagFilter
+
+    try:
+        end = date.fromisoformat(args.until) if args.until else date.today()
+        start = date.fromisoformat(args.since) if args.since else end - timedelta(days=364)
+        tag_filter = TagFilter.parse(args.tags or "")
+    except ValueError as e:
+        print(f"Use --since/--until YYYY-MM-DD and --tags '+tag tag -tag' ({e})", file=sys.stderr)
+        return 2
+
+    rows = EventStats(open_calendars(Config())).report(start, end, args.by, tag_filter)
+    if args.json:
+        print(json.dumps([
+            {"label": r.label, "events": r.events, "hours": round(r.hours, 2)} for r in rows
+        ]))
+        return 0
+
+    title = f"{start.isoformat()} to {end.isoformat()} by {args.by}"
+    print(title + (f" ({tag_filter})" if tag_filter else ""))
+    longest = max((r.minutes for r in rows), default=0) or 1
+    for row in rows:
+        bar = "#" * round(30 * row.minutes / longest)
+        print(f"{row.label:<12} {row.events:>6} events {row.hours:>8.1f} h  {bar}")
+    total = sum(r.minutes for r in rows) if args.by != "tag" else None
+    if total is not None:
+        print(f"{'total':<12} {sum(r.events for r in rows):>6} events {total / 60:>8.1f} h")
+    return 0
+
+
+def _run_free(args: argparse.Namespace) -> int:
+    from datetime import datetime, time, timedelta
+
+    from .calendars import open_calendars
+    from .config import Config
+    from .freeslots import find_free_slots
+    from .holidays_provider import HolidayProvider
+
+    try:
+        start_str, end_str = args.hours.split("-")
+        work_start, work_end = time.fromisoformat(start_str), time.fromisoformat(end_str)
+        start_date = date.fromisoformat(args.start) if args.start else date.today()
+    except ValueError:
+        print("Use --hours HH:MM-HH:MM and --from YYYY-MM-DD", file=sys.stderr)
+        return 2
+
+    config = Config()
+    slots = find_free_slots(
+        open_calendars(config),
+        timedelta(minutes=args.duration),
+        start_date,
+        start_date + timedelta(days=args.days - 1),
+        work_start=work_start,
+        work_end=work_end,
+        holiday_provider=HolidayProvider(config),
+        include_weekends=args.weekends,
+        limit=args.limit,
+        not_before=datetime.now(),
+    )
+
+    if args.json:
+        print(json.dumps([
+            {"start": s.start.isoformat(timespec="minutes"), "end": s.end.isoformat(timespec="minutes")}
+            for s in slots
+        ]))
+    elif not slots:
+        print("No free slots")
+    else:
+        for slot in slots:
+            print(f"{slot.start.strftime('%Y-%m-%d  %H:%M')}-{slot.end.strftime('%H:%M')}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point for the calendar application."""
+    parser = argparse.ArgumentParser(prog="cal", description="Terminal calendar")
+    parser.add_argument(
+        "--socket", type=Path, default=None, help="daemon socket path"
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("daemon", help="serve queries over a Unix socket")
+
+    query = commands.add_parser("query", help="query events (via the daemon if running)")
+    query.add_argument("op", choices=["date", "range", "next", "search", "month"])
+    query.add_argument("args", nargs="*")
+    query.add_argument("--json", action="store_true", help="print raw JSON")
+
+    free = commands.add_parser("free", help="find free time slots")
+    free.add_argument("--duration", type=int, default=60, help="minutes (default 60)")
+    free.add_argument("--from", dest="start", default=None, help="first date (default today)")
+    free.add_argument("--days", type=int, default=90, help="days to search (default 90)")
+    free.add_argument("--hours", default="09:00-17:00", help="working hours (default 09:00-17:00)")
+    free.add_argument("--weekends", action="store_true", help="include weekends")
+    free.add_argument("--limit", type=int, default=10, help="maximum slots (default 10)")
+    free.add_argument("--json", action="store_true", help="print raw JSON")
+
+    reminders = commands.add_parser("reminders", help="print reminders as they fall due")
+    reminders.add_argument("--hook", default=None, help="shell command to run for each reminder")
+
+    archive = commands.add_parser("archive", help="move past events into the archive")
+    archive.add_argument("--days", type=int, default=None, help="archive events that ended this many days ago (default: archive_after_days, else 365)")
+    archive.add_argument("--before", default=None, help="archive events that ended before this date")
+
+    dedupe = commands.add_parser("dedupe", help="find and delete duplicate events")
+    dedupe.add_argument("--yes", action="store_true", help="delete all but the first of each group without review")
+    dedupe.add_argument("--list", action="store_true", help="only print the duplicate groups")
+
+    sync = commands.add_parser("sync", help="sync a calendar with the team calendar server")
+    sync.add_argument("--url", default=None, help="server URL (default: sync_url from config.json)")
+    sync.add_argument("--calendar", default=None, help="calendar to sync (default: sync_calendar or the first)")
+    sync.add_argument("--json", action="store_true", help="print transfer statistics as JSON")
+
+    stats = commands.add_parser("stats", help="report time spent in events")
+    stats.add_argument("--since", default=None, help="first date (default a year before --until)")
+    stats.add_argument("--until", default=None, help="last date (default today)")
+    stats.add_argument(
+        "--by", choices=["week", "month", "weekday", "hour", "tag"], default="week",
+        help="grouping (default week)",
+    )
+    stats.add_argument("--tags", default=None, help="only count events matching a tag filter")
+    stats.add_argument("--json", action="store_true", help="print raw JSON")
+
+    args = parser.parse_args(argv)
+
+    from .config import ConfigError
+
+    try:
+        return _dispatch(args)
+    except ConfigError as e:
+        print(f"Invalid config.json: {e}", file=sys.stderr)
+        return 2
+
+
+def _dispatch(args: argparse.Namespace) -> int:
+    if args.command == "daemon":
+        return _run_daemon(args)
+    if args.command == "query":
+        return _run_query(args)
+    if args.command == "free":
+        return _run_free(args)
+    if args.command == "reminders":
+        return _run_reminders(args)
+    if args.command == "archive":
+        return _run_archive(args)
+    if args.command == "dedupe":
+        return _run_dedupe(args)
+    if args.command == "sync":
+        return _run_sync(args)
+    if args.command == "stats":
+        return _run_stats(args)
+
+    from .app import CalendarApp
+
+    CalendarApp().run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
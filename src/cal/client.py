@@ -0,0 +1,83 @@
+"""Thin client for the calendar daemon with a direct-read fallback."""
+
+import json
+import socket
+from pathlib import Path
+from typing import Any, Optional
+
+from .daemon import DEFAULT_SOCKET_PATH, handle_request
+
+# Queries the direct-read fallback answers through the date index
+INDEXED_OPS = frozenset({"date", "range", "next", "month"})
+
+
+class CalendarClient:
+    """Sends queries to a running daemon, or reads the events file directly."""
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        events_path: Optional[Path] = None,
+        timeout: float = 0.5,
+    ) -> None:
+        self.socket_path = socket_path or DEFAULT_SOCKET_PATH
+        self.events_path = events_path
+        self.timeout = timeout
+
+    def _ask_daemon(self, request: dict) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        return json.loads(line)
+
+    def _ask_index(self, request: dict) -> Optional[dict]:
+        """Answer a date query from the calendars' date indexes, if they can be used."""
+        from .dateindex import DateIndex, IndexUnavailable, IndexedCalendars
+
+        try:
+            if self.events_path is not None:
+                storage = IndexedCalendars([DateIndex(self.events_path)])
+            else:
+                from .calendars import open_indexed
+                from .config import Config
+
+                storage = open_indexed(Config())
+        except IndexUnavailable:
+            return None
+        try:
+            return handle_request(storage, request)
+        finally:
+            storage.close()
+
+    def _ask_storage(self, request: dict) -> dict:
+        # Date queries only parse the events they return
+        if request.get("op") in INDEXED_OPS:
+            response = self._ask_index(request)
+            if response is not None:
+                return response
+
+        if self.events_path is not None:
+            from .storage import EventStorage
+
+            return handle_request(EventStorage(self.events_path), request)
+
+        from .calendars import open_calendars
+        from .config import Config
+
+        return handle_request(open_calendars(Config()), request)
+
+    def request(self, op: str, **params: Any) -> Any:
+        """Run a query and return its result, raising ValueError on errors."""
+        request = {"op": op, **params}
+        try:
+            response = self._ask_daemon(request)
+        except (OSError, ValueError):
+            response = self._ask_storage(request)
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "Unknown error"))
+        return response["result"]
@@ -1,15 +1,48 @@
 """User configuration management for calendar app."""
 
+import copy
 import json
 import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+class ConfigError(ValueError):
+    """A setting in config.json has an invalid value."""
+
+
+# Recorded as the previous value of a setting the file didn't have
+_MISSING = object()
+
+
+@dataclass
+class ConfigChange:
+    """The settings that changed, with their previous values."""
+
+    old: dict[str, Any] = field(default_factory=dict)
+    # True when the change was read from a file edited by someone else
+    external: bool = False
+
+    @property
+    def keys(self) -> set[str]:
+        return set(self.old)
+
+    def __bool__(self) -> bool:
+        return bool(self.old)
+
 
 class Config:
-    """Manages user configuration settings."""
+    """Manages user configuration settings.
+
+    Setters write config.json straight away, unless made inside
+    transaction(), which writes once at the end. Listeners are told which
+    settings changed, including edits to the file picked up by
+    check_for_changes().
+    """
 
     def __init__(self, path: Optional[Path] = None):
         """Initialize config with file path."""
@@ -17,6 +50,13 @@ class Config:
             path = Path.home() / ".cal" / "config.json"
         self.path = path
         self._config: dict = {}
+        self._signature: Optional[tuple] = None
+        # Signature of a file that failed to parse on reload, so it isn't re-read every poll
+        self._rejected: Optional[tuple] = None
+        self._listeners: list[Callable[[ConfigChange], None]] = []
+        # Open transaction(s) and the change they have built up
+        self._depth = 0
+        self._pending = ConfigChange()
         self._load()
 
     def _default_config(self) -> dict:
@@ -25,31 +65,135 @@ class Config:
             "country": "US",
             "subdivision": None,
             "show_holidays": True,
+            "status_file": None,
+            "perf": False,
+            "reminder_hook": None,
+            "history_depth": 100,
+            "archive_after_days": None,
+            "calendars": [],
+            "display_timezone": None,
+            "sync_url": None,
+            "sync_calendar": None,
         }
 
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
     def _load(self) -> None:
-        """Load configuration from JSON file."""
+        """Load configuration from JSON file.
+
+        A file that doesn't parse is replaced by the defaults on the first
+        load only; a reload keeps the current settings until it is fixed.
+        """
         if not self.path.exists():
             self._config = self._default_config()
             self._save()
             return
 
+        signature = self._file_signature()
         try:
             with open(self.path, "r") as f:
-                self._config = json.load(f)
-            # Merge with defaults for any missing keys
-            for key, value in self._default_config().items():
-                if key not in self._config:
-                    self._config[key] = value
-        except json.JSONDecodeError as e:
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError("not a JSON object")
+        except ValueError as e:
+            if self._config:
+                logger.warning(f"Config file corrupted, keeping current settings: {e}")
+                self._rejected = signature
+                return
             logger.warning(f"Config file corrupted, using defaults: {e}")
-            self._config = self._default_config()
+            config = {}
+        # Merge with defaults for any missing keys
+        for key, value in self._default_config().items():
+            if key not in config:
+                config[key] = value
+        self._config = config
+        self._signature = signature
+        self._rejected = None
 
     def _save(self) -> None:
-        """Save configuration to JSON file."""
+        """Save configuration to JSON file atomically."""
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.path, "w") as f:
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w") as f:
             json.dump(self._config, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._signature = self._file_signature()
+
+    def add_listener(self, callback: Callable[[ConfigChange], None]) -> None:
+        """Register a callback invoked after settings change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[ConfigChange], None]) -> None:
+        """Unregister a change callback."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, change: ConfigChange) -> None:
+        for callback in list(self._listeners):
+            callback(change)
+
+    @contextmanager
+    def transaction(self) -> Iterator["Config"]:
+        """Batch several setters into one write and one change notification.
+
+        Nothing is written if the block raises; the values set so far are
+        rolled back.
+        """
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._depth == 1:
+                for key, value in self._pending.old.items():
+                    if value is _MISSING:
+                        self._config.pop(key, None)
+                    else:
+                        self._config[key] = copy.deepcopy(value)
+                self._pending = ConfigChange()
+            raise
+        finally:
+            self._depth -= 1
+        if self._depth == 0:
+            change, self._pending = self._pending, ConfigChange()
+            change.old = {k: None if v is _MISSING else v for k, v in change.old.items()}
+            if change:
+                self._save()
+                self._notify(change)
+
+    def _set(self, key: str, value: Any) -> None:
+        """Change a setting, writing it now unless a transaction is open."""
+        if self._config.get(key) == value:
+            return
+        with self.transaction():
+            old = self._config.get(key, _MISSING)
+            self._pending.old.setdefault(key, old if old is _MISSING else copy.deepcopy(old))
+            self._config[key] = value
+
+    def check_for_changes(self) -> Optional[ConfigChange]:
+        """Reload config.json if it was edited, notifying listeners of what changed.
+
+        Polling is a single stat() call.
+        """
+        if self._depth:
+            return None
+        signature = self._file_signature()
+        if signature == self._signature or (self._rejected and signature == self._rejected):
+            return None
+        before = self._config
+        self._load()
+        keys = set(before) | set(self._config)
+        change = ConfigChange(
+            old={k: before.get(k) for k in keys if before.get(k) != self._config.get(k)},
+            external=True,
+        )
+        if change:
+            self._notify(change)
+        return change
 
     @property
     def country(self) -> str:
@@ -59,8 +203,7 @@ class Config:
     @country.setter
     def country(self, value: str) -> None:
         """Set country code."""
-        self._config["country"] = value
-        self._save()
+        self._set("country", value)
 
     @property
     def subdivision(self) -> Optional[str]:
@@ -70,8 +213,7 @@ class Config:
     @subdivision.setter
     def subdivision(self, value: Optional[str]) -> None:
         """Set subdivision/state code."""
-        self._config["subdivision"] = value
-        self._save()
+        self._set("subdivision", value)
 
     @property
     def show_holidays(self) -> bool:
@@ -81,5 +223,89 @@ class Config:
     @show_holidays.setter
     def show_holidays(self, value: bool) -> None:
         """Set whether to show holidays."""
-        self._config["show_holidays"] = value
-        self._save()
+        self._set("show_holidays", value)
+
+    @property
+    def status_file(self) -> Optional[Path]:
+        """Get the path of the precomputed status file, if enabled."""
+        value = self._config.get("status_file")
+        return Path(value).expanduser() if value else None
+
+    @property
+    def perf(self) -> bool:
+        """Get whether hot-path timing instrumentation is enabled."""
+        return self._config.get("perf", False)
+
+    @property
+    def reminder_hook(self) -> Optional[str]:
+        """Get the shell command run for each reminder, if any."""
+        return self._config.get("reminder_hook")
+
+    @property
+    def history_depth(self) -> int:
+        """Get how many changes can be undone. Raises ConfigError if invalid."""
+        depth = self._config.get("history_depth", 100)
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 0:
+            raise ConfigError(f"history_depth must be a whole number of at least 0, not {depth!r}")
+        return depth
+
+    @property
+    def archive_after_days(self) -> Optional[int]:
+        """Get how many days after they end events are archived on startup (None to never)."""
+        return self._config.get("archive_after_days")
+
+    @property
+    def display_timezone(self) -> Optional[str]:
+        """Get the IANA zone events are shown in (None for the system zone)."""
+        return self._config.get("display_timezone")
+
+    @display_timezone.setter
+    def display_timezone(self, value: Optional[str]) -> None:
+        """Set the display zone (None for the system zone)."""
+        self._set("display_timezone", value)
+
+    @property
+    def sync_url(self) -> Optional[str]:
+        """Get the URL of the calendar server `cal sync` talks to, if any."""
+        return self._config.get("sync_url")
+
+    @property
+    def sync_calendar(self) -> Optional[str]:
+        """Get the name of the calendar to sync (None for the first one)."""
+        return self._config.get("sync_calendar")
+
+    @property
+    def calendars(self) -> list[dict]:
+        """Get the configured calendars as dicts of name, path, color and visible.
+
+        Paths default to ~/.cal/<name>.json. An empty list means the single
+        events.json calendar.
+
+        Raises ConfigError for an entry without a name, or a name used twice.
+        """
+        result = []
+        names = set()
+        for entry in self._config.get("calendars") or []:
+            name = entry.get("name") if isinstance(entry, dict) else None
+            if not isinstance(name, str) or not name.strip():
+                raise ConfigError(f"Each entry of calendars needs a \"name\": {entry!r}")
+            if name in names:
+                raise ConfigError(f"Duplicate calendar name '{name}'")
+            names.add(name)
+            path = entry.get("path") or Path.home() / ".cal" / f"{name}.json"
+            result.append({
+                "name": name,
+                "path": Path(path).expanduser(),
+                "color": entry.get("color"),
+                "visible": entry.get("visible", True),
+            })
+        return result
+
+    def set_calendar_visible(self, name: str, visible: bool) -> None:
+        """Remember whether a configured calendar is shown."""
+        entries = copy.deepcopy(self._config.get("calendars") or [])
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get("name") == name:
+                entry["visible"] = visible
+                self._set("calendars", entries)
+                return
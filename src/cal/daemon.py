@@ -0,0 +1,185 @@
+"""Long-running daemon serving calendar queries over a Unix socket.
+
+The protocol is line-delimited JSON. Each request is a single object with an
+``op`` key and its parameters, and each response is a single object with
+``ok`` and either ``result`` or ``error``:
+
+    {"op": "date", "date": "2026-01-05"}
+    {"op": "range", "start": "2026-01-01", "end": "2026-01-31"}
+    {"op": "next", "count": 3}
+    {"op": "search", "query": "standup"}
+    {"op": "month", "year": 2026, "month": 1}
+    {"op": "ping"}
+"""
+
+import calendar
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+from .reminders import Reminder, ReminderScheduler, run_hook
+from .storage import EventStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path.home() / ".cal" / "cal.sock"
+
+
+def _events_result(events) -> list[dict]:
+    return [e.to_dict() for e in events]
+
+
+def handle_request(storage: EventStorage, request: dict) -> dict:
+    """Run a single protocol request against a storage and build the response."""
+    try:
+        op = request.get("op")
+        if op == "ping":
+            result = "pong"
+        elif op == "date":
+            result = _events_result(
+                storage.get_by_date(date.fromisoformat(request["date"]))
+            )
+        elif op == "range":
+            result = _events_result(
+                storage.get_range(
+                    date.fromisoformat(request["start"]),
+                    date.fromisoformat(request["end"]),
+                )
+            )
+        elif op == "next":
+            result = _events_result(
+                storage.get_next(datetime.now(), int(request.get("count", 1)))
+            )
+        elif op == "search":
+            result = _events_result(storage.search(str(request["query"])))
+        elif op == "month":
+            year, month = int(request["year"]), int(request["month"])
+            last_day = calendar.monthrange(year, month)[1]
+            result = [
+                d.isoformat()
+                for d in storage.dates_with_events(
+                    date(year, month, 1), date(year, month, last_day)
+                )
+            ]
+        else:
+            return {"ok": False, "error": f"Unknown op: {op!r}"}
+    except (KeyError, TypeError, ValueError) as e:
+        return {"ok": False, "error": f"Bad request: {e}"}
+    return {"ok": True, "result": result}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serves line-delimited JSON requests on one connection."""
+
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be an object")
+            except ValueError as e:
+                response = {"ok": False, "error": f"Invalid JSON: {e}"}
+            else:
+                with self.server.daemon.lock:
+                    response = handle_request(self.server.daemon.storage, request)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: "CalendarDaemon") -> None:
+        self.daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+class CalendarDaemon:
+    """Keeps an EventStorage resident and answers queries over a Unix socket."""
+
+    def __init__(
+        self,
+        storage: Optional[EventStorage] = None,
+        socket_path: Optional[Path] = None,
+        poll_interval: float = 1.0,
+        reminder_hook: Optional[str] = None,
+    ) -> None:
+        self.storage = storage or EventStorage()
+        self.socket_path = socket_path or DEFAULT_SOCKET_PATH
+        self.poll_interval = poll_interval
+        self.reminder_hook = reminder_hook
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server: Optional[_DaemonServer] = None
+
+    def _watch(self) -> None:
+        """Reload the storage whenever the events file changes on disk.
+
+        Also keeps the status file's time-relative fields current.
+        """
+        while not self._stop.wait(self.poll_interval):
+            with self.lock:
+                change = self.storage.check_for_changes()
+                if change:
+                    logger.info(
+                        f"Reloaded {len(change.added | change.updated | change.removed)}"
+                        " changed events"
+                    )
+                self.storage.write_status()
+
+    def _deliver(self, reminder: Reminder) -> None:
+        logger.info(f"Reminder: {reminder.message()}")
+        if self.reminder_hook:
+            run_hook(self.reminder_hook, reminder)
+
+    def _claim_socket(self) -> None:
+        """Remove a stale socket file, refusing to replace a live daemon."""
+        if not self.socket_path.exists():
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def serve_forever(self) -> None:
+        """Serve requests until shutdown() is called."""
+        self._claim_socket()
+        self._server = _DaemonServer(str(self.socket_path), self)
+        os.chmod(self.socket_path, 0o600)
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        with self.lock:
+            reminders = ReminderScheduler(self.storage)
+        threading.Thread(target=reminders.run, args=(self._deliver,), daemon=True).start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stop.set()
+            reminders.stop()
+            self._server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self) -> None:
+        """Stop serving requests."""
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
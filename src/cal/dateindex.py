@@ -0,0 +1,408 @@
+"""Memory-mapped date index for answering date queries without a full load.
+
+EventStorage writes events.json with one event per line, after a header
+line carrying a generation counter that every save bumps (and the token of
+the description blob, see cal.descriptions). Next to it, each
+save writes ``events.json.idx``: the byte range of every event line, and for
+each day (as an ordinal) the lines of the events covering it, in display
+order. Both files are read through mmap, so looking up a day or a short
+window only parses the events it returns and touches a few pages.
+
+The index is checked against the data file's generation and size, and
+rebuilt from events.json when it doesn't match (e.g. after a crash, or an
+older cal wrote the file). Journal records written since the save are
+replayed on top, as EventStorage does.
+
+Events with a timezone are listed separately: their displayed date depends
+on the display zone, so they are converted on read. There are usually few.
+
+Layout of the index file (native byte order), each array following the
+previous one:
+
+    header     magic, generation, data size and the array lengths
+    offsets    uint64 per event line
+    lengths    uint32 per event line
+    ordinals   int32 per day with events, ascending
+    starts     uint32 per day plus one: where each day's lines start in postings
+    postings   uint32 line numbers
+    zoned      uint32 line numbers of events with a timezone
+"""
+
+import bisect
+import heapq
+import json
+import logging
+import mmap
+import os
+import re
+from array import array
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from . import perf
+from .descriptions import DescriptionStore
+from .models import Event
+from .timezones import ZoneConverter
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CALIDX01"
+_HEADER = "<8sqQIIII"
+_HEADER_SIZE = 40
+_GENERATION = re.compile(rb'^\{"generation": (\d+), (?:"descriptions": "(\w+)", )?"events": \[$')
+
+
+class IndexUnavailable(Exception):
+    """The data file can't be read through an index (missing or not versioned)."""
+
+
+def index_path(path: Path) -> Path:
+    """Path of the index for a data file."""
+    return path.with_name(path.name + ".idx")
+
+
+def data_header(generation: int, descriptions: Optional[str] = None) -> str:
+    """First line of a data file with the given generation and description blob token."""
+    if descriptions is None:
+        return f'{{"generation": {generation}, "events": [\n'
+    return f'{{"generation": {generation}, "descriptions": "{descriptions}", "events": [\n'
+
+
+def write_index(
+    path: Path,
+    generation: int,
+    data_size: int,
+    offsets: list[int],
+    lengths: list[int],
+    days: Iterable[tuple[int, list[int]]],
+    zoned: list[int],
+) -> None:
+    """Write the index of a data file atomically.
+
+    `offsets` and `lengths` give the byte range of each event line, `days`
+    the ascending (ordinal, line numbers) of each day with events, and
+    `zoned` the line numbers of events with a timezone.
+    """
+    import struct
+
+    ordinals = array("i")
+    starts = array("I")
+    postings = array("I")
+    for ordinal, lines in days:
+        ordinals.append(ordinal)
+        starts.append(len(postings))
+        postings.extend(lines)
+    starts.append(len(postings))
+
+    header = struct.pack(
+        _HEADER, MAGIC, generation, data_size,
+        len(offsets), len(ordinals), len(postings), len(zoned),
+    )
+    target = index_path(path)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        parts = (array("Q", offsets), array("I", lengths), ordinals, starts, postings, array("I", zoned))
+        for part in parts:
+            part.tofile(f)
+    os.replace(tmp_path, target)
+
+
+class DateIndex:
+    """Read-only date queries on one calendar file through its index."""
+
+    def __init__(
+        self,
+        path: Path,
+        archive_dir: Optional[Path] = None,
+        display_timezone: Optional[str] = None,
+    ) -> None:
+        """Open the data file and its index, rebuilding the index if stale.
+
+        Raises IndexUnavailable if the file is missing or has no generation.
+        """
+        self.path = path
+        self.archive_dir = archive_dir or path.parent / "archive"
+        self._zones = ZoneConverter(display_timezone)
+        self._parsed: dict[int, Optional[Event]] = {}
+        try:
+            with open(path, "rb") as f:
+                self._stat = os.fstat(f.fileno())
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as e:
+            raise IndexUnavailable(f"Cannot map {path}: {e}") from e
+        first = self._data[: self._data.find(b"\n")]
+        match = _GENERATION.match(first)
+        if match is None:
+            raise IndexUnavailable(f"{path} has no generation")
+        self.generation = int(match.group(1))
+        self._header_size = len(first) + 1
+        self._descriptions = DescriptionStore(path)
+        if match.group(2):
+            self._descriptions.open(match.group(2).decode())
+        if not self._map_index():
+            self._rebuild()
+        self._overrides = self._read_journal()
+        self._extras: Optional[list[Event]] = None
+
+    def _map_index(self) -> bool:
+        """Map the index file if it matches the data file."""
+        import struct
+
+        try:
+            with open(index_path(self.path), "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+        if len(index) < _HEADER_SIZE:
+            return False
+        magic, generation, data_size, n_lines, n_days, n_postings, n_zoned = struct.unpack_from(
+            _HEADER, index
+        )
+        if magic != MAGIC or generation != self.generation or data_size != len(self._data):
+            return False
+        view = memoryview(index)
+        pos = _HEADER_SIZE
+
+        def take(typecode: str, count: int) -> memoryview:
+            nonlocal pos
+            size = array(typecode).itemsize * count
+            part = view[pos:pos + size].cast(typecode)
+            pos += size
+            return part
+
+        self._offsets = take("Q", n_lines)
+        self._lengths = take("I", n_lines)
+        self._ordinals = take("i", n_days)
+        self._starts = take("I", n_days + 1)
+        self._postings = take("I", n_postings)
+        self._zoned = take("I", n_zoned)
+        return pos == len(index)
+
+    @perf.timed("dateindex.rebuild")
+    def _rebuild(self) -> None:
+        """Index the data file from scratch and write the index for next time."""
+        logger.info(f"Rebuilding date index for {self.path}")
+        data = self._data
+        spans: list[tuple[int, int]] = []
+        by_day: dict[int, list[tuple[tuple, int]]] = {}
+        zoned: list[int] = []
+        pos = self._header_size
+        while pos < len(data):
+            end = data.find(b"\n", pos)
+            if end < 0:
+                end = len(data)
+            line = data[pos:end].rstrip(b",")
+            if line.startswith(b"]"):
+                break
+            if not line:
+                pos = end + 1
+                continue
+            number = len(spans)
+            spans.append((pos, len(line)))
+            try:
+                event = self._parse(line)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid event: {e}")
+                event = None
+            self._parsed[number] = event
+            if event is not None and event.tz is not None:
+                zoned.append(number)
+            elif event is not None:
+                for day in event.dates():
+                    by_day.setdefault(day.toordinal(), []).append((event.sort_key, number))
+            pos = end + 1
+        days = [
+            (ordinal, [number for _, number in sorted(by_day[ordinal])])
+            for ordinal in sorted(by_day)
+        ]
+        try:
+            write_index(
+                self.path, self.generation, len(data),
+                [offset for offset, _ in spans], [length for _, length in spans], days, zoned,
+            )
+        except OSError as e:
+            logger.warning(f"Could not write date index: {e}")
+
+        self._offsets = array("Q", (offset for offset, _ in spans))
+        self._lengths = array("I", (length for _, length in spans))
+        self._ordinals = array("i", (ordinal for ordinal, _ in days))
+        self._starts = array("I")
+        self._postings = array("I")
+        for _, lines in days:
+            self._starts.append(len(self._postings))
+            self._postings.extend(lines)
+        self._starts.append(len(self._postings))
+        self._zoned = array("I", zoned)
+
+    def _read_journal(self) -> dict[str, Optional[Event]]:
+        """Events changed by journal records since the save, latest first wins."""
+        overrides: dict[str, Optional[Event]] = {}
+        base = [self._stat.st_mtime_ns, self._stat.st_size, self._stat.st_ino]
+        try:
+            with open(self.path.with_name(self.path.name + ".journal"), "rb") as f:
+                if json.loads(f.readline()).get("base") != base:
+                    return overrides
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return overrides
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable journal: {e}")
+            return overrides
+        for line in lines:
+            try:
+                record = json.loads(line)
+                after = record["after"]
+                overrides[record["id"]] = Event.from_dict(after) if after is not None else None
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid journal record: {e}")
+        return overrides
+
+    def _parse(self, line: bytes) -> Event:
+        """An event from a data file line, its description left in the blob."""
+        data = json.loads(line)
+        return self._descriptions.defer(Event.from_dict(data), data)
+
+    def _event(self, number: int) -> Optional[Event]:
+        """Parse an event line (once), or None if it is invalid."""
+        if number not in self._parsed:
+            offset = self._offsets[number]
+            try:
+                event = self._parse(self._data[offset:offset + self._lengths[number]])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid event: {e}")
+                event = None
+            self._parsed[number] = event
+        return self._parsed[number]
+
+    def _extra_events(self) -> list[Event]:
+        """Journaled and zoned events, as displayed, sorted."""
+        if self._extras is None:
+            extras = [e for e in self._overrides.values() if e is not None]
+            for number in self._zoned:
+                event = self._event(number)
+                if event is not None and event.id not in self._overrides:
+                    extras.append(event)
+            self._extras = sorted((self._zones.convert(e) for e in extras), key=lambda e: e.sort_key)
+        return self._extras
+
+    def _archived(self, start: date, end: date) -> list[Event]:
+        """Archived events starting in the years between two dates, as displayed."""
+        from .archive import ArchiveStore
+
+        archive = ArchiveStore(self.archive_dir)
+        years = [y for y in archive.scan() if start.year <= y <= end.year]
+        events = [self._zones.convert(e) for y in years for e in archive.load_year(y)]
+        return sorted(events, key=lambda e: e.sort_key)
+
+    def _indexed(self, start: date, end: date) -> Iterator[Event]:
+        """Events from the index covering days between two dates, day by day."""
+        lo = bisect.bisect_left(self._ordinals, start.toordinal())
+        hi = bisect.bisect_right(self._ordinals, end.toordinal())
+        # Events covering several days are listed under each; only the
+        # first keeps the stream in display order
+        seen: set[int] = set()
+        for i in range(lo, hi):
+            for number in self._postings[self._starts[i]:self._starts[i + 1]]:
+                if number in seen:
+                    continue
+                seen.add(number)
+                event = self._event(number)
+                if event is not None and event.id not in self._overrides:
+                    yield event
+
+    def iter_range(self, start: date, end: date) -> Iterator[Event]:
+        """Iterate events between two dates (inclusive), each once, in display order."""
+        def covers(event: Event) -> bool:
+            return event.date <= end and event.last_date >= start
+
+        def key(event: Event) -> tuple:
+            return (max(event.date, start), event.sort_key)
+
+        extras = [e for e in self._extra_events() if covers(e)]
+        if self.archive_dir.exists():
+            extras = list(heapq.merge(
+                extras, (e for e in self._archived(start, end) if covers(e)), key=key
+            ))
+        seen: set[str] = set()
+        for event in heapq.merge(self._indexed(start, end), extras, key=key):
+            if event.id not in seen:
+                seen.add(event.id)
+                yield event
+
+    @perf.timed("dateindex.get_by_date")
+    def get_by_date(self, target_date: date) -> list[Event]:
+        """Get all events for a specific date."""
+        return list(self.iter_range(target_date, target_date))
+
+    @perf.timed("dateindex.get_range")
+    def get_range(self, start: date, end: date) -> list[Event]:
+        """Get all events between two dates (inclusive)."""
+        return list(self.iter_range(start, end))
+
+    def get_upcoming(self, from_date: date, days: int = 30) -> list[Event]:
+        """Get upcoming events within specified days."""
+        from datetime import timedelta
+
+        return self.get_range(from_date, from_date + timedelta(days=days))
+
+    def dates_with_events(self, start: date, end: date) -> list[date]:
+        """Get the dates between start and end (inclusive) that have events."""
+        return sorted({
+            day for event in self.iter_range(start, end)
+            for day in event.dates() if start <= day <= end
+        })
+
+    def close(self) -> None:
+        self._data.close()
+
+
+def _upcoming(events: Iterator[Event], now: datetime) -> Iterator[Event]:
+    """Events that have not started yet; all-day events today still count."""
+    today = now.date()
+    for event in events:
+        if event.date < today or (event.time and event.start_datetime < now):
+            continue
+        yield event
+
+
+class IndexedCalendars:
+    """Date queries merged across several calendar files' indexes.
+
+    Implements the storage methods the daemon protocol uses for date, range,
+    next and month queries.
+    """
+
+    def __init__(self, indexes: list[DateIndex]) -> None:
+        self.indexes = indexes
+
+    def iter_range(self, start: date, end: date) -> Iterator[Event]:
+        return heapq.merge(
+            *(index.iter_range(start, end) for index in self.indexes),
+            key=lambda e: (max(e.date, start), e.sort_key),
+        )
+
+    def get_by_date(self, target_date: date) -> list[Event]:
+        """Get all events for a specific date."""
+        return list(self.iter_range(target_date, target_date))
+
+    def get_range(self, start: date, end: date) -> list[Event]:
+        """Get all events between two dates (inclusive)."""
+        return list(self.iter_range(start, end))
+
+    def get_next(self, now: datetime, count: int = 1) -> list[Event]:
+        """Get the next events that have not started yet."""
+        return list(islice(_upcoming(self.iter_range(now.date(), date.max), now), count))
+
+    def dates_with_events(self, start: date, end: date) -> list[date]:
+        """Get the dates between start and end (inclusive) that have events."""
+        return sorted(set().union(*(i.dates_with_events(start, end) for i in self.indexes)))
+
+    def search(self, query: str) -> list[Event]:
+        raise IndexUnavailable("Searching needs the full store")
+
+    def close(self) -> None:
+        for index in self.indexes:
+            index.close()
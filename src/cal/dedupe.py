@@ -0,0 +1,56 @@
+"""Detection of duplicate events that differ only in id.
+
+Events are grouped by their content: every field but the id, with the
+title and description compared ignoring case and runs of whitespace. Events
+that differ in anything else (end, timezone, tags, reminders) are not
+duplicates, since deleting one would lose it. Grouping is a single pass over
+a dict. The first event of each group, in storage order, is the one to keep.
+Descriptions may have to be read from disk, so they are only compared
+between events that already match on everything else.
+"""
+
+from typing import Iterable
+
+from .models import Event
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def _key(event: Event) -> tuple:
+    """Everything but the id and description that duplicates must share."""
+    return (
+        _normalize(event.title),
+        event.date,
+        event.time,
+        event.end_date,
+        event.end_time,
+        event.tz,
+        tuple(event.tags),
+        tuple(event.reminders),
+    )
+
+
+def group_duplicates(events: Iterable[Event]) -> list[list[Event]]:
+    """Group events with the same content, keeping only groups of two or more.
+
+    Groups are ordered by date and time, and events within a group by
+    their order in `events`.
+    """
+    candidates: dict[tuple, list[Event]] = {}
+    for event in events:
+        candidates.setdefault(_key(event), []).append(event)
+    groups: dict[tuple, list[Event]] = {}
+    for key, group in candidates.items():
+        if len(group) > 1:
+            for event in group:
+                groups.setdefault(key + (_normalize(event.description),), []).append(event)
+    duplicates = [group for group in groups.values() if len(group) > 1]
+    duplicates.sort(key=lambda group: group[0].sort_key)
+    return duplicates
+
+
+def redundant_ids(groups: list[list[Event]]) -> list[str]:
+    """Ids of every event but the first in each group."""
+    return [event.id for group in groups for event in group[1:]]
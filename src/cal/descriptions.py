@@ -0,0 +1,240 @@
+"""Event descriptions stored out of line, in a blob file next to events.json.
+
+Long descriptions are most of a calendar's bytes, but only the selected
+event or the event form shows them. events.json keeps a reference per
+description, ``[offset, length, hash]`` into ``events.json.<token>.desc``,
+and the text is read when first needed, through a small LRU cache. Loading
+events and date queries never read those bytes. Descriptions of up to
+INLINE_MAX bytes stay in events.json: a reference takes about as much
+memory as they do.
+
+Each distinct text is stored once, keyed by its hash. Saves append new texts
+to the blob. Once most of it is no longer referenced, a save writes the live
+texts to a blob with a new token instead, and the one before is kept until
+the next such rewrite. events.json names the token its references are for.
+Readers keep the blob they resolved references against open, so another
+process rewriting it doesn't move bytes from under events they have loaded.
+A blob's file is closed once no event refers to it any more.
+"""
+
+import hashlib
+import logging
+import os
+import weakref
+from pathlib import Path
+from typing import Optional
+
+from . import perf
+from .lru import LRUCache
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+# Texts kept in memory once read
+CACHE_SIZE = 256
+# Longest description (in UTF-8 bytes) kept in events.json
+INLINE_MAX = 128
+# Unreferenced bytes tolerated before a save rewrites the blob
+MIN_GARBAGE = 64 * 1024
+
+
+def text_hash(text: str) -> str:
+    """Short content hash identifying a description."""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def is_inline(text: str) -> bool:
+    """Whether a description is short enough to stay in events.json."""
+    return len(text.encode()) <= INLINE_MAX
+
+
+def blob_path(path: Path, token: str) -> Path:
+    """Path of a data file's description blob with the given token."""
+    return path.with_name(f"{path.name}.{token}.desc")
+
+
+class DescriptionBlob:
+    """One blob file, read through an LRU cache of texts by hash."""
+
+    def __init__(self, path: Path, token: str, cache: LRUCache[str, str]) -> None:
+        self.path = path
+        self.token = token
+        self._cache = cache
+        self._file = open(path, "rb")
+        # Events (and their display copies) hold the blob while they defer
+        # to it; it can be superseded well before the last one goes
+        weakref.finalize(self, self._file.close)
+        # Where the texts known to be in the file are, by hash
+        self.stored: dict[str, tuple[int, int]] = {}
+
+    def read(self, ref: list) -> str:
+        """The text a reference points to ("" if the blob doesn't hold it)."""
+        offset, length, digest = ref
+        text = self._cache.get(digest)
+        if text is None:
+            with perf.span("descriptions.read"):
+                self._file.seek(offset)
+                data = self._file.read(length)
+            text = data.decode("utf-8", "replace")
+            if len(data) != length or text_hash(text) != digest:
+                logger.warning(f"Description {digest} missing from {self.path}")
+                return ""
+            self._cache.put(digest, text)
+        return text
+
+    def digest(self, ref: list) -> str:
+        """The hash of the text a reference points to."""
+        return ref[2]
+
+    def holds(self, ref: list, text: str) -> bool:
+        """Whether a reference points to the given text, without reading it."""
+        return text_hash(text) == ref[2]
+
+    def size(self) -> int:
+        return os.fstat(self._file.fileno()).st_size
+
+    @perf.timed("descriptions.search")
+    def matching(self, needle: str) -> set[str]:
+        """Hashes of the stored texts containing a casefolded string.
+
+        Reads the blob in one go rather than text by text.
+        """
+        self._file.seek(0)
+        data = self._file.read()
+        return {
+            digest
+            for digest, (offset, length) in self.stored.items()
+            if needle in data[offset:offset + length].decode("utf-8", "replace").casefold()
+        }
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class DescriptionStore:
+    """The current description blob of a data file, and writing it on save."""
+
+    def __init__(self, path: Path, cache_size: int = CACHE_SIZE) -> None:
+        self.path = path
+        self._cache: LRUCache[str, str] = LRUCache(cache_size)
+        self.blob: Optional[DescriptionBlob] = None
+
+    def open(self, token: Optional[str]) -> Optional[DescriptionBlob]:
+        """Switch to the blob named by a freshly read data file.
+
+        Returns None if the file names none, or its blob is missing (its
+        events then show no description).
+        """
+        if token is None:
+            self.blob = None
+        elif self.blob is None or self.blob.token != token:
+            try:
+                self.blob = DescriptionBlob(blob_path(self.path, token), token, self._cache)
+            except OSError as e:
+                logger.error(f"Cannot read descriptions: {e}")
+                self.blob = None
+        return self.blob
+
+    def register(self, data: dict) -> None:
+        """Note where a data file line says its description is stored."""
+        ref = data.get("desc")
+        if ref is not None and self.blob is not None:
+            self.blob.stored[ref[2]] = (ref[0], ref[1])
+
+    def defer(self, event: Event, data: dict) -> Event:
+        """Point an event parsed from a data file line at its stored description."""
+        ref = data.get("desc")
+        if ref is not None and self.blob is not None:
+            event.defer_description(self.blob, ref)
+        return event
+
+    @perf.timed("descriptions.save")
+    def save(self, events: list[Event]) -> tuple[Optional[str], list[Optional[list]]]:
+        """Store the descriptions of events about to be written to the data file.
+
+        Returns the token to record in the file and each event's reference
+        (None if its description, if any, stays inline). The events keep
+        only the reference afterwards.
+        """
+        # Hash of each event's stored description, and where to get its bytes
+        digests: list[Optional[str]] = []
+        lengths: dict[str, int] = {}
+        sources: dict[str, tuple] = {}
+        for event in events:
+            deferred = event.deferred_description
+            if deferred is not None:
+                source, ref = deferred
+                digest = ref[2]
+                lengths[digest] = ref[1]
+                sources.setdefault(digest, deferred)
+            elif is_inline(text := event.description):
+                digest = None
+            else:
+                data = text.encode()
+                digest = text_hash(text)
+                lengths[digest] = len(data)
+                sources[digest] = (None, data)
+            digests.append(digest)
+
+        def data_of(digest: str) -> bytes:
+            source, ref = sources[digest]
+            return ref if source is None else source.read(ref).encode()
+
+        blob = self.blob
+        live = sum(lengths.values())
+        missing = [d for d in lengths if blob is None or d not in blob.stored]
+        garbage = 0
+        if blob is not None:
+            garbage = blob.size() + sum(lengths[d] for d in missing) - live
+        if not lengths:
+            self.blob = None
+        elif blob is None or garbage > max(live, MIN_GARBAGE):
+            self._rewrite(list(lengths), data_of)
+        elif missing:
+            with open(blob.path, "ab") as f:
+                for digest in missing:
+                    data = data_of(digest)
+                    blob.stored[digest] = (f.tell(), len(data))
+                    f.write(data)
+        if self.blob is not blob or blob is None:
+            self._remove_old(blob)
+
+        blob = self.blob
+        refs: list[Optional[list]] = []
+        for event, digest in zip(events, digests):
+            if digest is None:
+                refs.append(None)
+                continue
+            ref = [*blob.stored[digest], digest]
+            event.defer_description(blob, ref)
+            refs.append(ref)
+        return (blob.token if blob else None), refs
+
+    def _rewrite(self, digests: list[str], data_of) -> None:
+        """Write the given texts to a blob with a new token and switch to it."""
+        token = os.urandom(4).hex()
+        target = blob_path(self.path, token)
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        stored = {}
+        with open(tmp_path, "wb") as f:
+            for digest in digests:
+                data = data_of(digest)
+                stored[digest] = (f.tell(), len(data))
+                f.write(data)
+        os.replace(tmp_path, target)
+        self.blob = DescriptionBlob(target, token, self._cache)
+        self.blob.stored = stored
+
+    def _remove_old(self, previous: Optional[DescriptionBlob]) -> None:
+        """Delete blobs other than the current one and `previous`.
+
+        The previous blob stays for readers that loaded the data file
+        before this save and haven't opened its blob yet.
+        """
+        keep = {b.path.name for b in (self.blob, previous) if b is not None}
+        for path in self.path.parent.glob(f"{self.path.name}.*.desc"):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove {path}: {e}")
@@ -0,0 +1,77 @@
+"""Free-slot finder over the timed events in storage."""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional, TYPE_CHECKING
+
+from . import perf
+
+if TYPE_CHECKING:
+    from .holidays_provider import HolidayProvider
+    from .storage import EventStorage
+
+
+@dataclass(frozen=True)
+class FreeSlot:
+    """A free gap between busy periods."""
+
+    start: datetime
+    end: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+
+@perf.timed("freeslots.find")
+def find_free_slots(
+    storage: "EventStorage",
+    duration: timedelta,
+    start_date: date,
+    end_date: date,
+    work_start: time = time(9, 0),
+    work_end: time = time(17, 0),
+    holiday_provider: Optional["HolidayProvider"] = None,
+    include_weekends: bool = False,
+    limit: int = 10,
+    point_duration: timedelta = timedelta(minutes=30),
+    not_before: Optional[datetime] = None,
+) -> list[FreeSlot]:
+    """Find the earliest gaps of at least `duration` within working hours.
+
+    Days are skipped if they are weekends (unless `include_weekends`) or
+    holidays. All-day events do not block time. Timed events without an
+    end time block `point_duration`. Each day is one overlap query on the
+    interval index, followed by a sweep over the busy intervals in start
+    order.
+    """
+    if not_before and (not_before.second or not_before.microsecond):
+        # Round up to the next whole minute
+        not_before = not_before.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    slots: list[FreeSlot] = []
+    day = start_date
+    while day <= end_date and len(slots) < limit:
+        if (include_weekends or day.weekday() < 5) and not (
+            holiday_provider and holiday_provider.is_holiday(day)
+        ):
+            window_start = datetime.combine(day, work_start)
+            window_end = datetime.combine(day, work_end)
+            cursor = window_start
+            if not_before and not_before > cursor:
+                cursor = not_before
+            for event in storage.get_overlapping(window_start - point_duration, window_end):
+                busy_start = event.start_datetime
+                busy_end = event.end_datetime
+                if busy_end <= busy_start:
+                    busy_end = busy_start + point_duration
+                if busy_start - cursor >= duration:
+                    slots.append(FreeSlot(cursor, min(busy_start, window_end)))
+                    if len(slots) >= limit:
+                        return slots
+                cursor = max(cursor, busy_end)
+                if cursor >= window_end:
+                    break
+            if window_end - cursor >= duration:
+                slots.append(FreeSlot(cursor, window_end))
+        day += timedelta(days=1)
+    return slots
@@ -3,9 +3,14 @@
 import random
 from datetime import date
 from typing import Optional
-import urllib.request
 import json
 
+from . import perf
+from .lru import LRUCache
+
+# Days whose events are kept after fetching
+CACHE_SIZE = 32
+
 
 class HistoricalEventsProvider:
     """Provides historical 'On This Day' events from Wikipedia."""
@@ -13,12 +18,15 @@ class HistoricalEventsProvider:
     API_URL = "https://api.wikimedia.org/feed/v1/wikipedia/en/onthisday/events/{month}/{day}"
 
     def __init__(self):
-        self._cache: dict[tuple[int, int], list[dict]] = {}
+        self._cache: LRUCache[tuple[int, int], list[dict]] = LRUCache(CACHE_SIZE)
 
     def _fetch_events(self, month: int, day: int) -> list[dict]:
         """Fetch events from Wikipedia API."""
-        if (month, day) in self._cache:
-            return self._cache[(month, day)]
+        cached = self._cache.get((month, day))
+        if cached is not None:
+            return cached
+
+        import urllib.request
 
         try:
             url = self.API_URL.format(month=month, day=day)
@@ -26,10 +34,11 @@ class HistoricalEventsProvider:
                 url,
                 headers={"User-Agent": "CalendarTUI/1.0"}
             )
-            with urllib.request.urlopen(req, timeout=5) as response:
-                data = json.loads(response.read().decode())
+            with perf.span("historical.fetch"):
+                with urllib.request.urlopen(req, timeout=5) as response:
+                    data = json.loads(response.read().decode())
                 events = data.get("events", [])
-                self._cache[(month, day)] = events
+                self._cache.put((month, day), events)
                 return events
         except Exception:
             return []
@@ -1,11 +1,21 @@
 """Holiday data provider using the holidays library."""
 
 from datetime import date
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-import holidays
+from . import perf
+from .config import Config, ConfigChange
+from .lru import LRUCache
 
-from .config import Config
+# Settings that change which holidays are computed
+HOLIDAY_KEYS = frozenset({"country", "subdivision"})
+# Region-years kept built: browsing through the years evicts the oldest
+CACHE_SIZE = 8
+
+if TYPE_CHECKING:
+    import holidays
+
+    from .regions import RegionCatalog
 
 
 class HolidayProvider:
@@ -14,26 +24,65 @@ class HolidayProvider:
     def __init__(self, config: Optional[Config] = None):
         """Initialize with configuration."""
         self.config = config or Config()
-        self._holidays_cache: dict[int, holidays.HolidayBase] = {}
+        # Keyed by (country, subdivision, year) so a region change only
+        # drops entries for the old region
+        self._holidays_cache: LRUCache[tuple[str, Optional[str], int], "holidays.HolidayBase"] = (
+            LRUCache(CACHE_SIZE)
+        )
+        self._catalog: Optional["RegionCatalog"] = None
+        self.config.add_listener(self._on_config_change)
+
+    def _key(self, year: int) -> tuple[str, Optional[str], int]:
+        return (self.config.country, self.config.subdivision, year)
 
-    def _get_holidays_for_year(self, year: int) -> holidays.HolidayBase:
+    def _on_config_change(self, change: ConfigChange) -> None:
+        if change.keys & HOLIDAY_KEYS:
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop cached years that belong to a region other than the configured one."""
+        country, subdiv = self.config.country, self.config.subdivision
+        for key in self._holidays_cache.keys():
+            if key[:2] != (country, subdiv):
+                self._holidays_cache.pop(key)
+
+    def _get_holidays_for_year(self, year: int) -> "holidays.HolidayBase":
         """Get or create holidays instance for a year."""
-        if year not in self._holidays_cache:
-            try:
-                country = self.config.country
-                subdiv = self.config.subdivision
-                self._holidays_cache[year] = holidays.country_holidays(
-                    country,
-                    subdiv=subdiv,
-                    years=year,
-                )
-            except (KeyError, NotImplementedError):
-                # Fallback to US if country not supported
-                self._holidays_cache[year] = holidays.country_holidays(
-                    "US",
-                    years=year,
-                )
-        return self._holidays_cache[year]
+        return self._build(self._key(year))
+
+    def _build(self, key: tuple[str, Optional[str], int]) -> "holidays.HolidayBase":
+        built = self._holidays_cache.get(key)
+        if built is None:
+            # Imported on first lookup: the library is slow to import
+            import holidays
+
+            with perf.span("holidays.build_year"):
+                country, subdiv, year = key
+                try:
+                    built = holidays.country_holidays(
+                        country,
+                        subdiv=subdiv,
+                        years=year,
+                    )
+                except (KeyError, NotImplementedError):
+                    # Fallback to US if country not supported
+                    built = holidays.country_holidays(
+                        "US",
+                        years=year,
+                    )
+            self._holidays_cache.put(key, built)
+        return built
+
+    def warm(self, country: str, subdivision: Optional[str], year: int) -> None:
+        """Build a region's holidays for a year ahead of switching to it.
+
+        Safe to call from a worker thread.
+        """
+        self._build((country, subdivision, year))
+
+    def is_year_loaded(self, year: int) -> bool:
+        """Check whether a year's holidays are cached (lookups won't block)."""
+        return self._key(year) in self._holidays_cache
 
     def is_holiday(self, target_date: date) -> bool:
         """Check if a date is a holiday."""
@@ -65,15 +114,20 @@ class HolidayProvider:
         """Clear the holidays cache (call after config changes)."""
         self._holidays_cache.clear()
 
-    @staticmethod
-    def get_supported_countries() -> list[str]:
+    @property
+    def catalog(self) -> "RegionCatalog":
+        """The supported regions, built on first use and then read from disk."""
+        if self._catalog is None:
+            # Only the settings screen and region lookups need it
+            from .regions import CATALOG_FILE, RegionCatalog
+
+            self._catalog = RegionCatalog(self.config.path.with_name(CATALOG_FILE))
+        return self._catalog
+
+    def get_supported_countries(self) -> list[str]:
         """Get list of supported country codes."""
-        return sorted(holidays.list_supported_countries().keys())
+        return sorted(region.code for region in self.catalog.countries)
 
-    @staticmethod
-    def get_subdivisions(country: str) -> list[str]:
+    def get_subdivisions(self, country: str) -> list[str]:
         """Get list of subdivisions for a country."""
-        try:
-            return sorted(holidays.list_supported_countries().get(country, []))
-        except (KeyError, TypeError):
-            return []
+        return sorted(region.code for region in self.catalog.subdivisions(country))
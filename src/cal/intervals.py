@@ -0,0 +1,100 @@
+"""Sorted-endpoint index for overlap and conflict queries on timed events.
+
+Intervals are half-open ``[start, end)`` in absolute minutes (see
+``minute_of``). Starts are kept in one sorted list. Most events last less
+than a day, so an overlap query only has to look at starts in
+``[query_start - MAX_SHORT, query_end)``. Longer intervals are kept in a
+separate small set and are checked one by one.
+"""
+
+import bisect
+import heapq
+from datetime import datetime
+from typing import Iterable, Iterator
+
+MAX_SHORT = 24 * 60
+
+
+def minute_of(moment: datetime) -> int:
+    """Convert a naive datetime to absolute minutes since 0001-01-01."""
+    return moment.toordinal() * MAX_SHORT + moment.hour * 60 + moment.minute
+
+
+class IntervalIndex:
+    """Index of [start, end) intervals keyed by id."""
+
+    def __init__(self) -> None:
+        self._spans: dict[str, tuple[int, int]] = {}
+        self._starts: list[tuple[int, str]] = []
+        # Additions are buffered and merged on the next query, so bulk loads
+        # sort once instead of inserting one by one.
+        self._pending: list[tuple[int, str]] = []
+        self._long: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._starts.extend(self._pending)
+            self._starts.sort()
+            self._pending = []
+
+    def add(self, key: str, start: int, end: int) -> None:
+        """Add or replace an interval. Points (end == start) last one minute."""
+        if key in self._spans:
+            self.remove(key)
+        end = max(end, start + 1)
+        self._spans[key] = (start, end)
+        self._pending.append((start, key))
+        if end - start > MAX_SHORT:
+            self._long.add(key)
+
+    def remove(self, key: str) -> None:
+        """Remove an interval if present."""
+        span = self._spans.pop(key, None)
+        if span is None:
+            return
+        # Not flushing first keeps alternating adds and removes from
+        # re-sorting the whole list each time
+        entry = (span[0], key)
+        i = bisect.bisect_left(self._starts, entry)
+        if i < len(self._starts) and self._starts[i] == entry:
+            del self._starts[i]
+        else:
+            self._pending.remove(entry)
+        self._long.discard(key)
+
+    def spans(self, start: int, end: int) -> Iterator[tuple[int, int, str]]:
+        """Yield (start, end, key) for every interval overlapping [start, end)."""
+        self._flush()
+        lo = bisect.bisect_left(self._starts, (start - MAX_SHORT,))
+        hi = bisect.bisect_left(self._starts, (end,))
+        for s, key in self._starts[lo:hi]:
+            e = self._spans[key][1]
+            if e > start and key not in self._long:
+                yield s, e, key
+        for key in self._long:
+            s, e = self._spans[key]
+            if s < end and e > start:
+                yield s, e, key
+
+    def overlapping(self, start: int, end: int) -> list[str]:
+        """Keys of intervals overlapping [start, end), ordered by start."""
+        return [key for _, _, key in sorted(self.spans(start, end))]
+
+
+def sweep_conflicts(spans: Iterable[tuple[int, int, str]]) -> list[tuple[str, str]]:
+    """Pairs of keys whose (start, end, key) spans overlap each other.
+
+    A single sweep in start order, with a heap of the intervals still
+    open, so the cost is O(k log k + pairs) for k spans.
+    """
+    pairs: list[tuple[str, str]] = []
+    active: list[tuple[int, str]] = []
+    for s, e, key in sorted(spans):
+        while active and active[0][0] <= s:
+            heapq.heappop(active)
+        pairs.extend((other, key) for _, other in active)
+        heapq.heappush(active, (e, key))
+    return pairs
@@ -0,0 +1,50 @@
+"""Small bounded least-recently-used cache."""
+
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Mapping that drops the least recently used entry beyond `maxsize`."""
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K) -> Optional[V]:
+        """Get a value and mark it recently used, or None if absent."""
+        try:
+            self._data.move_to_end(key)
+            return self._data[key]
+        except KeyError:
+            # Also covers an eviction by another thread in between
+            return None
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value, evicting the oldest entry if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove and return a value, or None if absent."""
+        return self._data.pop(key, None)
+
+    def keys(self) -> list[K]:
+        """Snapshot of the keys, least recently used first."""
+        return list(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -1,20 +1,86 @@
 """Event data model."""
 
-from dataclasses import dataclass, field
-from datetime import date, time
-from typing import Optional
+from dataclasses import dataclass, field, fields, replace
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import functools
 import uuid
+import zoneinfo
+
+
+@functools.lru_cache(maxsize=1)
+def _zone_keys() -> dict[str, str]:
+    """Map lower-cased IANA zone names to their proper spelling."""
+    return {key.casefold(): key for key in zoneinfo.available_timezones()}
+
+
+def get_zone(name: str) -> ZoneInfo:
+    """Look up an IANA timezone in any case, raising ValueError if it is unknown."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        pass
+    key = _zone_keys().get(name.casefold())
+    if key is None:
+        raise ValueError(f"Unknown timezone: {name!r}")
+    return ZoneInfo(key)
+
+
+def normalize_tag(tag: str) -> str:
+    """Normalize a tag to lower case without a leading '#'.
+
+    Raises ValueError for tags that are empty, contain spaces or commas, or
+    start with '+' or '-' (which tag filters use as operators).
+    """
+    tag = tag.strip().lstrip("#").casefold()
+    if not tag or any(c.isspace() or c == "," for c in tag) or tag[0] in "+-":
+        raise ValueError(f"Invalid tag: {tag!r}")
+    return tag
+
+
+class _Description:
+    """The description field, which can stay on disk until it is read.
+
+    Storage keeps long descriptions out of line (see cal.descriptions) and
+    points events at them with Event.defer_description(). Assigning a text
+    replaces the reference.
+    """
+
+    def __get__(self, event: Optional["Event"], owner: type) -> str:
+        if event is None:
+            # The field's default, as seen by @dataclass
+            return ""
+        text = event._description
+        if text is None:
+            source, ref = event._deferred
+            text = source.read(ref)
+        return text
+
+    def __set__(self, event: "Event", text: str) -> None:
+        event._description = text
+        event._deferred = None
 
 
 @dataclass
 class Event:
-    """Calendar event."""
+    """Calendar event.
+
+    Comparing, printing and replace() don't read a deferred description;
+    dataclasses.asdict() and to_dict() do, unless asked not to.
+    """
 
     title: str
     date: date
     time: Optional[time] = None
-    description: str = ""
+    description: str = _Description()
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    end_date: Optional[date] = None
+    end_time: Optional[time] = None
+    reminders: list[int] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    # IANA zone the date and times are in; None for floating local times
+    tz: Optional[str] = None
 
     def __post_init__(self) -> None:
         """Validate event data after initialization."""
@@ -23,16 +89,41 @@ class Event:
         self.title = self.title.strip()
         if self.description:
             self.description = self.description.strip()
+        if self.end_time and not self.time:
+            raise ValueError("End time requires a start time")
+        if self.end_date and self.end_date < self.date:
+            raise ValueError("Event cannot end before it starts")
+        if self.end_time and self.end_datetime < self.start_datetime:
+            raise ValueError("Event cannot end before it starts")
+        if any(minutes < 0 for minutes in self.reminders):
+            raise ValueError("Reminders must be minutes before the start")
+        self.reminders = sorted(set(self.reminders))
+        if self.tags:
+            self.tags = sorted({normalize_tag(tag) for tag in self.tags})
+        if self.tz is not None:
+            self.tz = get_zone(self.tz.strip()).key
 
-    def to_dict(self) -> dict:
-        """Convert event to dictionary for JSON serialization."""
-        return {
+    def to_dict(self, description: bool = True) -> dict:
+        """Convert event to dictionary for JSON serialization.
+
+        Without `description` the description is left out, and not read if
+        it is deferred (storage keeps descriptions out of line).
+        """
+        data = {
             "id": self.id,
             "title": self.title,
             "date": self.date.isoformat(),
             "time": self.time.isoformat() if self.time else None,
-            "description": self.description,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "description": self.description if description else None,
+            "reminders": self.reminders,
+            "tags": self.tags,
+            "tz": self.tz,
         }
+        if not description:
+            del data["description"]
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> "Event":
@@ -47,17 +138,129 @@ class Event:
             title=data["title"],
             date=date.fromisoformat(data["date"]),
             time=time.fromisoformat(data["time"]) if data.get("time") else None,
+            end_date=date.fromisoformat(data["end_date"]) if data.get("end_date") else None,
+            end_time=time.fromisoformat(data["end_time"]) if data.get("end_time") else None,
             description=data.get("description", ""),
+            reminders=[int(m) for m in data.get("reminders") or ()],
+            tags=list(data.get("tags") or ()),
+            tz=data.get("tz"),
         )
 
     @property
     def display_time(self) -> str:
         """Get formatted time string for display."""
         if self.time:
+            if self.end_time:
+                return f"{self.time.strftime('%H:%M')}-{self.end_time.strftime('%H:%M')}"
             return self.time.strftime("%H:%M")
         return "All day"
 
+    @property
+    def start_datetime(self) -> datetime:
+        """When the event starts (midnight for all-day events)."""
+        return datetime.combine(self.date, self.time or time(0, 0))
+
+    @property
+    def end_datetime(self) -> datetime:
+        """When the event ends (exclusive).
+
+        All-day events end at midnight after their last day. Timed events
+        without an end time end when they start.
+        """
+        if self.time is None or (self.end_date and self.end_time is None):
+            return datetime.combine((self.end_date or self.date) + timedelta(days=1), time(0, 0))
+        if self.end_time is None:
+            return self.start_datetime
+        return datetime.combine(self.end_date or self.date, self.end_time)
+
+    @property
+    def last_date(self) -> date:
+        """The last date the event covers."""
+        end = self.end_datetime
+        if end > self.start_datetime and end.time() == time(0, 0):
+            return end.date() - timedelta(days=1)
+        return end.date()
+
+    def dates(self) -> Iterator[date]:
+        """Iterate over every date the event covers."""
+        day = self.date
+        while day <= self.last_date:
+            yield day
+            day += timedelta(days=1)
+
+    def in_zone(self, zone: Optional[tzinfo]) -> "Event":
+        """Get a floating copy with the times shifted into a zone.
+
+        `zone` None means the system's local zone. All-day and floating
+        events are returned unchanged.
+        """
+        if self.tz is None or self.time is None:
+            return self
+        source = ZoneInfo(self.tz)
+        start = self.start_datetime.replace(tzinfo=source).astimezone(zone)
+        end_date, end_time = self.end_date, self.end_time
+        if end_time is not None:
+            end = self.end_datetime.replace(tzinfo=source).astimezone(zone)
+            end_date = end.date() if end.date() != start.date() else None
+            end_time = end.time().replace(tzinfo=None)
+        elif end_date is not None:
+            end_date = max(end_date, start.date())
+        return self.replace(
+            date=start.date(),
+            time=start.time().replace(tzinfo=None),
+            end_date=end_date,
+            end_time=end_time,
+            tz=None,
+        )
+
+    def replace(self, **changes) -> "Event":
+        """A copy with some fields changed, sharing a deferred description unread."""
+        if "description" in changes:
+            return replace(self, **changes)
+        copied = replace(self, description="", **changes)
+        copied._description, copied._deferred = self._description, self._deferred
+        return copied
+
+    def defer_description(self, source, ref) -> None:
+        """Drop the description text; it is read by `source.read(ref)` when needed."""
+        self._description = None
+        self._deferred = (source, ref)
+
+    @property
+    def deferred_description(self) -> Optional[tuple]:
+        """The (source, ref) the description will be read from, or None if it is in memory."""
+        return self._deferred
+
     @property
     def sort_key(self) -> tuple:
         """Key for sorting events by date and time."""
         return (self.date, self.time or time(0, 0))
+
+    def _same_description(self, other: "Event") -> bool:
+        """Compare descriptions without reading either from disk."""
+        mine, theirs = self._deferred, other._deferred
+        if mine is None and theirs is None:
+            return self._description == other._description
+        if mine is not None and theirs is not None:
+            return mine[0].digest(mine[1]) == theirs[0].digest(theirs[1])
+        source, ref = mine or theirs
+        return source.holds(ref, other._description if mine else self._description)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._same_description(other) and all(
+            getattr(self, f.name) == getattr(other, f.name)
+            for f in fields(self)
+            if f.name != "description"
+        )
+
+    def __repr__(self) -> str:
+        parts = []
+        for f in fields(self):
+            if f.name == "description" and self._deferred is not None:
+                value = "<deferred>"
+            else:
+                value = repr(getattr(self, f.name))
+            parts.append(f"{f.name}={value}")
+        return f"{type(self).__qualname__}({', '.join(parts)})"
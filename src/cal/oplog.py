@@ -0,0 +1,92 @@
+"""Operation log of event changes, used for undo/redo and the storage journal."""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Operation:
+    """One event change, as serialized event states before and after.
+
+    ``before`` is None for an add and ``after`` is None for a delete.
+    """
+
+    event_id: str
+    before: Optional[dict]
+    after: Optional[dict]
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def kind(self) -> str:
+        if self.before is None:
+            return "add"
+        if self.after is None:
+            return "delete"
+        return "update"
+
+    @property
+    def title(self) -> str:
+        return (self.after or self.before or {}).get("title", "")
+
+    def inverse(self) -> "Operation":
+        """The operation that reverts this one."""
+        return Operation(self.event_id, self.after, self.before)
+
+    def describe(self) -> str:
+        """Short human-readable summary, e.g. "delete 'Standup'"."""
+        return f"{self.kind} '{self.title}'"
+
+
+class History:
+    """Bounded undo and redo stacks of recorded changes.
+
+    Each entry is the list of operations made by one storage mutation.
+    Consecutive edits to the same event within ``coalesce_seconds`` are
+    merged into one entry, so rapid edits don't use up the history depth.
+    """
+
+    def __init__(self, depth: int = 100, coalesce_seconds: float = 60.0) -> None:
+        self.coalesce_seconds = coalesce_seconds
+        self._undo: deque[list[Operation]] = deque(maxlen=depth)
+        self._redo: deque[list[Operation]] = deque(maxlen=depth)
+        # Entries recorded so far, not counting coalesced edits
+        self.recorded = 0
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def record(self, ops: list[Operation]) -> None:
+        """Record a new change, discarding anything that could be redone."""
+        if not ops:
+            return
+        self._redo.clear()
+        if self._undo and len(ops) == 1 and len(self._undo[-1]) == 1:
+            last, op = self._undo[-1][0], ops[0]
+            if (
+                op.kind == "update"
+                and last.kind == "update"
+                and last.event_id == op.event_id
+                and op.timestamp - last.timestamp <= self.coalesce_seconds
+            ):
+                self._undo[-1] = [Operation(op.event_id, last.before, op.after, op.timestamp)]
+                return
+        self._undo.append(list(ops))
+        self.recorded += 1
+
+    def peek_undo(self) -> Optional[list[Operation]]:
+        """The change undo() would revert next."""
+        return self._undo[-1] if self._undo else None
+
+    def peek_redo(self) -> Optional[list[Operation]]:
+        """The change redo() would apply next."""
+        return self._redo[-1] if self._redo else None
+
+    def undone(self) -> None:
+        """Move the latest change to the redo stack once it has been reverted."""
+        self._redo.append(self._undo.pop())
+
+    def redone(self) -> None:
+        """Move the latest undone change back once it has been reapplied."""
+        self._undo.append(self._redo.pop())
@@ -0,0 +1,156 @@
+"""Lightweight timing instrumentation for hot paths.
+
+Instrumentation is off by default and costs one global lookup per call. It
+is switched on by setting ``CAL_PERF=1`` in the environment or ``"perf": true``
+in config.json, and writes one JSON line per operation to ``~/.cal/perf.jsonl``
+(or ``$CAL_PERF_TRACE``).
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+DEFAULT_TRACE_PATH = Path.home() / ".cal" / "perf.jsonl"
+
+
+@dataclass
+class OpStats:
+    """Timing statistics for one named operation."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    recent_ms: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def percentile(self, fraction: float) -> float:
+        """Percentile of the recent durations, in milliseconds."""
+        if not self.recent_ms:
+            return 0.0
+        ordered = sorted(self.recent_ms)
+        return ordered[int(fraction * (len(ordered) - 1))]
+
+
+class PerfRecorder:
+    """Collects operation timings and optionally appends them to a trace file."""
+
+    def __init__(self, trace_path: Optional[Path] = None) -> None:
+        self.stats: dict[str, OpStats] = {}
+        self.recent: deque[tuple[str, float, float]] = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._trace = None
+        if trace_path is not None:
+            trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace = open(trace_path, "a")
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Record one completed operation."""
+        now = time.time()
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = OpStats()
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.recent_ms.append(duration_ms)
+            self.recent.append((name, duration_ms, now))
+            if self._trace is not None:
+                self._trace.write(
+                    json.dumps({"ts": round(now, 3), "op": name, "ms": round(duration_ms, 3)})
+                    + "\n"
+                )
+
+    def snapshot(self) -> dict[str, OpStats]:
+        """A copy of the statistics, safe to read while others record."""
+        with self._lock:
+            return {
+                name: OpStats(stats.count, stats.total_ms, deque(stats.recent_ms, maxlen=stats.recent_ms.maxlen))
+                for name, stats in self.stats.items()
+            }
+
+    def slowest(self, count: int = 5) -> list[tuple[str, float, float]]:
+        """The slowest of the recent operations, as (name, ms, timestamp)."""
+        with self._lock:
+            return sorted(self.recent, key=lambda r: r[1], reverse=True)[:count]
+
+    def close(self) -> None:
+        """Flush and close the trace file."""
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+
+_recorder: Optional[PerfRecorder] = None
+
+
+def recorder() -> Optional[PerfRecorder]:
+    """The active recorder, or None if instrumentation is off."""
+    return _recorder
+
+
+def enable(trace_path: Optional[Path] = None) -> PerfRecorder:
+    """Turn instrumentation on (no-op if it already is)."""
+    global _recorder
+    if _recorder is None:
+        _recorder = PerfRecorder(trace_path)
+        atexit.register(_recorder.close)
+    return _recorder
+
+
+def disable() -> None:
+    """Turn instrumentation off."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def enable_from_settings(config_enabled: bool = False) -> Optional[PerfRecorder]:
+    """Enable instrumentation if requested by environment or config."""
+    if os.environ.get("CAL_PERF", "") not in ("", "0") or config_enabled:
+        trace = os.environ.get("CAL_PERF_TRACE")
+        return enable(Path(trace) if trace else DEFAULT_TRACE_PATH)
+    return None
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator recording the duration of each call under `name`."""
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rec = _recorder
+            if rec is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                rec.record(name, (time.perf_counter() - start) * 1e3)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Context manager recording the duration of a block under `name`."""
+    rec = _recorder
+    if rec is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec.record(name, (time.perf_counter() - start) * 1e3)
@@ -0,0 +1,174 @@
+"""Catalog of the countries and subdivisions the holidays library supports.
+
+Listing them means importing every country module of the library, which
+takes a noticeable fraction of a second. The catalog is built once and kept
+in `regions.json` next to the config, tagged with the library version it
+came from. A library upgrade rebuilds it.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from . import perf
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "regions.json"
+
+# Lowercase joining words in names built from module names
+_SMALL_WORDS = {"and", "of", "the", "da", "de", "del", "do", "y"}
+
+
+@dataclass(frozen=True)
+class Region:
+    """A country or subdivision code with its English name."""
+
+    code: str
+    name: str
+
+
+class PrefixIndex:
+    """Regions found by a prefix of their code or of their name from any word on.
+
+    Keys are kept in one sorted list, so a search is two bisects plus a
+    pass over the matches. "york", "new y" and "ny" all find New York.
+    """
+
+    def __init__(self, regions: list[Region]) -> None:
+        # Results come out in this order
+        self.regions = regions
+        keys: list[tuple[str, int]] = []
+        for row, region in enumerate(regions):
+            keys.append((region.code.lower(), row))
+            words = re.split(r"[\s\-]+", region.name.lower())
+            for start in range(len(words)):
+                keys.append((" ".join(words[start:]), row))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._rows = [row for _, row in keys]
+
+    def search(self, query: str) -> list[Region]:
+        """Regions matching a prefix (all of them for an empty query)."""
+        query = " ".join(re.split(r"[\s\-]+", query.strip().lower()))
+        if not query:
+            return self.regions
+        lo = bisect.bisect_left(self._keys, query)
+        hi = bisect.bisect_left(self._keys, query + "\uffff", lo)
+        return [self.regions[row] for row in sorted(set(self._rows[lo:hi]))]
+
+
+def _library_version() -> Optional[str]:
+    # Read from package metadata: importing holidays itself is slow
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("holidays")
+    except PackageNotFoundError:
+        return None
+
+
+def _country_name(module: str) -> str:
+    """English name from a holidays module name, e.g. bosnia_and_herzegovina."""
+    words = module.split("_")
+    return " ".join(
+        w if i and w in _SMALL_WORDS else w.capitalize() for i, w in enumerate(words)
+    )
+
+
+@perf.timed("regions.build")
+def build_catalog() -> list[dict]:
+    """List countries (two-letter codes) with their subdivisions, sorted by name."""
+    import holidays
+    from holidays.registry import COUNTRIES
+
+    supported = holidays.list_supported_countries()
+    countries = []
+    for module, (_, code, *_) in COUNTRIES.items():
+        if code not in supported:
+            continue
+        names = {}
+        for name, subdiv in getattr(getattr(holidays, code), "subdivisions_aliases", {}).items():
+            names.setdefault(subdiv, name)
+        countries.append({
+            "code": code,
+            "name": _country_name(module),
+            "subdivisions": sorted(
+                ([s, names.get(s, s)] for s in supported[code]), key=lambda s: s[1].lower()
+            ),
+        })
+    countries.sort(key=lambda c: c["name"].lower())
+    return countries
+
+
+class RegionCatalog:
+    """Countries and subdivisions with prefix search, loaded from regions.json."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._data = self._load()
+        self.countries = [Region(c["code"], c["name"]) for c in self._data]
+        self._by_code = {c["code"]: c for c in self._data}
+        self._country_index: Optional[PrefixIndex] = None
+        self._subdivision_indexes: dict[str, PrefixIndex] = {}
+
+    def _load(self) -> list[dict]:
+        library = _library_version()
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data["holidays_version"] == library:
+                return data["countries"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Region catalog unreadable, rebuilding: {e}")
+        countries = build_catalog()
+        self._save(library, countries)
+        return countries
+
+    def _save(self, library: Optional[str], countries: list[dict]) -> None:
+        """Write the catalog atomically; a failure only costs a rebuild next time."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps({"holidays_version": library, "countries": countries}))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save region catalog: {e}")
+
+    def country_name(self, code: str) -> Optional[str]:
+        country = self._by_code.get(code)
+        return country["name"] if country else None
+
+    def subdivision_name(self, country: str, code: str) -> Optional[str]:
+        for region in self.subdivisions(country):
+            if region.code == code:
+                return region.name
+        return None
+
+    def subdivisions(self, country: str) -> list[Region]:
+        """A country's subdivisions sorted by name (empty if unknown)."""
+        return self._subdivision_index(country).regions
+
+    def search_countries(self, query: str) -> list[Region]:
+        if self._country_index is None:
+            self._country_index = PrefixIndex(self.countries)
+        return self._country_index.search(query)
+
+    def search_subdivisions(self, country: str, query: str) -> list[Region]:
+        return self._subdivision_index(country).search(query)
+
+    def _subdivision_index(self, country: str) -> PrefixIndex:
+        index = self._subdivision_indexes.get(country)
+        if index is None:
+            entry = self._by_code.get(country)
+            regions = [Region(code, name) for code, name in (entry["subdivisions"] if entry else [])]
+            index = self._subdivision_indexes[country] = PrefixIndex(regions)
+        return index
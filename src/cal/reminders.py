@@ -0,0 +1,190 @@
+"""Reminder scheduling for events with lead times.
+
+Pending reminders live in a min-heap ordered by fire time. Storage changes
+update the heap incrementally: changed events push fresh entries and bump a
+per-event version, so stale entries are dropped lazily when they reach the
+top. Nothing polls; callers sleep until ``next_fire()``.
+"""
+
+import heapq
+import logging
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional, TYPE_CHECKING
+
+from .models import Event
+
+if TYPE_CHECKING:
+    from .storage import EventStorage, StoreChange
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a single sleep, so a suspended machine or a clock change
+# delays a reminder by at most this long
+MAX_SLEEP = 300.0
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """A reminder that has fallen due."""
+
+    event: Event
+    fire_at: datetime
+    minutes_before: int
+
+    def message(self, now: Optional[datetime] = None) -> str:
+        """Describe the event relative to now."""
+        now = now or datetime.now()
+        minutes = -int(-(self.event.start_datetime - now).total_seconds() // 60)
+        if minutes <= 0:
+            when = "now"
+        elif minutes < 60:
+            when = f"in {minutes}m"
+        else:
+            when = f"in {minutes // 60}h {minutes % 60}m"
+        return f"{self.event.display_time} {self.event.title} ({when})"
+
+
+class ReminderScheduler:
+    """Min-heap of pending reminders for the events in a storage."""
+
+    def __init__(self, storage: "EventStorage", now: Optional[datetime] = None) -> None:
+        self.storage = storage
+        # (fire_at, event id, version, minutes before)
+        self._heap: list[tuple[datetime, str, int, int]] = []
+        self._versions: dict[str, int] = {}
+        # Reminders already delivered, so edits don't repeat them
+        self._fired: set[tuple[str, datetime]] = set()
+        self._cond = threading.Condition(threading.RLock())
+        self._stopped = False
+
+        now = now or datetime.now()
+        for shown in storage.get_all():
+            # Queries return events in the display zone; schedule the originals
+            self._heap.extend(self._entries(storage.get(shown.id), now))
+        heapq.heapify(self._heap)
+        storage.add_listener(self._on_change)
+
+    def _entries(self, event: Event, now: datetime) -> list[tuple[datetime, str, int, int]]:
+        """Build heap entries for an event, invalidating any queued before."""
+        start = event.in_zone(None).start_datetime
+        if not event.reminders or start <= now:
+            self._versions.pop(event.id, None)
+            return []
+        version = self._versions.get(event.id, 0) + 1
+        self._versions[event.id] = version
+        entries = []
+        for minutes in event.reminders:
+            fire_at = start - timedelta(minutes=minutes)
+            if (event.id, fire_at) not in self._fired:
+                entries.append((fire_at, event.id, version, minutes))
+        return entries
+
+    def _on_change(self, change: "StoreChange") -> None:
+        with self._cond:
+            now = datetime.now()
+            for event_id in change.added | change.updated:
+                event = self.storage.get(event_id)
+                if event is not None:
+                    for entry in self._entries(event, now):
+                        heapq.heappush(self._heap, entry)
+            for event_id in change.removed:
+                self._versions.pop(event_id, None)
+            if len(self._heap) > 2 * len(self._versions) + 64:
+                # Mostly stale entries: rebuild rather than let them pile up
+                self._heap = [e for e in self._heap if self._versions.get(e[1]) == e[2]]
+                heapq.heapify(self._heap)
+            self._cond.notify_all()
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap and self._versions.get(heap[0][1]) != heap[0][2]:
+            heapq.heappop(heap)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for _, key, version, _ in self._heap if self._versions.get(key) == version)
+
+    def next_fire(self) -> Optional[datetime]:
+        """When the next reminder falls due, or None if nothing is pending."""
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> list[Reminder]:
+        """Remove and return every reminder due at or before now."""
+        now = now or datetime.now()
+        due: list[Reminder] = []
+        with self._cond:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                fire_at, event_id, _, minutes = heapq.heappop(self._heap)
+                event = self.storage.get(event_id)
+                if event is not None:
+                    # Reminders run on the system clock, whatever the display zone
+                    event = event.in_zone(None)
+                if event is None or event.start_datetime <= now - timedelta(minutes=1):
+                    continue
+                self._fired.add((event_id, fire_at))
+                due.append(Reminder(event, fire_at, minutes))
+            if len(self._fired) > 1024:
+                # Forget reminders for events that have started
+                self._fired = {
+                    (key, at) for key, at in self._fired
+                    if (event := self.storage.get(key)) and event.in_zone(None).start_datetime > now
+                }
+        return due
+
+    def run(self, deliver: Callable[[Reminder], None]) -> None:
+        """Deliver reminders as they fall due until stop() is called.
+
+        Sleeps on a condition that storage changes wake up, so the thread
+        is idle between reminders whatever the calendar size.
+        """
+        with self._cond:
+            while not self._stopped:
+                for reminder in self.pop_due():
+                    try:
+                        deliver(reminder)
+                    except Exception as e:
+                        logger.error(f"Reminder delivery failed: {e}")
+                next_fire = self.next_fire()
+                timeout = MAX_SLEEP
+                if next_fire is not None:
+                    delay = (next_fire - datetime.now()).total_seconds()
+                    timeout = min(max(delay, 0.0), MAX_SLEEP)
+                self._cond.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop run() and detach from the storage."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.storage.remove_listener(self._on_change)
+
+
+def run_hook(command: str, reminder: Reminder) -> None:
+    """Run a shell command for a reminder without waiting for it.
+
+    The event is passed in CAL_TITLE, CAL_START, CAL_MINUTES_BEFORE and
+    CAL_MESSAGE environment variables.
+    """
+    env = dict(
+        os.environ,
+        CAL_TITLE=reminder.event.title,
+        CAL_START=reminder.event.start_datetime.isoformat(timespec="minutes"),
+        CAL_MINUTES_BEFORE=str(reminder.minutes_before),
+        CAL_MESSAGE=reminder.message(),
+    )
+    try:
+        process = subprocess.Popen(command, shell=True, env=env, stdin=subprocess.DEVNULL)
+    except OSError as e:
+        logger.error(f"Could not run reminder hook: {e}")
+        return
+    # Reap the child in the background so long-running daemons leave no zombies
+    threading.Thread(target=process.wait, daemon=True).start()
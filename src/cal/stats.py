@@ -0,0 +1,231 @@
+"""Time-spent reports over columns of event data.
+
+Events are flattened once into parallel arrays, one row per event in
+display order: the day (as an ordinal), the start minute and the duration
+in minutes. Rows are sorted by day. Row numbers are also indexed by weekday
+and by tag. An aggregation then only does bisects and C-level passes over
+slices of these arrays: `sum`, `itertools.compress` and `map` over
+`array.__getitem__`. Per-event Python code runs only while building.
+
+EventStats caches the columns until the storage changes. Reports over the
+same or a narrower date range reuse them.
+"""
+
+import bisect
+from array import array
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import compress
+from typing import Iterable, Optional
+
+from . import perf
+from .models import Event
+from .tags import TagFilter
+
+GROUPINGS = ("week", "month", "weekday", "hour", "tag")
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+@dataclass
+class StatsRow:
+    """One group of a report: its label, number of events and minutes spent."""
+
+    label: str
+    events: int
+    minutes: int
+
+    @property
+    def hours(self) -> float:
+        return self.minutes / 60
+
+
+class EventColumns:
+    """Array columns of the events starting between two dates (inclusive).
+
+    Events count on the day they start. All-day events, and timed events
+    without an end time, last zero minutes.
+    """
+
+    def __init__(self, events: Iterable[Event], start: date, end: date) -> None:
+        self.start = start
+        self.end = end
+        self.ids: list[str] = []
+        self.day = array("i")
+        self.minute = array("h")
+        self.minutes = array("i")
+        self.weekday_rows = [array("I") for _ in range(7)]
+        self.tag_rows: dict[str, array] = {}
+        self._hour_rows: Optional[list[array]] = None
+        row = 0
+        for event in events:
+            if event.date < start:
+                continue
+            day = event.date.toordinal()
+            self.ids.append(event.id)
+            self.day.append(day)
+            # Ordinal 1 (0001-01-01) was a Monday
+            self.weekday_rows[(day - 1) % 7].append(row)
+            if event.time is None:
+                self.minute.append(-1)
+                self.minutes.append(0)
+            else:
+                begin = event.time.hour * 60 + event.time.minute
+                self.minute.append(begin)
+                if event.end_time is None:
+                    self.minutes.append(0)
+                else:
+                    end_day = event.end_date.toordinal() if event.end_date else day
+                    finish = (end_day - day) * 1440 + event.end_time.hour * 60 + event.end_time.minute
+                    self.minutes.append(max(finish - begin, 0))
+            for tag in event.tags:
+                rows = self.tag_rows.get(tag)
+                if rows is None:
+                    rows = self.tag_rows[tag] = array("I")
+                rows.append(row)
+            row += 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def hour_rows(self) -> list[array]:
+        """Rows of timed events by starting hour (built on first use)."""
+        if self._hour_rows is None:
+            self._hour_rows = [array("I") for _ in range(24)]
+            for row, minute in enumerate(self.minute):
+                if minute >= 0:
+                    self._hour_rows[minute // 60].append(row)
+        return self._hour_rows
+
+    def rows_between(self, start: date, end: date) -> tuple[int, int]:
+        """The [first, last) rows of events starting between two dates."""
+        return (
+            bisect.bisect_left(self.day, start.toordinal()),
+            bisect.bisect_right(self.day, end.toordinal()),
+        )
+
+
+def _slice_total(columns: EventColumns, lo: int, hi: int, mask: Optional[bytearray]) -> tuple[int, int]:
+    """Events and minutes in a contiguous block of rows."""
+    if mask is None:
+        return hi - lo, sum(columns.minutes[lo:hi])
+    selected = mask[lo:hi]
+    return selected.count(1), sum(compress(columns.minutes[lo:hi], selected))
+
+
+def _rows_total(
+    columns: EventColumns, rows: array, lo: int, hi: int, mask: Optional[bytearray]
+) -> tuple[int, int]:
+    """Events and minutes of the given rows that fall in [lo, hi)."""
+    rows = rows[bisect.bisect_left(rows, lo):bisect.bisect_left(rows, hi)]
+    minutes = map(columns.minutes.__getitem__, rows)
+    if mask is None:
+        return len(rows), sum(minutes)
+    selected = bytes(map(mask.__getitem__, rows))
+    return selected.count(1), sum(compress(minutes, selected))
+
+
+def _period_starts(start: date, end: date, by: str) -> list[date]:
+    """First day of each week (Monday) or month overlapping [start, end]."""
+    if by == "week":
+        day = start - timedelta(days=start.weekday())
+        step = lambda d: d + timedelta(days=7)
+    else:
+        day = start.replace(day=1)
+        step = lambda d: (d + timedelta(days=32)).replace(day=1)
+    starts = []
+    while day <= end:
+        starts.append(day)
+        day = step(day)
+    return starts
+
+
+def aggregate(
+    columns: EventColumns,
+    start: date,
+    end: date,
+    by: str = "week",
+    mask: Optional[bytearray] = None,
+) -> list[StatsRow]:
+    """Group the events between two dates by week, month, weekday, start hour or tag.
+
+    `mask` marks the rows to count (all if None). Tag groups count an event
+    under each of its tags and are ordered by time spent.
+    """
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping '{by}' (use {', '.join(GROUPINGS)})")
+    lo, hi = columns.rows_between(start, end)
+
+    if by in ("week", "month"):
+        starts = _period_starts(start, end, by)
+        bounds = [bisect.bisect_left(columns.day, d.toordinal(), lo, hi) for d in starts[1:]]
+        result = []
+        for period, a, b in zip(starts, [lo] + bounds, bounds + [hi]):
+            label = period.isoformat() if by == "week" else period.strftime("%Y-%m")
+            result.append(StatsRow(label, *_slice_total(columns, a, b, mask)))
+        return result
+
+    if by == "weekday":
+        return [
+            StatsRow(WEEKDAYS[weekday], *_rows_total(columns, rows, lo, hi, mask))
+            for weekday, rows in enumerate(columns.weekday_rows)
+        ]
+
+    if by == "hour":
+        return [
+            StatsRow(f"{hour:02d}:00", *_rows_total(columns, rows, lo, hi, mask))
+            for hour, rows in enumerate(columns.hour_rows)
+        ]
+
+    result = [
+        StatsRow(f"#{tag}", *_rows_total(columns, rows, lo, hi, mask))
+        for tag, rows in columns.tag_rows.items()
+    ]
+    result = [row for row in result if row.events]
+    result.sort(key=lambda row: (-row.minutes, row.label))
+    return result
+
+
+class EventStats:
+    """Reports over a storage (or CalendarSet), with columns cached between reports."""
+
+    def __init__(self, storage) -> None:
+        self.storage = storage
+        self._columns: Optional[EventColumns] = None
+        self._version: Optional[tuple] = None
+
+    @perf.timed("stats.columns")
+    def columns(self, start: date, end: date) -> EventColumns:
+        """Columns covering two dates, rebuilt only after the storage changed."""
+        cached = self._columns
+        if (
+            cached is not None
+            and self._version == self.storage.data_version
+            and cached.start <= start
+            and end <= cached.end
+        ):
+            return cached
+        if cached is not None and self._version == self.storage.data_version:
+            # Widen rather than replace, so alternating ranges don't thrash
+            start, end = min(start, cached.start), max(end, cached.end)
+        self._columns = EventColumns(self.storage.iter_range(start, end), start, end)
+        # Taken after building: the query may have loaded archived years
+        self._version = self.storage.data_version
+        return self._columns
+
+    @perf.timed("stats.report")
+    def report(
+        self,
+        start: date,
+        end: date,
+        by: str = "week",
+        tag_filter: Optional[TagFilter] = None,
+    ) -> list[StatsRow]:
+        """Events and time spent between two dates, grouped `by` one of GROUPINGS."""
+        columns = self.columns(start, end)
+        mask = None
+        if tag_filter:
+            match = tag_filter.select(self.storage)
+            mask = bytearray(map(match.__contains__, columns.ids))
+        return aggregate(columns, start, end, by, mask)
@@ -0,0 +1,83 @@
+"""Precomputed status file for shell prompts and status bars.
+
+The file is plain text so it can be read with ``cat`` or ``head -1``. The first
+line is a human-readable summary, the following lines are ``key=value`` pairs:
+
+    14:00 Standup (in 25m) · 3 today
+    next=Standup
+    next_at=2026-01-05T14:00
+    minutes_until_next=25
+    today=3
+"""
+
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import Event
+    from .storage import EventStorage
+
+
+def _next_timed_event(storage: "EventStorage", now: datetime) -> Optional["Event"]:
+    """Find the first timed event that has not started yet."""
+    today = now.date()
+    for event in storage.iter_range(today, date.max):
+        if event.time and event.start_datetime >= now:
+            return event
+    return None
+
+
+def _format_minutes(minutes: int) -> str:
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if minutes else f"{hours}h"
+
+
+def build_status(storage: "EventStorage", now: Optional[datetime] = None) -> str:
+    """Build the status file content for the given moment."""
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    today_count = len(storage.get_by_date(now.date()))
+    event = _next_timed_event(storage, now)
+
+    if event is None:
+        summary = "No upcoming events"
+        fields = {"next": "", "next_at": "", "minutes_until_next": ""}
+    else:
+        start = datetime.combine(event.date, event.time)
+        minutes = int((start - now).total_seconds() // 60)
+        if event.date == now.date():
+            summary = f"{event.display_time} {event.title} (in {_format_minutes(minutes)})"
+        else:
+            summary = f"{event.date.strftime('%a %d %b')} {event.display_time} {event.title}"
+        fields = {
+            "next": event.title,
+            "next_at": start.isoformat(timespec="minutes"),
+            "minutes_until_next": str(minutes),
+        }
+    fields["today"] = str(today_count)
+
+    lines = [f"{summary} · {today_count} today"]
+    lines.extend(f"{key}={value}" for key, value in fields.items())
+    return "\n".join(lines) + "\n"
+
+
+def write_status(path: Path, content: str) -> bool:
+    """Atomically replace the status file if its content changed.
+
+    Returns True if the file was rewritten.
+    """
+    try:
+        if path.read_text() == content:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
@@ -1,94 +1,947 @@
 """JSON file storage for calendar events."""
 
+import bisect
 import json
 import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from datetime import date
-from typing import Optional
+from datetime import date, datetime, timedelta
+from itertools import accumulate, count
+from typing import AbstractSet, Callable, Iterable, Iterator, Optional
 
+try:
+    import fcntl
+except ImportError:  # Windows: saves are atomic but not serialized
+    fcntl = None
+
+from . import perf
+from .archive import ArchiveError, ArchiveStore
+from .dateindex import data_header, write_index
+from .dedupe import group_duplicates
+from .descriptions import DescriptionStore, is_inline, text_hash
+from .intervals import IntervalIndex, minute_of, sweep_conflicts
 from .models import Event
+from .oplog import History, Operation
+from .status import build_status, write_status
+from .timezones import ZoneConverter
 
 logger = logging.getLogger(__name__)
 
+# Journal records kept before they are folded into events.json
+COMPACT_AFTER = 500
+
+_NO_IDS: AbstractSet[str] = frozenset()
+
+
+def _content_hash(event_data: dict) -> int:
+    """Hash an event's serialized form to detect content changes.
+
+    A long description counts by its hash, so an event hashes the same
+    with it inline (journal records) or stored out of line (events.json).
+    """
+    ref = event_data.get("desc")
+    if ref is None and is_inline(event_data.get("description") or ""):
+        return hash(json.dumps(event_data, sort_keys=True))
+    data = dict(event_data)
+    text = data.pop("description", None)
+    data["desc"] = ref[2] if ref is not None else text_hash(text)
+    return hash(json.dumps(data, sort_keys=True))
+
+
+@dataclass
+class StoreChange:
+    """Describes which events changed in a storage and which dates they touch."""
+
+    added: set[str] = field(default_factory=set)
+    updated: set[str] = field(default_factory=set)
+    removed: set[str] = field(default_factory=set)
+    dates: set[date] = field(default_factory=set)
+    external: bool = False
+    # Operations of a local mutation, in order (not filled for external reloads)
+    ops: list[Operation] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def conflict_days(pairs: list[tuple[Event, Event]], start: date, end: date) -> set[date]:
+    """Get the dates between start and end (inclusive) on which event pairs overlap."""
+    result: set[date] = set()
+    for a, b in pairs:
+        day = max(a.start_datetime, b.start_datetime).date()
+        last = min(a.end_datetime, b.end_datetime).date()
+        while day <= last and day <= end:
+            if day >= start:
+                result.add(day)
+            day += timedelta(days=1)
+    return result
+
 
 class EventStorage:
-    """Handles loading and saving events to JSON file."""
+    """Handles loading and saving events to JSON file.
 
-    def __init__(self, path: Optional[Path] = None):
-        """Initialize storage with file path."""
+    Mutations are appended to a journal next to events.json and folded into
+    it every COMPACT_AFTER records, so a single change doesn't rewrite the
+    whole file. Other processes pick up journal records incrementally.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        status_path: Optional[Path] = None,
+        history_depth: int = 100,
+        archive_dir: Optional[Path] = None,
+        display_timezone: Optional[str] = None,
+    ):
+        """Initialize storage with file paths, undo depth and display zone."""
         if path is None:
             path = Path.home() / ".cal" / "events.json"
         self.path = path
+        self.journal_path = path.with_name(path.name + ".journal")
+        self.status_path = status_path
+        self.history = History(history_depth)
+        self.archive = ArchiveStore(archive_dir or path.parent / "archive")
+        # Descriptions are kept out of events.json and read on demand
+        self.descriptions = DescriptionStore(path)
         self._events: dict[str, Event] = {}
+        # Archived events are indexed like the others once their year is
+        # loaded, but kept out of _events so they are never saved to the hot
+        # file. Years are loaded the first time a query reaches them.
+        self._archived: dict[str, Event] = {}
+        self._archive_loaded: dict[int, tuple[tuple, list[str]]] = {}
+        self._archive_pending: list[int] = []
+        # Date index: events bucketed by every date they cover (each bucket
+        # kept sorted), the sorted list of dates that have events, and the
+        # dates each event was indexed under (events may be mutated in place
+        # before update()). Events covering several dates are tracked so
+        # range queries can skip their repeats.
+        self._by_date: dict[date, list[Event]] = {}
+        self._dates: list[date] = []
+        self._indexed_on: dict[str, tuple[date, ...]] = {}
+        self._spanning: set[str] = set()
+        # Bumped whenever a date's bucket changes, so views can cache
+        # per-date layouts and tell when they are stale. Versions come from
+        # one counter and are never reused, so dates left without events
+        # can be dropped (and read as 0, "empty") instead of piling up.
+        self._date_versions: dict[date, int] = {}
+        self._version_clock = count(1)
+        # Timed events by [start, end) minute, for overlap and conflict queries
+        self._intervals = IntervalIndex()
+        # Ids of the events with each tag, and the tags each event was
+        # indexed under, for filtering without scanning every event
+        self._by_tag: dict[str, set[str]] = {}
+        self._tagged_as: dict[str, tuple[str, ...]] = {}
+        # Events with a timezone are indexed as shown in the display zone;
+        # the ids are kept so a zone change re-indexes only those
+        self._zones = ZoneConverter(display_timezone)
+        self._zoned: set[str] = set()
+        # Change journal for sync: a counter bumped by every change (local or
+        # read from disk), the count at which each event last changed, and
+        # tombstones for deleted ones. Unlike History it is never rewound by
+        # undo, and it lives only as long as this object.
+        self._seq = 0
+        self._changed_at: dict[str, int] = {}
+        self._deleted_at: dict[str, int] = {}
+        # Change detection: content hash of each event as last read or
+        # written, and the stat signature of the file at that time.
+        self._hashes: dict[str, int] = {}
+        self._signature: Optional[tuple] = None
+        # Bumped by every save of events.json, and recorded in it and its
+        # date index so readers can tell whether the index is current
+        self._generation = 0
+        # The journal: signature of the events.json it applies to (None if
+        # there is no usable journal), bytes read or written so far, and the
+        # number of records it holds
+        self._journal_base: Optional[tuple] = None
+        self._journal_offset = 0
+        self._journal_ops = 0
+        self._listeners: list[Callable[[StoreChange], None]] = []
         self._load()
 
-    def _load(self) -> None:
-        """Load events from JSON file."""
+    @staticmethod
+    def _file_signature(path: Path) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _stat_signature(self) -> tuple:
+        """Cheap fingerprint of the events file and journal used to detect changes."""
+        return (self._file_signature(self.path), self._file_signature(self.journal_path))
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock shared by all writers of this file."""
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_journal(self, base: Optional[tuple], offset: int) -> Optional[list[dict]]:
+        """Read the journal records after an offset.
+
+        Returns None if there is no journal or it was written on top of a
+        different events.json than `base`.
+        """
+        try:
+            with open(self.journal_path, "rb") as f:
+                header = f.readline()
+                if base is None or tuple(json.loads(header).get("base") or ()) != base:
+                    return None
+                offset = max(offset, len(header))
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return None
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable journal: {e}")
+            return None
+
+        # Only complete lines; a partial one is finished by its writer later
+        end = chunk.rfind(b"\n") + 1
+        self._journal_offset = offset + end
+        records = []
+        for line in chunk[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                logger.warning(f"Skipping invalid journal record: {e}")
+        self._journal_ops += len(records)
+        return records
+
+    def _apply_record(self, record: dict, change: StoreChange) -> None:
+        """Apply one journal record written by another process."""
+        try:
+            event_id, after = record["id"], record["after"]
+            if after is None:
+                if event_id in self._events:
+                    self._remove(event_id, change)
+                self._hashes.pop(event_id, None)
+                return
+            content_hash = _content_hash(after)
+            if self._hashes.get(event_id) != content_hash:
+                self._put(Event.from_dict(after), change)
+            self._hashes[event_id] = content_hash
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Skipping invalid journal record: {e}")
+
+    @perf.timed("storage.load")
+    def _load(self) -> StoreChange:
+        """Load events from the JSON file and journal, re-parsing only events that changed.
+
+        If only the journal grew since the last load, just the new records
+        are read.
+        """
+        change = StoreChange(external=True)
         if not self.path.exists():
             self.path.parent.mkdir(parents=True, exist_ok=True)
             self._save()
-            return
+            return change
+
+        signature = self._stat_signature()
+        if self._signature is not None and signature[0] == self._signature[0]:
+            records = self._read_journal(self._journal_base, self._journal_offset)
+            if records is not None:
+                for record in records:
+                    self._apply_record(record, change)
+                self._signature = signature
+                return change
 
         try:
             with open(self.path, "r") as f:
                 data = json.load(f)
-            for event_data in data.get("events", []):
-                try:
-                    event = Event.from_dict(event_data)
-                    self._events[event.id] = event
-                except (ValueError, KeyError) as e:
-                    logger.warning(f"Skipping invalid event: {e}")
         except json.JSONDecodeError as e:
             logger.error(f"Corrupted events file, starting fresh: {e}")
-            self._events = {}
+            for event_id in list(self._events):
+                self._remove(event_id, change)
+            self._hashes = {}
+            self._signature = signature
+            self._journal_base = None
+            return change
 
+        generation = data.get("generation")
+        self._generation = generation if isinstance(generation, int) else 0
+        descriptions = self.descriptions
+        descriptions.open(data.get("descriptions"))
+
+        # events.json with the journal replayed on top
+        latest: dict = {}
+        for event_data in data.get("events", []):
+            try:
+                latest[event_data["id"]] = event_data
+                # Journal records carry descriptions inline: note what the
+                # blob holds even for events they replace, so a save doesn't
+                # append those texts again
+                descriptions.register(event_data)
+            except (KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid event: {e}")
+        self._journal_offset = self._journal_ops = 0
+        records = self._read_journal(signature[0], 0)
+        self._journal_base = signature[0] if records is not None else None
+        for record in records or ():
+            try:
+                if record["after"] is None:
+                    latest.pop(record["id"], None)
+                else:
+                    latest[record["id"]] = record["after"]
+            except (KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid journal record: {e}")
+
+        hashes: dict[str, int] = {}
+        for event_data in latest.values():
+            try:
+                content_hash = _content_hash(event_data)
+                event_id = event_data["id"]
+                if self._hashes.get(event_id) != content_hash:
+                    self._put(descriptions.defer(Event.from_dict(event_data), event_data), change)
+                hashes[event_id] = content_hash
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid event: {e}")
+        for event_id in [i for i in self._events if i not in hashes]:
+            self._remove(event_id, change)
+        self._hashes = hashes
+        self._signature = signature
+        self._scan_archive()
+        return change
+
+    def _scan_archive(self) -> None:
+        """Find archived years, dropping loaded years whose file has changed."""
+        years = self.archive.scan()
+        for year, (signature, ids) in list(self._archive_loaded.items()):
+            if years.get(year) != signature:
+                for event_id in ids:
+                    if self._archived.pop(event_id, None) is not None:
+                        self._index_remove(event_id)
+                del self._archive_loaded[year]
+        self._archive_pending = sorted(y for y in years if y not in self._archive_loaded)
+
+    def _ensure_archived(self, start: date, end: date) -> None:
+        """Load the archived years between two dates that aren't loaded yet."""
+        if not self._archive_pending or start.year > self._archive_pending[-1]:
+            return
+        for year in [y for y in self._archive_pending if start.year <= y <= end.year]:
+            with perf.span("storage.load_archive"):
+                signature = self.archive.scan().get(year)
+                ids = []
+                for event in self.archive.load_year(year):
+                    # An event can be in both if archiving was interrupted;
+                    # the hot copy wins
+                    if event.id not in self._events and event.id not in self._archived:
+                        self._archived[event.id] = event
+                        self._index_add(event)
+                        ids.append(event.id)
+                self._archive_loaded[year] = (signature, ids)
+                self._archive_pending.remove(year)
+
+    @perf.timed("storage.archive")
+    def archive_before(self, cutoff: date) -> int:
+        """Move events that ended before a date into the archive.
+
+        Returns the number of events moved. The hot file is rewritten
+        straight away so it shrinks. Events of a year whose archive file
+        can't be read stay where they are.
+        """
+        with self._transaction(record=False) as change:
+            by_year: dict[int, list[Event]] = {}
+            for event in self._events.values():
+                if event.last_date < cutoff:
+                    by_year.setdefault(event.date.year, []).append(event)
+            # Write the archive first, so an interruption leaves duplicates
+            # rather than losing events
+            archived = []
+            for year, events in by_year.items():
+                try:
+                    self.archive.add(year, events)
+                except ArchiveError as e:
+                    logger.error(f"Not archiving events from {year}: {e}")
+                    continue
+                archived.extend(events)
+            if not archived:
+                return 0
+            for event in archived:
+                self._remove(event.id, change, archived=True)
+            # Compact instead of journaling thousands of deletes
+            self._journal_base = None
+            self._scan_archive()
+        return len(archived)
+
+    @perf.timed("storage.save")
     def _save(self) -> None:
-        """Save events to JSON file."""
+        """Save all events to the JSON file atomically and start a fresh journal.
+
+        The date index (see cal.dateindex) is written alongside.
+        """
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        data = {"events": [e.to_dict() for e in self._events.values()]}
-        with open(self.path, "w") as f:
-            json.dump(data, f, indent=2)
+        self._generation += 1
+        events = list(self._events.values())
+        token, refs = self.descriptions.save(events)
+        # One event per line: still readable, and json.dumps can use its C
+        # encoder, which indent=2 would rule out
+        lines = []
+        for event, ref in zip(events, refs):
+            if ref is None:
+                data = event.to_dict()
+            else:
+                data = event.to_dict(description=False)
+                data["desc"] = ref
+            lines.append(json.dumps(data))
+        header = data_header(self._generation, token)
+        text = header + ",\n".join(lines) + "\n]}\n"
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        try:
+            self._write_index(events, lines, len(header), len(text))
+        except OSError as e:
+            logger.warning(f"Could not write date index: {e}")
+
+        self._journal_base = self._file_signature(self.path)
+        header = (json.dumps({"base": list(self._journal_base)}) + "\n").encode()
+        tmp_path = self.journal_path.with_name(f".{self.journal_path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+        os.replace(tmp_path, self.journal_path)
+        self._journal_offset = len(header)
+        self._journal_ops = 0
+        self._signature = self._stat_signature()
+        self.write_status()
+
+    def _write_index(self, events: list[Event], lines: list[str], offset: int, size: int) -> None:
+        """Write the date index for events just saved as `lines` after `offset` bytes.
+
+        json.dumps escapes non-ASCII, so string lengths are byte lengths.
+        """
+        lengths = [len(line) for line in lines]
+        # Each line is followed by ",\n"
+        offsets = list(accumulate((n + 2 for n in lengths[:-1]), initial=offset)) if lines else []
+        line_of = {event.id: number for number, event in enumerate(events)}
+        # Buckets are already in display order. Archived events aren't in
+        # the file and zoned ones are listed separately; usually there are
+        # neither, and the buckets map straight across.
+        by_date = self._by_date
+        if self._archived or self._zoned:
+            skip = self._zoned
+            days = (
+                (day.toordinal(), [line_of[e.id] for e in by_date[day] if e.id in line_of and e.id not in skip])
+                for day in self._dates
+            )
+            days = [(ordinal, numbers) for ordinal, numbers in days if numbers]
+        else:
+            days = [(day.toordinal(), [line_of[e.id] for e in by_date[day]]) for day in self._dates]
+        zoned = [line_of[i] for i in self._zoned if i in line_of]
+        write_index(self.path, self._generation, size, offsets, lengths, days, zoned)
+
+    def _persist(self, ops: list[Operation]) -> None:
+        """Append operations to the journal, compacting it when it gets long."""
+        if (
+            self._journal_base is None
+            or self._signature[1] is None
+            or self._journal_ops + len(ops) > COMPACT_AFTER
+        ):
+            self._save()
+            return
+        with open(self.journal_path, "ab") as f:
+            for op in ops:
+                f.write((json.dumps({"id": op.event_id, "after": op.after}) + "\n").encode())
+            self._journal_offset = f.tell()
+        self._journal_ops += len(ops)
+        self._signature = self._stat_signature()
+        self.write_status()
+
+    @perf.timed("storage.compact")
+    def compact(self) -> None:
+        """Fold the journal into events.json."""
+        with self._file_lock():
+            if self._stat_signature() != self._signature:
+                change = self._load()
+            else:
+                change = StoreChange(external=True)
+            if self._journal_ops or self._journal_base is None:
+                self._save()
+        if change:
+            self._notify(change)
+
+    @contextmanager
+    def _transaction(self, record: bool = True) -> Iterator[StoreChange]:
+        """Apply a mutation under the file lock, on top of any external changes.
+
+        Yields a StoreChange for the mutation to fill in; the change is
+        journaled, recorded for undo (if `record`) and listeners notified
+        only if something changed.
+        """
+        with self._file_lock():
+            external = StoreChange(external=True)
+            if self._stat_signature() != self._signature:
+                external = self._load()
+            change = StoreChange()
+            try:
+                yield change
+            finally:
+                if change:
+                    for op in change.ops:
+                        if op.after is None:
+                            self._hashes.pop(op.event_id, None)
+                        else:
+                            self._hashes[op.event_id] = _content_hash(op.after)
+                    self._persist(change.ops)
+                if external:
+                    self._notify(external)
+        if change:
+            if record:
+                self.history.record(change.ops)
+            self._notify(change)
+
+    def add_listener(self, callback: Callable[[StoreChange], None]) -> None:
+        """Register a callback invoked after events change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[StoreChange], None]) -> None:
+        """Unregister a change callback."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, change: StoreChange) -> None:
+        for callback in list(self._listeners):
+            callback(change)
+
+    @perf.timed("storage.check_for_changes")
+    def check_for_changes(self) -> Optional[StoreChange]:
+        """Pick up changes written by other processes.
+
+        Polling is a single stat() call; only when the file changed is it
+        read again, and only events whose content differs are re-parsed.
+        """
+        if self._stat_signature() == self._signature:
+            return None
+        with self._file_lock():
+            change = self._load()
+        if change:
+            self._notify(change)
+        return change
+
+    def write_status(self, now: Optional[datetime] = None) -> None:
+        """Refresh the status file, if one is configured."""
+        if self.status_path is None:
+            return
+        try:
+            write_status(self.status_path, build_status(self, now))
+        except OSError as e:
+            logger.warning(f"Could not write status file: {e}")
 
+    def _index_add(self, event: Event) -> None:
+        """Add an event, as shown in the display zone, to the indexes."""
+        if event.tz is not None:
+            self._zoned.add(event.id)
+            event = self._zones.convert(event)
+        covered = tuple(event.dates())
+        for day in covered:
+            bucket = self._by_date.get(day)
+            if bucket is None:
+                bucket = self._by_date[day] = []
+                bisect.insort(self._dates, day)
+            bisect.insort(bucket, event, key=lambda e: e.sort_key)
+            self._date_versions[day] = next(self._version_clock)
+        self._indexed_on[event.id] = covered
+        if len(covered) > 1:
+            self._spanning.add(event.id)
+        if event.time:
+            self._intervals.add(
+                event.id, minute_of(event.start_datetime), minute_of(event.end_datetime)
+            )
+        if event.tags:
+            self._tagged_as[event.id] = tuple(event.tags)
+            for tag in event.tags:
+                self._by_tag.setdefault(tag, set()).add(event.id)
+
+    def _index_remove(self, event_id: str) -> tuple[date, ...]:
+        """Remove an event from the indexes, returning the dates it covered."""
+        covered = self._indexed_on.pop(event_id, ())
+        for day in covered:
+            bucket = self._by_date[day]
+            bucket[:] = [e for e in bucket if e.id != event_id]
+            self._date_versions[day] = next(self._version_clock)
+            if not bucket:
+                del self._date_versions[day]
+                del self._by_date[day]
+                del self._dates[bisect.bisect_left(self._dates, day)]
+        self._spanning.discard(event_id)
+        self._intervals.remove(event_id)
+        if event_id in self._zoned:
+            self._zoned.discard(event_id)
+            self._zones.invalidate(event_id)
+        for tag in self._tagged_as.pop(event_id, ()):
+            ids = self._by_tag[tag]
+            ids.discard(event_id)
+            if not ids:
+                del self._by_tag[tag]
+        return covered
+
+    def _put(self, event: Event, change: StoreChange) -> None:
+        """Insert or replace an event in memory and record the change."""
+        old = self._events.get(event.id)
+        old_dates = self._index_remove(event.id)
+        if old is not None:
+            change.updated.add(event.id)
+            change.dates.update(old_dates)
+        else:
+            change.added.add(event.id)
+        if not change.external:
+            # An event mutated in place before update() has lost its old state
+            change.ops.append(
+                Operation(event.id, old.to_dict() if old else None, event.to_dict())
+            )
+        self._events[event.id] = event
+        self._index_add(event)
+        change.dates.update(self._indexed_on[event.id])
+        self._seq += 1
+        self._changed_at[event.id] = self._seq
+        self._deleted_at.pop(event.id, None)
+
+    def _remove(self, event_id: str, change: StoreChange, archived: bool = False) -> None:
+        """Remove an event from memory and record the change.
+
+        Events moved into the archive leave no tombstone: they still exist.
+        """
+        old = self._events.pop(event_id)
+        change.removed.add(event_id)
+        change.dates.update(self._index_remove(event_id))
+        if not change.external:
+            change.ops.append(Operation(event_id, old.to_dict(), None))
+        self._seq += 1
+        self._changed_at.pop(event_id, None)
+        if not archived:
+            self._deleted_at[event_id] = self._seq
+
+    def reload(self) -> None:
+        """Discard in-memory state and load the file again."""
+        self._hashes = {}
+        self._signature = None
+        self._load()
+
+    def _replay(self, ops: list[Operation]) -> None:
+        """Apply operations, refusing if an event has changed since they were made."""
+        with self._transaction(record=False) as change:
+            for op in ops:
+                current = self._events.get(op.event_id)
+                if (current.to_dict() if current else None) != op.before:
+                    raise ValueError(f"'{op.title}' was changed elsewhere")
+            for op in ops:
+                if op.after is None:
+                    self._remove(op.event_id, change)
+                else:
+                    self._put(Event.from_dict(op.after), change)
+
+    @perf.timed("storage.undo")
+    def undo(self) -> Optional[list[Operation]]:
+        """Revert the latest recorded change and return its operations.
+
+        Returns None if there is nothing to undo. Raises ValueError if an
+        affected event was changed elsewhere since.
+        """
+        ops = self.history.peek_undo()
+        if ops is None:
+            return None
+        self._replay([op.inverse() for op in reversed(ops)])
+        self.history.undone()
+        return ops
+
+    @perf.timed("storage.redo")
+    def redo(self) -> Optional[list[Operation]]:
+        """Reapply the latest undone change and return its operations.
+
+        Returns None if there is nothing to redo. Raises ValueError if an
+        affected event was changed elsewhere since.
+        """
+        ops = self.history.peek_redo()
+        if ops is None:
+            return None
+        self._replay(ops)
+        self.history.redone()
+        return ops
+
+    @perf.timed("storage.add")
     def add(self, event: Event) -> None:
         """Add a new event."""
-        self._events[event.id] = event
-        self._save()
+        with self._transaction() as change:
+            self._put(event, change)
 
+    def _check_writable(self, event_id: str) -> None:
+        if event_id in self._archived:
+            raise ValueError("Archived events are read-only")
+
+    @perf.timed("storage.update")
     def update(self, event: Event) -> None:
-        """Update an existing event."""
-        if event.id in self._events:
-            self._events[event.id] = event
-            self._save()
+        """Update an existing event. Raises ValueError for archived events."""
+        self._check_writable(event.id)
+        with self._transaction() as change:
+            if event.id in self._events:
+                self._put(event, change)
 
+    @perf.timed("storage.delete")
     def delete(self, event_id: str) -> None:
-        """Delete an event by ID."""
-        if event_id in self._events:
-            del self._events[event_id]
-            self._save()
+        """Delete an event by ID. Raises ValueError for archived events."""
+        self._check_writable(event_id)
+        with self._transaction() as change:
+            if event_id in self._events:
+                self._remove(event_id, change)
+
+    @perf.timed("storage.delete_many")
+    def delete_many(self, event_ids: Iterable[str]) -> int:
+        """Delete several events as one change with a single write.
+
+        Archived and unknown ids are skipped. Returns the number deleted.
+        """
+        with self._transaction() as change:
+            for event_id in event_ids:
+                if event_id in self._events:
+                    self._remove(event_id, change)
+        return len(change.removed)
+
+    @perf.timed("storage.apply_remote")
+    def apply_remote(self, events: Iterable[Event], removed_ids: Iterable[str]) -> StoreChange:
+        """Apply events fetched from a sync server as one change with a single write.
+
+        Events identical to the stored copy are skipped. The change is not
+        recorded for undo, since undoing it would only be synced back.
+        """
+        with self._transaction(record=False) as change:
+            for event in events:
+                current = self._events.get(event.id)
+                if current is None or current.to_dict() != event.to_dict():
+                    self._put(event, change)
+            for event_id in removed_ids:
+                if event_id in self._events:
+                    self._remove(event_id, change)
+        return change
+
+    @property
+    def change_seq(self) -> int:
+        """The change journal's counter, to pass to changes_since() later."""
+        return self._seq
+
+    def changes_since(self, seq: int) -> tuple[set[str], set[str]]:
+        """Get the ids of events changed and deleted after a change_seq value.
+
+        Only changes made while this object was alive are known; archived
+        events are not reported as deleted.
+        """
+        if seq >= self._seq:
+            return set(), set()
+        changed = {i for i, at in self._changed_at.items() if at > seq}
+        deleted = {i for i, at in self._deleted_at.items() if at > seq}
+        return changed, deleted
+
+    def event_ids(self) -> list[str]:
+        """Get the ids of all events in the hot file (not the archive)."""
+        return list(self._events)
+
+    def load_archive(self) -> None:
+        """Load every archived year not loaded yet."""
+        if self._archive_pending:
+            self._ensure_archived(date(self._archive_pending[0], 1, 1), date.max)
+
+    def find_duplicates(self) -> list[list[Event]]:
+        """Group events that differ only in id (see cal.dedupe), keeper first."""
+        return group_duplicates(self._events.values())
 
     def get(self, event_id: str) -> Optional[Event]:
-        """Get an event by ID."""
-        return self._events.get(event_id)
+        """Get an event by ID (including archived events already loaded).
+
+        This is the event as stored, in its own timezone; queries return
+        events as shown in the display zone.
+        """
+        return self._events.get(event_id) or self._archived.get(event_id)
+
+    def displayed(self, event_id: str) -> Optional[Event]:
+        """Get an event by ID as shown in the display zone."""
+        event = self.get(event_id)
+        return self._zones.convert(event) if event is not None else None
+
+    @property
+    def display_timezone(self) -> Optional[str]:
+        """The IANA zone events are shown in (None for the system zone)."""
+        return self._zones.zone_name
+
+    def set_display_timezone(self, zone_name: Optional[str]) -> None:
+        """Show events in another zone, re-indexing only events with a timezone.
+
+        Raises ValueError for unknown zones. Nothing is written to disk.
+        """
+        if zone_name == self._zones.zone_name:
+            return
+        self._zones = ZoneConverter(zone_name)
+        change = StoreChange()
+        zoned = list(self._zoned)
+        # Remove all before adding any, so the interval index sorts once
+        for event_id in zoned:
+            change.dates.update(self._index_remove(event_id))
+        for event_id in zoned:
+            self._index_add(self.get(event_id))
+            change.dates.update(self._indexed_on[event_id])
+            change.updated.add(event_id)
+        if change:
+            self._notify(change)
+
+    def is_archived(self, event_id: str) -> bool:
+        """Check whether an event is a read-only archived one."""
+        return event_id in self._archived
 
     def get_all(self) -> list[Event]:
-        """Get all events sorted by date and time."""
-        return sorted(self._events.values(), key=lambda e: e.sort_key)
+        """Get all loaded events sorted by date and time.
+
+        Archived years are only included once a query has loaded them.
+        """
+        if not self._dates:
+            return []
+        return list(self._iter_range(self._dates[0], self._dates[-1]))
 
+    @perf.timed("storage.get_by_date")
     def get_by_date(self, target_date: date) -> list[Event]:
         """Get all events for a specific date."""
-        events = [e for e in self._events.values() if e.date == target_date]
-        return sorted(events, key=lambda e: e.sort_key)
+        self._ensure_archived(target_date, target_date)
+        return list(self._by_date.get(target_date, ()))
+
+    def iter_range(self, start: date, end: date) -> Iterator[Event]:
+        """Iterate events between two dates (inclusive) in sorted order."""
+        self._ensure_archived(start, end)
+        return self._iter_range(start, end)
+
+    def _iter_range(self, start: date, end: date) -> Iterator[Event]:
+        lo = bisect.bisect_left(self._dates, start)
+        hi = bisect.bisect_right(self._dates, end)
+        seen: set[str] = set()
+        for d in self._dates[lo:hi]:
+            for event in self._by_date[d]:
+                if event.id in self._spanning:
+                    if event.id in seen:
+                        continue
+                    seen.add(event.id)
+                yield event
+
+    @perf.timed("storage.get_range")
+    def get_range(self, start: date, end: date) -> list[Event]:
+        """Get all events between two dates (inclusive)."""
+        return list(self.iter_range(start, end))
 
     def get_upcoming(self, from_date: date, days: int = 30) -> list[Event]:
         """Get upcoming events within specified days."""
-        from datetime import timedelta
+        return self.get_range(from_date, from_date + timedelta(days=days))
+
+    @perf.timed("storage.get_next")
+    def get_next(self, now: datetime, count: int = 1) -> list[Event]:
+        """Get the next events that have not started yet.
+
+        All-day events on the current date are still considered upcoming.
+        """
+        result: list[Event] = []
+        today = now.date()
+        for event in self.iter_range(today, date.max):
+            if event.date < today or (event.time and event.start_datetime < now):
+                continue
+            result.append(event)
+            if len(result) >= count:
+                break
+        return result
+
+    def indexed_dates(self) -> list[date]:
+        """Get the dates with loaded events, without loading archived years."""
+        return list(self._dates)
+
+    def tags(self) -> list[str]:
+        """Get every tag used by a loaded event, sorted."""
+        return sorted(self._by_tag)
 
-        end_date = from_date + timedelta(days=days)
-        events = [
-            e for e in self._events.values() if from_date <= e.date <= end_date
-        ]
-        return sorted(events, key=lambda e: e.sort_key)
+    def ids_with_tag(self, tag: str) -> AbstractSet[str]:
+        """Get the ids of loaded events with a tag (do not modify the result)."""
+        return self._by_tag.get(tag, _NO_IDS)
 
+    def event_colors(self, events: list[Event]) -> dict[str, str]:
+        """Map event ids to calendar colors (none for a single store)."""
+        return {}
+
+    @property
+    def data_version(self) -> tuple:
+        """A value that changes whenever loaded events, as displayed, change."""
+        return (self._seq, self._zones.zone_name, len(self._archive_loaded))
+
+    def date_version(self, target_date: date) -> int:
+        """Get a counter that changes whenever the date's events change."""
+        return self._date_versions.get(target_date, 0)
+
+    @perf.timed("storage.has_events")
     def has_events(self, target_date: date) -> bool:
         """Check if a date has any events."""
-        return any(e.date == target_date for e in self._events.values())
+        self._ensure_archived(target_date, target_date)
+        return target_date in self._by_date
+
+    def dates_with_events(self, start: date, end: date) -> list[date]:
+        """Get the dates between start and end (inclusive) that have events."""
+        self._ensure_archived(start, end)
+        lo = bisect.bisect_left(self._dates, start)
+        hi = bisect.bisect_right(self._dates, end)
+        return self._dates[lo:hi]
+
+    @perf.timed("storage.get_overlapping")
+    def get_overlapping(self, start: datetime, end: datetime) -> list[Event]:
+        """Get timed events overlapping [start, end), ordered by start.
+
+        Events without an end time count as lasting one minute.
+        """
+        self._ensure_archived(start.date(), end.date())
+        ids = self._intervals.overlapping(minute_of(start), minute_of(end))
+        return [self.displayed(i) for i in ids]
+
+    def timed_spans(self, start: date, end: date) -> list[tuple[int, int, str]]:
+        """Get (start, end, id) minute spans of timed events between two dates (inclusive)."""
+        self._ensure_archived(start, end)
+        return list(self._intervals.spans(
+            minute_of(datetime.combine(start, datetime.min.time())),
+            minute_of(datetime.combine(end + timedelta(days=1), datetime.min.time())),
+        ))
+
+    @perf.timed("storage.get_conflicts")
+    def get_conflicts(self, start: date, end: date) -> list[tuple[Event, Event]]:
+        """Get pairs of timed events that overlap between two dates (inclusive)."""
+        pairs = sweep_conflicts(self.timed_spans(start, end))
+        return [(self.displayed(a), self.displayed(b)) for a, b in pairs]
+
+    def conflict_dates(self, start: date, end: date) -> set[date]:
+        """Get the dates between start and end (inclusive) with overlapping events."""
+        return conflict_days(self.get_conflicts(start, end), start, end)
+
+    def conflicting_ids(self, target_date: date) -> set[str]:
+        """Get the ids of events that overlap another event on a date."""
+        return {e.id for pair in self.get_conflicts(target_date, target_date) for e in pair}
+
+    @perf.timed("storage.search")
+    def search(self, query: str) -> list[Event]:
+        """Find events whose title or description contains the query.
+
+        Searching loads every archived year.
+        """
+        self.load_archive()
+        needle = query.casefold()
+        blob = self.descriptions.blob
+        # Descriptions still on disk are matched in one pass over the blob
+        in_blob = blob.matching(needle) if blob is not None else set()
+
+        def matches(event: Event) -> bool:
+            if needle in event.title.casefold():
+                return True
+            deferred = event.deferred_description
+            if deferred is not None and deferred[0] is blob:
+                return deferred[1][2] in in_blob
+            return needle in event.description.casefold()
+
+        return [e for e in self.get_all() if matches(e)]
@@ -0,0 +1,354 @@
+"""Incremental two-way sync with a calendar server.
+
+The protocol follows CalDAV's collection sync: the server hands out a sync
+token, and asked what changed since a token it lists the ids of changed
+events with their ETags (None for deleted ones). Only events whose ETag
+differs from the one last seen are then fetched, in batches. Local changes
+are uploaded in batches with the ETag they were based on, so the server can
+refuse ones that raced with a remote edit.
+
+The server wins conflicts: an event changed on both sides since the last
+sync takes the server's version.
+
+Per-calendar state (the token, and each event's ETag and content hash as
+last synced) is kept next to the calendar file in `<name>.sync`. Within one
+process, local changes are found from EventStorage's change journal; a
+fresh process compares content hashes of every event instead.
+
+Messages are JSON over HTTP POST:
+
+    /report  {"token": str | null} -> {"token": str, "changes": {id: etag | null}}
+    /fetch   {"ids": [id, ...]} -> {"events": {id: {"etag": str, "data": {...}}}}
+    /upload  {"put": [{"id", "if_match", "data"}], "delete": [{"id", "if_match"}]}
+             -> {"etags": {id: etag}, "conflicts": [id, ...]}
+
+A token the server no longer recognizes gets HTTP 410, and the engine falls
+back to a full listing.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterator, Optional, Protocol
+
+from . import perf
+from .models import Event
+from .storage import EventStorage
+
+logger = logging.getLogger(__name__)
+
+# Events per fetch or upload request
+BATCH_SIZE = 200
+
+
+class SyncError(Exception):
+    """The server could not be reached or sent an invalid response."""
+
+
+class TokenExpired(SyncError):
+    """The server no longer knows the sync token; a full listing is needed."""
+
+
+def content_hash(data: dict) -> str:
+    """Stable hash of an event's serialized form (the same in every process).
+
+    Only hash Event.to_dict() output, whose key order is fixed.
+    """
+    return hashlib.sha1(json.dumps(data).encode()).hexdigest()
+
+
+def _batches(items: list, size: int = BATCH_SIZE) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@dataclass
+class SyncStats:
+    """What one sync transferred and touched."""
+
+    requests: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # Events downloaded, and how they changed local storage
+    fetched: int = 0
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    # Local changes sent, and those the server refused
+    uploaded: int = 0
+    deleted: int = 0
+    rejected: int = 0
+    # Events changed on both sides; the server's version was kept
+    conflicts: int = 0
+    full_listing: bool = False
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def summary(self) -> str:
+        return (
+            f"{self.added} added, {self.updated} updated, {self.removed} removed locally; "
+            f"{self.uploaded} uploaded, {self.deleted} deleted on server"
+            + (f", {self.conflicts} conflict(s) kept server version" if self.conflicts else "")
+            + (f", {self.rejected} rejected" if self.rejected else "")
+            + f" ({self.requests} requests, {self.bytes_sent + self.bytes_received} bytes)"
+        )
+
+
+class Transport(Protocol):
+    """The server operations the engine needs; see the module docstring."""
+
+    stats: SyncStats
+
+    def report(self, token: Optional[str]) -> tuple[str, dict[str, Optional[str]]]: ...
+
+    def fetch(self, ids: list[str]) -> dict[str, tuple[str, dict]]: ...
+
+    def upload(
+        self, put: list[tuple[str, Optional[str], dict]], delete: list[tuple[str, str]]
+    ) -> tuple[dict[str, str], list[str]]: ...
+
+
+class HTTPTransport:
+    """Speaks the sync protocol to a server over HTTP, counting bytes."""
+
+    def __init__(self, url: str, timeout: float = 30.0) -> None:
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.stats = SyncStats()
+
+    def _post(self, path: str, body: dict) -> dict:
+        payload = json.dumps(body).encode()
+        request = urllib.request.Request(
+            f"{self.url}/{path}",
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        self.stats.requests += 1
+        self.stats.bytes_sent += len(payload)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                raw = response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                raise TokenExpired("Sync token expired") from e
+            raise SyncError(f"Server returned {e.code} for /{path}") from e
+        except OSError as e:
+            raise SyncError(f"Could not reach {self.url}: {e}") from e
+        self.stats.bytes_received += len(raw)
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            raise SyncError(f"Invalid response from /{path}: {e}") from e
+
+    def report(self, token: Optional[str]) -> tuple[str, dict[str, Optional[str]]]:
+        """Get a new token and the ETags of events changed since `token` (all if None)."""
+        result = self._post("report", {"token": token})
+        return result["token"], result["changes"]
+
+    def fetch(self, ids: list[str]) -> dict[str, tuple[str, dict]]:
+        """Get the ETag and data of each event, in batches."""
+        found: dict[str, tuple[str, dict]] = {}
+        for batch in _batches(ids):
+            result = self._post("fetch", {"ids": batch})
+            for event_id, item in result["events"].items():
+                found[event_id] = (item["etag"], item["data"])
+        return found
+
+    def upload(
+        self, put: list[tuple[str, Optional[str], dict]], delete: list[tuple[str, str]]
+    ) -> tuple[dict[str, str], list[str]]:
+        """Send changed and deleted events in batches.
+
+        Returns the new ETags of accepted puts and the ids the server refused
+        because their ETag no longer matched.
+        """
+        etags: dict[str, str] = {}
+        conflicts: list[str] = []
+        requests = [{"put": batch, "delete": []} for batch in _batches(
+            [{"id": i, "if_match": etag, "data": data} for i, etag, data in put]
+        )]
+        requests += [{"put": [], "delete": batch} for batch in _batches(
+            [{"id": i, "if_match": etag} for i, etag in delete]
+        )]
+        for body in requests:
+            result = self._post("upload", body)
+            etags.update(result["etags"])
+            conflicts.extend(result["conflicts"])
+        return etags, conflicts
+
+
+class SyncState:
+    """The sync token and each event's (ETag, content hash) as last synced."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.url: Optional[str] = None
+        self.token: Optional[str] = None
+        self.items: dict[str, tuple[str, str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.url = data.get("url")
+            self.token = data.get("token")
+            self.items = {i: (etag, h) for i, (etag, h) in data.get("items", {}).items()}
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Sync state unreadable, starting a full sync: {e}")
+            self.token, self.items = None, {}
+
+    def save(self) -> None:
+        """Write the state atomically."""
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            # json.dumps uses the C encoder; json.dump to a file does not
+            f.write(json.dumps({"url": self.url, "token": self.token, "items": self.items}))
+        os.replace(tmp_path, self.path)
+
+
+class SyncEngine:
+    """Syncs one calendar's storage with a server."""
+
+    def __init__(
+        self,
+        storage: EventStorage,
+        transport: Transport,
+        url: Optional[str] = None,
+        state_path: Optional[Path] = None,
+    ) -> None:
+        """Sync `storage` through `transport`; `url` identifies the server in the state."""
+        self.storage = storage
+        self.transport = transport
+        self.url = url
+        self.state_path = state_path or storage.path.with_name(storage.path.name + ".sync")
+        # The storage's change_seq at the start of the last sync in this
+        # process, or None to compare every event
+        self._seq: Optional[int] = None
+
+    def _local_changes(self, state: SyncState) -> tuple[dict[str, dict], set[str]]:
+        """Find events changed and deleted locally since the last sync.
+
+        Returns the changed events' data by id, and the deleted ids.
+        """
+        storage = self.storage
+        if self._seq is None:
+            candidates = set(storage.event_ids())
+            deleted = set(state.items) - candidates
+            if deleted:
+                # Archived events are not deletions
+                storage.load_archive()
+                deleted = {i for i in deleted if storage.get(i) is None}
+        else:
+            candidates, deleted = storage.changes_since(self._seq)
+            deleted = {i for i in deleted if i in state.items and storage.get(i) is None}
+
+        changed: dict[str, dict] = {}
+        for event_id in candidates:
+            event = storage.get(event_id)
+            if event is None or storage.is_archived(event_id):
+                continue
+            data = event.to_dict()
+            synced = state.items.get(event_id)
+            if synced is None or synced[1] != content_hash(data):
+                changed[event_id] = data
+        return changed, deleted
+
+    def _report(self, state: SyncState, stats: SyncStats) -> tuple[str, dict[str, Optional[str]]]:
+        """Ask what changed on the server, listing everything if the token is gone."""
+        if state.token is not None:
+            try:
+                return self.transport.report(state.token)
+            except TokenExpired:
+                logger.info("Sync token expired, listing all events")
+        stats.full_listing = True
+        token, changes = self.transport.report(None)
+        # A full listing only names live events; anything synced before
+        # and missing from it was deleted on the server
+        for event_id in state.items:
+            changes.setdefault(event_id, None)
+        return token, changes
+
+    def sync(self) -> SyncStats:
+        """Download remote changes, then upload local ones.
+
+        Local storage gets one batched write and the state file one write.
+        Raises SyncError if the server fails; nothing is applied locally
+        unless the download completed.
+        """
+        started = time.perf_counter()
+        stats = self.transport.stats = SyncStats()
+        state = SyncState(self.state_path)
+        if state.url != self.url:
+            # Another server: its tokens and ETags mean nothing here
+            state.url, state.token, state.items = self.url, None, {}
+            self._seq = None
+        seq = self.storage.change_seq
+
+        with perf.span("sync.local_changes"):
+            changed, deleted = self._local_changes(state)
+
+        with perf.span("sync.download"):
+            token, remote = self._report(state, stats)
+            to_fetch = [
+                i for i, etag in remote.items()
+                if etag is not None and (i not in state.items or state.items[i][0] != etag)
+            ]
+            removed = [i for i, etag in remote.items() if etag is None]
+            fetched = self.transport.fetch(to_fetch) if to_fetch else {}
+
+        events: list[Event] = []
+        for event_id, (etag, data) in fetched.items():
+            try:
+                event = Event.from_dict(data)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid event {event_id} from server: {e}")
+                continue
+            events.append(event)
+            state.items[event_id] = (etag, content_hash(event.to_dict()))
+        for event_id in removed:
+            state.items.pop(event_id, None)
+        for event_id in set(fetched) | set(removed):
+            if changed.pop(event_id, None) is not None or event_id in deleted:
+                stats.conflicts += 1
+            deleted.discard(event_id)
+        stats.fetched = len(events)
+
+        with perf.span("sync.apply"):
+            change = self.storage.apply_remote(events, removed)
+        stats.added, stats.updated, stats.removed = (
+            len(change.added), len(change.updated), len(change.removed)
+        )
+
+        with perf.span("sync.upload"):
+            put = [(i, state.items.get(i, (None,))[0], data) for i, data in changed.items()]
+            delete = [(i, state.items[i][0]) for i in deleted]
+            etags, rejected = self.transport.upload(put, delete) if put or delete else ({}, [])
+        rejected_ids = set(rejected)
+        for event_id, data in changed.items():
+            if event_id in etags:
+                state.items[event_id] = (etags[event_id], content_hash(data))
+        for event_id in deleted - rejected_ids:
+            state.items.pop(event_id, None)
+        # Refused changes stay unsynced; the next report brings the
+        # server's version, which wins
+        stats.rejected = len(rejected_ids)
+        stats.uploaded = len(put) - len(rejected_ids & set(changed))
+        stats.deleted = len(deleted - rejected_ids)
+
+        state.token = token
+        state.save()
+        self._seq = seq
+        stats.seconds = time.perf_counter() - started
+        return stats
@@ -0,0 +1,90 @@
+"""Tag filters for narrowing views to events with certain tags.
+
+A filter is written as space-separated terms: ``+tag`` must be present,
+``-tag`` must be absent and a bare ``tag`` is one of several alternatives.
+``+oncall travel 1:1 -optional`` matches events tagged oncall and either
+travel or 1:1, but not optional. Filters are evaluated with set algebra
+on the storage's tag index, never by scanning events.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import AbstractSet, Optional
+
+from .models import Event, normalize_tag
+
+
+@dataclass(frozen=True)
+class TagMatch:
+    """The event ids a filter selects, for O(1) membership tests."""
+
+    # None means every event not excluded
+    include: Optional[AbstractSet[str]]
+    exclude: AbstractSet[str]
+
+    def __contains__(self, event_id: str) -> bool:
+        if self.include is not None and event_id not in self.include:
+            return False
+        return event_id not in self.exclude
+
+    def filter(self, events: list[Event]) -> list[Event]:
+        """Keep the matching events, in order."""
+        return [e for e in events if e.id in self]
+
+
+@dataclass(frozen=True)
+class TagFilter:
+    """Tags an event must have all of, at least one of, and none of."""
+
+    all_of: frozenset[str] = frozenset()
+    any_of: frozenset[str] = frozenset()
+    none_of: frozenset[str] = frozenset()
+
+    @classmethod
+    def parse(cls, text: str) -> "TagFilter":
+        """Parse "+tag tag -tag" terms. Raises ValueError for invalid tags."""
+        all_of, any_of, none_of = set(), set(), set()
+        for term in text.replace(",", " ").split():
+            if term[0] == "+":
+                all_of.add(normalize_tag(term[1:]))
+            elif term[0] == "-":
+                none_of.add(normalize_tag(term[1:]))
+            else:
+                any_of.add(normalize_tag(term))
+        return cls(frozenset(all_of), frozenset(any_of), frozenset(none_of))
+
+    def __bool__(self) -> bool:
+        return bool(self.all_of or self.any_of or self.none_of)
+
+    def __str__(self) -> str:
+        return " ".join(
+            [f"+{t}" for t in sorted(self.all_of)]
+            + sorted(self.any_of)
+            + [f"-{t}" for t in sorted(self.none_of)]
+        )
+
+    def select(self, storage) -> TagMatch:
+        """Resolve the filter against a storage's tag index.
+
+        Required tags are intersected smallest first, so the cost is bounded
+        by the rarest tag rather than the number of events.
+        """
+        include: Optional[AbstractSet[str]] = None
+        if self.any_of:
+            include = frozenset().union(*(storage.ids_with_tag(t) for t in self.any_of))
+        for ids in sorted((storage.ids_with_tag(t) for t in self.all_of), key=len):
+            include = ids if include is None else include & ids
+        exclude = frozenset().union(*(storage.ids_with_tag(t) for t in self.none_of))
+        return TagMatch(include, exclude)
+
+    def matching_dates(self, storage, start: date, end: date) -> set[date]:
+        """Get the dates between start and end (inclusive) with a matching event."""
+        match = self.select(storage)
+        dates: set[date] = set()
+        for event in storage.iter_range(start, end):
+            if event.id in match:
+                day, last = max(event.date, start), min(event.last_date, end)
+                while day <= last:
+                    dates.add(day)
+                    day += timedelta(days=1)
+        return dates
@@ -0,0 +1,45 @@
+"""Conversion of timezone-aware events into the display zone.
+
+Events with a ``tz`` are stored in their own zone's wall-clock time. Views
+show them shifted into the display zone. Each event is converted once per
+zone and the result kept in a bounded cache keyed by the event's id. Storage
+drops an event's entry when the event changes, and starts a fresh converter
+when the display zone changes.
+"""
+
+from datetime import tzinfo
+from typing import Optional
+
+from . import perf
+from .lru import LRUCache
+from .models import Event, get_zone
+
+CACHE_SIZE = 4096
+
+
+class ZoneConverter:
+    """Converts events into one display zone, caching the results."""
+
+    def __init__(self, zone_name: Optional[str] = None, maxsize: int = CACHE_SIZE) -> None:
+        """Use the named IANA zone, or the system's local zone if None."""
+        self.zone_name = zone_name
+        self.zone: Optional[tzinfo] = get_zone(zone_name) if zone_name else None
+        self._cache: LRUCache[str, tuple[Event, Event]] = LRUCache(maxsize)
+
+    def convert(self, event: Event) -> Event:
+        """Get the event as shown in the display zone."""
+        if event.tz is None or event.time is None:
+            return event
+        cached = self._cache.get(event.id)
+        # The original is kept alongside so an event replaced without
+        # invalidate() is never served stale
+        if cached is not None and cached[0] is event:
+            return cached[1]
+        with perf.span("timezones.convert"):
+            shown = event.in_zone(self.zone)
+        self._cache.put(event.id, (event, shown))
+        return shown
+
+    def invalidate(self, event_id: str) -> None:
+        """Forget an event's conversion after it changed."""
+        self._cache.pop(event_id)
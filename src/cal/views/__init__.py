@@ -1,7 +1,19 @@
 """Calendar views."""
 
-from .month import MonthView
-from .day import DayView
-from .agenda import AgendaView
+from importlib import import_module
 
-__all__ = ["MonthView", "DayView", "AgendaView"]
+__all__ = ["MonthView", "WeekView", "DayView", "AgendaView"]
+
+# Views are imported on first access so the app only pays for the ones it shows
+_MODULES = {
+    "MonthView": ".month",
+    "WeekView": ".week",
+    "DayView": ".day",
+    "AgendaView": ".agenda",
+}
+
+
+def __getattr__(name: str):
+    if name in _MODULES:
+        return getattr(import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
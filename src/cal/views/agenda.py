@@ -1,6 +1,6 @@
 """Agenda view showing upcoming events."""
 
-from datetime import date
+from datetime import date, timedelta
 
 from textual.app import ComposeResult
 from textual.widget import Widget
@@ -9,6 +9,7 @@ from textual.containers import Vertical
 from textual.message import Message
 
 from ..models import Event
+from ..tags import TagFilter
 from ..widgets.event_list import EventList
 
 
@@ -26,6 +27,7 @@ class AgendaView(Widget):
         super().__init__(**kwargs)
         self.storage = storage
         self.days = days
+        self.tag_filter = TagFilter()
 
     def compose(self) -> ComposeResult:
         with Vertical(id="agenda-view-container"):
@@ -37,16 +39,35 @@ class AgendaView(Widget):
 
     def _update_display(self) -> None:
         events = []
+        colors: dict[str, str] = {}
         if self.storage:
             events = self.storage.get_upcoming(date.today(), self.days)
+            if self.tag_filter:
+                events = self.tag_filter.select(self.storage).filter(events)
+            colors = self.storage.event_colors(events)
 
         event_list = self.query_one("#agenda-events", EventList)
-        event_list.set_events(events)
+        event_list.set_events(events, colors=colors)
+
+    def set_filter(self, tag_filter: TagFilter) -> None:
+        """Show only events matching a tag filter."""
+        self.tag_filter = tag_filter
+        if self.is_mounted:
+            self._update_display()
+
+    def shows_any(self, dates: set[date]) -> bool:
+        """Check whether any of the dates falls in the agenda window."""
+        start = date.today()
+        end = start + timedelta(days=self.days)
+        return any(start <= d <= end for d in dates)
 
     def refresh_events(self) -> None:
         """Refresh the event list."""
         self._update_display()
 
+    def refresh_holidays(self) -> None:
+        """Nothing to do: the agenda does not show holidays."""
+
     def on_event_list_event_selected(self, message: EventList.EventSelected) -> None:
         self.post_message(self.EventSelected(message.event))
 
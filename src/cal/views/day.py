@@ -5,11 +5,13 @@ from datetime import date
 from textual.app import ComposeResult
 from textual.widget import Widget
 from textual.widgets import Static
-from textual.containers import Vertical
+from textual.containers import Vertical, VerticalScroll
 from textual.message import Message
 
 from ..models import Event
+from ..tags import TagFilter
 from ..widgets.event_list import EventList
+from ..widgets.timeline import DayTimeline
 
 
 class DayView(Widget):
@@ -27,31 +29,73 @@ class DayView(Widget):
         self.storage = storage
         self.holiday_provider = holiday_provider
         self._current_date = date.today()
+        self._timeline = False
+        self.tag_filter = TagFilter()
 
     def compose(self) -> ComposeResult:
         with Vertical(id="day-view-container"):
             yield Static(id="day-title")
             yield Static(id="holiday-banner")
             yield EventList(id="day-events", show_full=True)
+            with VerticalScroll(id="day-timeline-scroll"):
+                yield DayTimeline(storage=self.storage, id="day-timeline")
 
     def on_mount(self) -> None:
-        self._update_display()
+        self._show_mode()
 
     def set_date(self, target_date: date) -> None:
         """Set the date to display."""
         self._current_date = target_date
-        self._update_display()
+        if self.is_mounted:
+            self._update_display()
 
     @property
     def current_date(self) -> date:
         return self._current_date
 
+    @property
+    def timeline(self) -> bool:
+        return self._timeline
+
+    def toggle_timeline(self) -> None:
+        """Switch between the event list and the hour timeline."""
+        self._timeline = not self._timeline
+        if self.is_mounted:
+            self._show_mode()
+
+    def _show_mode(self) -> None:
+        self.query_one("#day-events").display = not self._timeline
+        self.query_one("#day-timeline-scroll").display = self._timeline
+        self._update_display()
+
     def _update_display(self) -> None:
         title = self.query_one("#day-title", Static)
         date_str = self._current_date.strftime("%A, %B %d, %Y")
         title.update(f"  {date_str}")
 
-        # Update holiday banner
+        self._update_banner()
+
+        if self._timeline:
+            # The hidden list is refreshed when switching back
+            self.query_one("#day-timeline", DayTimeline).show_date(
+                self._current_date, self.tag_filter
+            )
+            return
+
+        events = []
+        conflicts: set[str] = set()
+        colors: dict[str, str] = {}
+        if self.storage:
+            events = self.storage.get_by_date(self._current_date)
+            if self.tag_filter:
+                events = self.tag_filter.select(self.storage).filter(events)
+            conflicts = self.storage.conflicting_ids(self._current_date)
+            colors = self.storage.event_colors(events)
+
+        event_list = self.query_one("#day-events", EventList)
+        event_list.set_events(events, conflicts, colors)
+
+    def _update_banner(self) -> None:
         holiday_banner = self.query_one("#holiday-banner", Static)
         holiday_name = None
         if self.holiday_provider:
@@ -64,12 +108,20 @@ class DayView(Widget):
             holiday_banner.update("")
             holiday_banner.display = False
 
-        events = []
-        if self.storage:
-            events = self.storage.get_by_date(self._current_date)
+    def refresh_holidays(self) -> None:
+        """Update the holiday banner after the holiday settings changed."""
+        if self.is_mounted:
+            self._update_banner()
 
-        event_list = self.query_one("#day-events", EventList)
-        event_list.set_events(events)
+    def set_filter(self, tag_filter: TagFilter) -> None:
+        """Show only events matching a tag filter."""
+        self.tag_filter = tag_filter
+        if self.is_mounted:
+            self._update_display()
+
+    def shows_any(self, dates: set[date]) -> bool:
+        """Check whether the displayed date is among the dates."""
+        return self._current_date in dates
 
     def refresh_events(self) -> None:
         """Refresh the event list."""
@@ -81,5 +133,7 @@ class DayView(Widget):
     @property
     def selected_event(self) -> Event | None:
         """Get currently selected event."""
+        if self._timeline:
+            return None
         event_list = self.query_one("#day-events", EventList)
         return event_list.selected_event
@@ -71,5 +71,16 @@ class MonthView(Widget):
     def move_selection(self, days: int) -> None:
         self.calendar.move_selection(days)
 
+    def shows_any(self, dates: set[date]) -> bool:
+        """Check whether any of the dates is in the displayed month."""
+        month = self.calendar.current_month
+        return any(d.year == month.year and d.month == month.month for d in dates)
+
     def refresh_events(self) -> None:
         self.calendar.refresh_events()
+
+    def set_filter(self, tag_filter) -> None:
+        self.calendar.set_filter(tag_filter)
+
+    def refresh_holidays(self) -> None:
+        self.calendar.refresh_holidays()
@@ -0,0 +1,296 @@
+"""Week view showing seven days side by side."""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.text import Text
+from textual.app import ComposeResult
+from textual.widget import Widget
+from textual.widgets import Static
+from textual.containers import Vertical, VerticalScroll
+
+from .. import perf
+from ..lru import LRUCache
+from ..models import Event
+from ..tags import TagFilter
+from ..widgets.timeline import FIRST_HOUR, LAST_HOUR, DayLayout, Placement, layout_day
+
+LABEL_WIDTH = 6
+# All-day lines shown per day before "+N more"
+MAX_ALL_DAY = 3
+CACHE_SIZE = 16
+
+
+@dataclass(frozen=True)
+class WeekLayout:
+    """Layouts of the seven days of a week, on a shared range of hours."""
+
+    start: date
+    days: list[DayLayout]
+    first_hour: int
+    last_hour: int
+
+
+def week_start(day: date) -> date:
+    """The Monday of a date's week."""
+    return day - timedelta(days=day.weekday())
+
+
+def layout_week(events: list[Event], start: date) -> WeekLayout:
+    """Lay out a week's events, given all of them in one list.
+
+    Events covering several days are laid out on each day of the week
+    they cover.
+    """
+    by_day: list[list[Event]] = [[] for _ in range(7)]
+    for event in events:
+        for day in event.dates():
+            offset = (day - start).days
+            if 0 <= offset < 7:
+                by_day[offset].append(event)
+    days = [layout_day(day_events, start + timedelta(days=i)) for i, day_events in enumerate(by_day)]
+    return WeekLayout(
+        start,
+        days,
+        min([FIRST_HOUR] + [d.first_hour for d in days]),
+        max([LAST_HOUR] + [d.last_hour for d in days]),
+    )
+
+
+class WeekRenderable:
+    """Renders a WeekLayout as a header, all-day lines and hour rows."""
+
+    def __init__(
+        self,
+        layout: WeekLayout,
+        selected: date,
+        conflicts: set[str],
+        colors: dict[str, str],
+        holidays: dict[date, str],
+    ) -> None:
+        self.layout = layout
+        self.selected = selected
+        self.conflicts = conflicts
+        self.colors = colors
+        self.holidays = holidays
+
+    def _cell(self, label: str, width: int) -> str:
+        return label[: width - 1].ljust(width - 1) + " "
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        layout = self.layout
+        width = max((options.max_width - LABEL_WIDTH) // 7, 6)
+        today = date.today()
+        days = [layout.start + timedelta(days=i) for i in range(7)]
+
+        line = Text(" " * LABEL_WIDTH)
+        for day in days:
+            style = "bold reverse" if day == self.selected else "bold"
+            if day in self.holidays:
+                style += " red"
+            elif day == today:
+                style += " cyan"
+            line.append(self._cell(day.strftime("%a %d"), width), style=style)
+        yield line
+
+        all_day = [d.all_day for d in layout.days]
+        lines = min(max(map(len, all_day)), MAX_ALL_DAY + 1)
+        for row in range(lines):
+            line = Text(" " * LABEL_WIDTH)
+            for day, events in zip(days, all_day):
+                if row == MAX_ALL_DAY and len(events) > MAX_ALL_DAY + 1:
+                    line.append(self._cell(f"+{len(events) - MAX_ALL_DAY} more", width), style="dim")
+                elif row < len(events):
+                    event = events[row]
+                    line.append(self._cell(event.title, width), style=self.colors.get(event.id, "bold"))
+                elif row == 0 and day in self.holidays:
+                    line.append(self._cell(self.holidays[day], width), style="red")
+                else:
+                    line.append(" " * width)
+            yield line
+
+        by_row: list[dict[int, list[Placement]]] = []
+        for day_layout in layout.days:
+            rows: dict[int, list[Placement]] = {}
+            for placement in day_layout.placements:
+                for row in range(placement.first_row, placement.last_row):
+                    rows.setdefault(row, []).append(placement)
+            by_row.append(rows)
+
+        for hour in range(layout.first_hour, layout.last_hour):
+            line = Text(f"{hour:02d}:00".ljust(LABEL_WIDTH), style="dim")
+            for rows in by_row:
+                placements = rows.get(hour)
+                if not placements:
+                    line.append(" " * width)
+                    continue
+                placement = min(placements, key=lambda p: p.column)
+                event = placement.event
+                conflict = any(p.event.id in self.conflicts for p in placements)
+                color = self.colors.get(event.id, "")
+                more = f" +{len(placements) - 1}" if len(placements) > 1 else ""
+                if hour == placement.first_row:
+                    label = f"{event.time.strftime('%H:%M')} {event.title}"
+                    style = "bold yellow" if conflict else f"bold {color}".strip()
+                else:
+                    label = "│"
+                    style = "yellow" if conflict else (color or "dim")
+                cell = self._cell(label, width - len(more)) + more
+                line.append(cell[:width].ljust(width), style=style)
+            yield line
+
+
+class WeekGrid(Static):
+    """A week as a single renderable.
+
+    Each week's layout comes from one range query and is cached until the
+    storage's version of one of its dates changes, so paging back and forth
+    between weeks does not query or lay them out again.
+    """
+
+    def __init__(self, storage=None, holiday_provider=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.storage = storage
+        self.holiday_provider = holiday_provider
+        self._cache: LRUCache[date, tuple[tuple, WeekLayout]] = LRUCache(CACHE_SIZE)
+        # The date and tag filter last shown, to redraw once holidays are ready
+        self._shown: tuple[date, TagFilter] | None = None
+
+    def _layout(self, start: date, tag_filter: TagFilter) -> WeekLayout:
+        # A date's tag matches can only change along with its version
+        key = (tuple(self.storage.date_version(start + timedelta(days=i)) for i in range(7)), tag_filter)
+        cached = self._cache.get(start)
+        if cached and cached[0] == key:
+            return cached[1]
+        with perf.span("week.layout"):
+            events = self.storage.get_range(start, start + timedelta(days=6))
+            if tag_filter:
+                events = tag_filter.select(self.storage).filter(events)
+            layout = layout_week(events, start)
+        self._cache.put(start, (key, layout))
+        return layout
+
+    def show_week(self, selected: date, tag_filter: TagFilter | None = None) -> None:
+        """Render the week containing a date, with only events matching a tag filter."""
+        if tag_filter is None:
+            tag_filter = TagFilter()
+        if self.storage is None:
+            self.update("")
+            return
+        self._shown = (selected, tag_filter)
+        start = week_start(selected)
+        layout = self._layout(start, tag_filter)
+        conflicts: set[str] = set()
+        placed: list[Event] = []
+        for i, day_layout in enumerate(layout.days):
+            if day_layout.placements:
+                conflicts |= self.storage.conflicting_ids(start + timedelta(days=i))
+            placed += day_layout.all_day
+            placed += [p.event for p in day_layout.placements]
+        colors = self.storage.event_colors(placed)
+        holidays = self._ready_holidays(start)
+        self.update(WeekRenderable(layout, selected, conflicts, colors, holidays))
+
+    def _ready_holidays(self, start: date) -> dict[date, str]:
+        """Holidays of a week, if they can be looked up without blocking.
+
+        As in the month grid, a year whose holidays aren't built yet is
+        built in a worker, and the week drawn again once it is ready.
+        """
+        provider = self.holiday_provider
+        if not provider or not provider.config.show_holidays:
+            return {}
+        days = [start + timedelta(days=i) for i in range(7)]
+        years = {day.year for day in days}
+        if all(provider.is_year_loaded(year) for year in years):
+            return {day: name for day in days if (name := provider.get_holiday_name(day))}
+        self.run_worker(
+            lambda: self._load_holidays(start, years), thread=True, exclusive=True, group="holidays"
+        )
+        return {}
+
+    def _load_holidays(self, start: date, years: set[int]) -> None:
+        """Build the holidays of a week's years in a worker thread."""
+        for year in years:
+            self.holiday_provider.get_holiday_name(date(year, 1, 1))
+        self.app.call_from_thread(self._holidays_loaded, start)
+
+    def _holidays_loaded(self, start: date) -> None:
+        """Draw the week again, if it is still shown."""
+        if self._shown is not None and week_start(self._shown[0]) == start:
+            self.show_week(*self._shown)
+
+
+class WeekView(Widget):
+    """Week view: seven days of events on a shared hour grid."""
+
+    def __init__(self, storage=None, holiday_provider=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.storage = storage
+        self.holiday_provider = holiday_provider
+        self._current_date = date.today()
+        self.tag_filter = TagFilter()
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="week-view-container"):
+            yield Static(id="week-title")
+            with VerticalScroll(id="week-scroll"):
+                yield WeekGrid(
+                    storage=self.storage,
+                    holiday_provider=self.holiday_provider,
+                    id="week-grid",
+                )
+
+    def on_mount(self) -> None:
+        self._update_display()
+
+    def set_date(self, target_date: date) -> None:
+        """Show the week containing a date, with that date selected."""
+        self._current_date = target_date
+        if self.is_mounted:
+            self._update_display()
+
+    @property
+    def current_date(self) -> date:
+        return self._current_date
+
+    def move_selection(self, days: int) -> None:
+        """Move the selected date, changing weeks when it leaves this one."""
+        self.set_date(self._current_date + timedelta(days=days))
+
+    def _update_display(self) -> None:
+        start = week_start(self._current_date)
+        end = start + timedelta(days=6)
+        if start.month == end.month:
+            span = f"{start.day} - {end.strftime('%d %B %Y')}"
+        else:
+            span = f"{start.strftime('%d %b')} - {end.strftime('%d %b %Y')}"
+        week = self._current_date.isocalendar().week
+        self.query_one("#week-title", Static).update(f"  Week {week}, {span}")
+        self.query_one("#week-grid", WeekGrid).show_week(self._current_date, self.tag_filter)
+
+    def set_filter(self, tag_filter: TagFilter) -> None:
+        """Show only events matching a tag filter."""
+        self.tag_filter = tag_filter
+        if self.is_mounted:
+            self._update_display()
+
+    def shows_any(self, dates: set[date]) -> bool:
+        """Check whether any of the dates is in the displayed week."""
+        start = week_start(self._current_date)
+        return any(0 <= (d - start).days < 7 for d in dates)
+
+    def refresh_events(self) -> None:
+        """Redraw the week; only changed weeks are laid out again."""
+        self._update_display()
+
+    def refresh_holidays(self) -> None:
+        """Redraw the week after the holiday settings changed."""
+        if self.is_mounted:
+            self._update_display()
+
+    @property
+    def selected_event(self) -> Event | None:
+        """The week view has no event selection."""
+        return None
@@ -1,7 +1,18 @@
 """Calendar widgets."""
 
-from .calendar_grid import CalendarGrid
-from .event_list import EventList
-from .event_form import EventForm
+from importlib import import_module
 
 __all__ = ["CalendarGrid", "EventList", "EventForm"]
+
+# Widgets are imported on first access so the app only pays for the ones it shows
+_MODULES = {
+    "CalendarGrid": ".calendar_grid",
+    "EventList": ".event_list",
+    "EventForm": ".event_form",
+}
+
+
+def __getattr__(name: str):
+    if name in _MODULES:
+        return getattr(import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
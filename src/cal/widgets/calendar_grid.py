@@ -10,6 +10,12 @@ from textual.containers import Grid
 from textual.reactive import reactive
 from textual.message import Message
 
+from .. import perf
+from ..tags import TagFilter
+
+# Cells in the grid: the most weeks a month spans
+GRID_CELLS = 6 * 7
+
 
 class DayCell(Static):
     """A single day cell in the calendar grid."""
@@ -30,6 +36,7 @@ class DayCell(Static):
         has_events: bool = False,
         is_other_month: bool = False,
         is_holiday: bool = False,
+        has_conflict: bool = False,
     ) -> None:
         super().__init__()
         self.day = day
@@ -39,19 +46,77 @@ class DayCell(Static):
         self.has_events = has_events
         self.is_other_month = is_other_month
         self.is_holiday = is_holiday
+        self.has_conflict = has_conflict
 
     def compose(self) -> ComposeResult:
+        yield Static(self._label())
+
+    def show(
+        self,
+        day: int,
+        cell_date: date | None,
+        is_today: bool,
+        is_selected: bool,
+        has_events: bool,
+        is_other_month: bool,
+        is_holiday: bool,
+        has_conflict: bool,
+    ) -> None:
+        """Show another day in place, as the grid pages between months."""
+        state = (day, cell_date, is_today, is_selected, has_events, is_other_month, is_holiday, has_conflict)
+        if state == self._state():
+            return
+        self.day, self.cell_date = day, cell_date
+        self.is_today, self.is_selected = is_today, is_selected
+        self.has_events, self.has_conflict = has_events, has_conflict
+        self.is_other_month, self.is_holiday = is_other_month, is_holiday
+        self._refresh()
+
+    def _state(self) -> tuple:
+        return (
+            self.day, self.cell_date, self.is_today, self.is_selected,
+            self.has_events, self.is_other_month, self.is_holiday, self.has_conflict,
+        )
+
+    def _refresh(self) -> None:
+        # Before compose the label is built from the attributes anyway
+        if self.children:
+            self.query_one(Static).update(self._label())
+        self._update_classes()
+
+    def _label(self) -> str:
         if self.day == 0:
-            yield Static("")
-        else:
-            indicator = " *" if self.has_events else "  "
-            yield Static(f"{self.day:2}{indicator}")
+            return ""
+        indicator = " !" if self.has_conflict else " *" if self.has_events else "  "
+        return f"{self.day:2}{indicator}"
+
+    def set_selected(self, is_selected: bool) -> None:
+        """Update the selection highlight in place."""
+        if is_selected != self.is_selected:
+            self.is_selected = is_selected
+            self._update_classes()
+
+    def set_holiday(self, is_holiday: bool) -> None:
+        """Update the holiday marker in place."""
+        if is_holiday != self.is_holiday:
+            self.is_holiday = is_holiday
+            self._update_classes()
+
+    def set_flags(self, has_events: bool, has_conflict: bool) -> None:
+        """Update the event and conflict markers in place."""
+        if (has_events, has_conflict) == (self.has_events, self.has_conflict):
+            return
+        self.has_events = has_events
+        self.has_conflict = has_conflict
+        self._refresh()
 
     def on_mount(self) -> None:
         self._update_classes()
 
     def _update_classes(self) -> None:
-        self.remove_class("today", "selected", "has-events", "other-month", "holiday")
+        self.remove_class(
+            "today", "selected", "has-events", "other-month", "holiday", "conflict"
+        )
         if self.is_today:
             self.add_class("today")
         if self.is_selected:
@@ -62,6 +127,8 @@ class DayCell(Static):
             self.add_class("other-month")
         if self.is_holiday:
             self.add_class("holiday")
+        if self.has_conflict:
+            self.add_class("conflict")
 
     def on_click(self) -> None:
         if self.cell_date:
@@ -92,7 +159,9 @@ class CalendarGrid(Widget):
         super().__init__(**kwargs)
         self.storage = storage
         self.holiday_provider = holiday_provider
+        self.tag_filter = TagFilter()
         self._cells: list[DayCell] = []
+        self._conflict_dates: set[date] = set()
 
     def compose(self) -> ComposeResult:
         yield Grid(id="weekday-header")
@@ -118,11 +187,17 @@ class CalendarGrid(Widget):
             self._update_selection()
             self.post_message(self.DateSelected(new_date))
 
+    @perf.timed("grid.rebuild")
     def _rebuild_grid(self) -> None:
-        """Rebuild the calendar grid for current month."""
-        grid = self.query_one("#calendar-grid", Grid)
-        grid.remove_children()
-        self._cells = []
+        """Show the current month in the grid.
+
+        The cells are mounted once and updated in place: remounting 42
+        widgets on every page was most of its cost. Weeks a month doesn't
+        span are hidden.
+        """
+        if not self._cells:
+            self._cells = [DayCell(0, None) for _ in range(GRID_CELLS)]
+            self.query_one("#calendar-grid", Grid).mount_all(self._cells)
 
         today = date.today()
         year = self.current_month.year
@@ -131,37 +206,103 @@ class CalendarGrid(Widget):
         cal = calendar.Calendar(firstweekday=0)
         weeks = cal.monthdatescalendar(year, month)
 
-        for week in weeks:
-            for day_date in week:
-                is_other_month = day_date.month != month
-                day_num = day_date.day if not is_other_month else 0
-
-                has_events = False
-                if self.storage and not is_other_month:
-                    has_events = self.storage.has_events(day_date)
-
-                is_holiday = False
-                if self.holiday_provider and not is_other_month:
-                    is_holiday = self.holiday_provider.is_holiday(day_date)
-
-                cell = DayCell(
-                    day=day_num,
-                    cell_date=day_date if not is_other_month else None,
-                    is_today=day_date == today and not is_other_month,
-                    is_selected=day_date == self.selected_date and not is_other_month,
-                    has_events=has_events,
-                    is_other_month=is_other_month,
-                    is_holiday=is_holiday,
-                )
-                self._cells.append(cell)
-                grid.mount(cell)
+        self._conflict_dates = set()
+        if self.storage:
+            self._conflict_dates = self.storage.conflict_dates(weeks[0][0], weeks[-1][-1])
+        event_dates = self._filtered_dates(weeks[0][0], weeks[-1][-1])
+
+        holiday_dates = self._ready_holidays()
+
+        days = [day_date for week in weeks for day_date in week]
+        for cell, day_date in zip(self._cells, days):
+            is_other_month = day_date.month != month
+            day_num = day_date.day if not is_other_month else 0
+
+            has_events, has_conflict = False, False
+            if not is_other_month:
+                has_events, has_conflict = self._flags(day_date, event_dates)
+
+            is_holiday = not is_other_month and day_date in holiday_dates
+
+            cell.show(
+                day=day_num,
+                cell_date=day_date if not is_other_month else None,
+                is_today=day_date == today and not is_other_month,
+                is_selected=day_date == self.selected_date and not is_other_month,
+                has_events=has_events,
+                is_other_month=is_other_month,
+                is_holiday=is_holiday,
+                has_conflict=has_conflict,
+            )
+            cell.display = True
+        for cell in self._cells[len(days):]:
+            cell.show(0, None, False, False, False, True, False, False)
+            cell.display = False
+
+    def _filtered_dates(self, start: date, end: date) -> set[date] | None:
+        """Dates with events matching the tag filter, or None when unfiltered."""
+        if not self.storage or not self.tag_filter:
+            return None
+        return self.tag_filter.matching_dates(self.storage, start, end)
+
+    def _flags(self, day: date, event_dates: set[date] | None) -> tuple[bool, bool]:
+        """Whether a day has (matching) events, and whether they conflict."""
+        if not self.storage:
+            return False, False
+        if event_dates is None:
+            has_events = self.storage.has_events(day)
+        else:
+            has_events = day in event_dates
+        return has_events, has_events and day in self._conflict_dates
+
+    def set_filter(self, tag_filter: TagFilter) -> None:
+        """Show only days with events matching a tag filter, updating cells in place."""
+        self.tag_filter = tag_filter
+        if not self._cells:
+            return
+        dated = [cell for cell in self._cells if cell.cell_date]
+        event_dates = self._filtered_dates(dated[0].cell_date, dated[-1].cell_date)
+        for cell in dated:
+            cell.set_flags(*self._flags(cell.cell_date, event_dates))
+
+    def _ready_holidays(self) -> set[date]:
+        """Holidays of the displayed month, if they can be looked up without blocking.
+
+        Holiday data is built lazily; if this year isn't ready yet, the grid
+        is painted now and the holiday flags filled in from a worker.
+        """
+        if not self.holiday_provider or not self.holiday_provider.config.show_holidays:
+            return set()
+        month = self.current_month
+        if self.holiday_provider.is_year_loaded(month.year):
+            return set(self.holiday_provider.get_holidays_in_month(month.year, month.month))
+        self.run_worker(self._load_holidays, thread=True, exclusive=True, group="holidays")
+        return set()
+
+    def refresh_holidays(self) -> None:
+        """Recompute holiday flags in place after the holiday settings changed."""
+        if self._cells:
+            self._apply_holidays(self.current_month, self._ready_holidays())
+
+    def _load_holidays(self) -> None:
+        """Build the displayed month's holidays in a worker thread."""
+        month = self.current_month
+        holidays = self.holiday_provider.get_holidays_in_month(month.year, month.month)
+        self.app.call_from_thread(self._apply_holidays, month, set(holidays))
+
+    def _apply_holidays(self, month: date, holiday_dates: set[date]) -> None:
+        """Update holiday flags in place, if the month is still displayed."""
+        if month != self.current_month:
+            return
+        for cell in self._cells:
+            if cell.cell_date:
+                cell.set_holiday(cell.cell_date in holiday_dates)
 
     def _update_selection(self) -> None:
         """Update selection highlight without rebuilding grid."""
         for cell in self._cells:
             if cell.cell_date:
-                cell.is_selected = cell.cell_date == self.selected_date
-                cell._update_classes()
+                cell.set_selected(cell.cell_date == self.selected_date)
 
     def on_day_cell_selected(self, message: DayCell.Selected) -> None:
         self.selected_date = message.date
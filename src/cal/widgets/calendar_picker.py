@@ -0,0 +1,62 @@
+"""Modal for showing and hiding calendars."""
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, ListItem, ListView
+from textual.containers import Vertical
+
+from ..calendars import CalendarInfo
+
+
+class CalendarItem(ListItem):
+    """A calendar with its color and visibility."""
+
+    def __init__(self, info: CalendarInfo) -> None:
+        super().__init__()
+        self.info = info
+
+    def compose(self) -> ComposeResult:
+        yield Static()
+
+    def on_mount(self) -> None:
+        self.render_label()
+
+    def render_label(self) -> None:
+        mark = "x" if self.info.visible else " "
+        dot = f"[{self.info.color}]●[/]" if self.info.color else "●"
+        self.query_one(Static).update(f"[{mark}] {dot} {self.info.name}")
+
+
+class CalendarPicker(ModalScreen):
+    """Lists the calendars; selecting one toggles whether it is shown.
+
+    Calls `on_toggle(name, visible)` for each change and stays open until
+    dismissed, so several calendars can be toggled in a row.
+    """
+
+    BINDINGS = [
+        ("escape", "close", "Close"),
+        ("c", "close", "Close"),
+    ]
+
+    def __init__(self, calendars: list[CalendarInfo], on_toggle, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.calendars = calendars
+        self.on_toggle = on_toggle
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="calendar-picker-container"):
+            yield Static("  Calendars (enter to show/hide)", id="calendar-picker-title")
+            yield ListView(*(CalendarItem(info) for info in self.calendars), id="calendar-list")
+
+    def on_mount(self) -> None:
+        self.query_one("#calendar-list", ListView).focus()
+
+    def on_list_view_selected(self, message: ListView.Selected) -> None:
+        if isinstance(message.item, CalendarItem):
+            info = message.item.info
+            self.on_toggle(info.name, not info.visible)
+            message.item.render_label()
+
+    def action_close(self) -> None:
+        self.dismiss(None)
@@ -0,0 +1,104 @@
+"""Review screen for duplicate events found by `cal dedupe`."""
+
+from textual.app import App, ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Button, ListItem, ListView
+from textual.containers import Vertical, Horizontal
+
+from ..models import Event
+
+
+class DuplicateItem(ListItem):
+    """One event in a duplicate group, marked to keep or delete."""
+
+    def __init__(self, event: Event, delete: bool) -> None:
+        super().__init__()
+        self.event = event
+        self.delete = delete
+
+    def compose(self) -> ComposeResult:
+        yield Static()
+
+    def on_mount(self) -> None:
+        self.render_label()
+
+    def render_label(self) -> None:
+        mark = "delete" if self.delete else "keep  "
+        event = self.event
+        self.set_class(self.delete, "marked")
+        self.query_one(Static).update(
+            f"  [{mark}] {event.date.isoformat()}  {event.display_time:>11}  {event.title}  ({event.id[:8]})"
+        )
+
+
+class DedupeReview(ModalScreen):
+    """Lists duplicate groups and returns the ids chosen for deletion.
+
+    All but the first event of each group start out marked; selecting an
+    event toggles its mark.
+    """
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+        ("d", "confirm", "Delete marked"),
+    ]
+
+    def __init__(self, groups: list[list[Event]], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.groups = groups
+
+    def compose(self) -> ComposeResult:
+        items: list[ListItem] = []
+        for group in self.groups:
+            first = group[0]
+            items.append(ListItem(Static(f"{first.title} ({len(group)} copies)"), classes="dedupe-group", disabled=True))
+            items.extend(DuplicateItem(event, delete=i > 0) for i, event in enumerate(group))
+        with Vertical(id="dedupe-container"):
+            yield Static(id="dedupe-title")
+            yield ListView(*items, id="dedupe-list")
+            with Horizontal(id="form-buttons"):
+                yield Button("Delete marked (d)", variant="error", id="delete-btn")
+                yield Button("Cancel", variant="default", id="cancel-btn")
+
+    def on_mount(self) -> None:
+        self._update_title()
+        self.query_one("#dedupe-list", ListView).focus()
+
+    def _marked(self) -> list[str]:
+        return [item.event.id for item in self.query(DuplicateItem) if item.delete]
+
+    def _update_title(self) -> None:
+        self.query_one("#dedupe-title", Static).update(
+            f"  {len(self.groups)} duplicate group(s), {len(self._marked())} event(s) marked for deletion"
+        )
+
+    def on_list_view_selected(self, message: ListView.Selected) -> None:
+        if isinstance(message.item, DuplicateItem):
+            message.item.delete = not message.item.delete
+            message.item.render_label()
+            self._update_title()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "delete-btn":
+            self.action_confirm()
+        else:
+            self.action_cancel()
+
+    def action_confirm(self) -> None:
+        self.dismiss(self._marked())
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
+
+
+class DedupeApp(App):
+    """Standalone app showing DedupeReview; run() returns the chosen ids or None."""
+
+    CSS_PATH = "../styles.tcss"
+
+    def __init__(self, groups: list[list[Event]], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.groups = groups
+
+    def on_mount(self) -> None:
+        self.push_screen(DedupeReview(self.groups), self.exit)
@@ -1,14 +1,15 @@
 """Event form modal for adding/editing events."""
 
+from dataclasses import replace
 from datetime import date, time
 
 from textual.app import ComposeResult
 from textual.screen import ModalScreen
-from textual.widgets import Static, Input, Button, Label
+from textual.widgets import Static, Input, Button, Label, Select
 from textual.containers import Vertical, Horizontal
 from textual.message import Message
 
-from ..models import Event
+from ..models import Event, get_zone, normalize_tag
 
 
 class EventForm(ModalScreen):
@@ -35,12 +36,21 @@ class EventForm(ModalScreen):
         self,
         event: Event | None = None,
         default_date: date | None = None,
+        default_time: time | None = None,
+        default_end_time: time | None = None,
+        calendars: list[str] | None = None,
+        calendar: str | None = None,
         **kwargs,
     ) -> None:
         super().__init__(**kwargs)
         self.event = event
         self.is_new = event is None
         self.default_date = default_date or date.today()
+        self.default_time = default_time
+        self.default_end_time = default_end_time
+        self.calendars = calendars or []
+        # The calendar chosen on save (unchanged if there is only one)
+        self.calendar = calendar or (self.calendars[0] if self.calendars else None)
 
     def compose(self) -> ComposeResult:
         title = "Add Event" if self.is_new else "Edit Event"
@@ -67,12 +77,56 @@ class EventForm(ModalScreen):
             default_time = ""
             if self.event and self.event.time:
                 default_time = self.event.time.strftime("%H:%M")
+            elif not self.event and self.default_time:
+                default_time = self.default_time.strftime("%H:%M")
             yield Input(
                 value=default_time,
                 placeholder="14:00",
                 id="time-input",
             )
 
+            yield Label("End (YYYY-MM-DD HH:MM, optional):")
+            with Horizontal(id="end-inputs"):
+                default_end_date = ""
+                if self.event and self.event.end_date:
+                    default_end_date = self.event.end_date.isoformat()
+                yield Input(
+                    value=default_end_date,
+                    placeholder="same day",
+                    id="end-date-input",
+                )
+                default_end_time = ""
+                if self.event and self.event.end_time:
+                    default_end_time = self.event.end_time.strftime("%H:%M")
+                elif not self.event and self.default_end_time:
+                    default_end_time = self.default_end_time.strftime("%H:%M")
+                yield Input(
+                    value=default_end_time,
+                    placeholder="15:30",
+                    id="end-time-input",
+                )
+
+            yield Label("Timezone (e.g. Europe/Paris, optional):")
+            yield Input(
+                value=self.event.tz or "" if self.event else "",
+                placeholder="local time",
+                id="tz-input",
+            )
+
+            yield Label("Remind (minutes before, e.g. 10, 60):")
+            yield Input(
+                value=", ".join(str(m) for m in self.event.reminders) if self.event else "",
+                placeholder="none",
+                id="reminders-input",
+            )
+
+            yield Label("Tags (e.g. oncall travel):")
+            yield Input(
+                value=" ".join(self.event.tags) if self.event else "",
+                placeholder="none",
+                id="tags-input",
+            )
+
             yield Label("Description:")
             yield Input(
                 value=self.event.description if self.event else "",
@@ -80,6 +134,15 @@ class EventForm(ModalScreen):
                 id="desc-input",
             )
 
+            if len(self.calendars) > 1:
+                yield Label("Calendar:")
+                yield Select(
+                    [(name, name) for name in self.calendars],
+                    value=self.calendar,
+                    allow_blank=False,
+                    id="calendar-select",
+                )
+
             with Horizontal(id="form-buttons"):
                 yield Button("Save", variant="primary", id="save-btn")
                 yield Button("Cancel", variant="default", id="cancel-btn")
@@ -93,10 +156,25 @@ class EventForm(ModalScreen):
         elif event.button.id == "cancel-btn":
             self.action_cancel()
 
+    @staticmethod
+    def _parse_time(time_str: str) -> time:
+        """Parse HH:MM (or HHMM) into a time, raising ValueError if invalid."""
+        # Normalize to HH:MM format
+        if len(time_str) == 4 and ":" not in time_str:
+            time_str = f"{time_str[:2]}:{time_str[2:]}"
+        if len(time_str) == 5 and ":" in time_str:
+            time_str += ":00"  # Add seconds for fromisoformat
+        return time.fromisoformat(time_str)
+
     def _save(self) -> None:
         title = self.query_one("#title-input", Input).value.strip()
         date_str = self.query_one("#date-input", Input).value.strip()
         time_str = self.query_one("#time-input", Input).value.strip()
+        end_date_str = self.query_one("#end-date-input", Input).value.strip()
+        end_time_str = self.query_one("#end-time-input", Input).value.strip()
+        reminders_str = self.query_one("#reminders-input", Input).value
+        tags_str = self.query_one("#tags-input", Input).value
+        tz_str = self.query_one("#tz-input", Input).value.strip()
         desc = self.query_one("#desc-input", Input).value.strip()
 
         if not title:
@@ -105,37 +183,58 @@ class EventForm(ModalScreen):
 
         try:
             event_date = date.fromisoformat(date_str)
+            end_date = date.fromisoformat(end_date_str) if end_date_str else None
         except ValueError:
             self.notify("Invalid date format. Use YYYY-MM-DD", severity="error")
             return
 
-        event_time = None
-        if time_str:
-            # Normalize to HH:MM format
-            if len(time_str) == 4 and ":" not in time_str:
-                time_str = f"{time_str[:2]}:{time_str[2:]}"
-            if len(time_str) == 5 and ":" in time_str:
-                time_str += ":00"  # Add seconds for fromisoformat
-            try:
-                event_time = time.fromisoformat(time_str)
-            except ValueError:
-                self.notify("Invalid time format. Use HH:MM", severity="error")
-                return
-
-        if self.event:
-            self.event.title = title
-            self.event.date = event_date
-            self.event.time = event_time
-            self.event.description = desc
-            event = self.event
-        else:
-            event = Event(
-                title=title,
-                date=event_date,
-                time=event_time,
-                description=desc,
-            )
+        try:
+            event_time = self._parse_time(time_str) if time_str else None
+            end_time = self._parse_time(end_time_str) if end_time_str else None
+        except ValueError:
+            self.notify("Invalid time format. Use HH:MM", severity="error")
+            return
+
+        try:
+            reminders = [int(m) for m in reminders_str.replace(",", " ").split()]
+        except ValueError:
+            self.notify("Reminders are minutes, e.g. 10, 60", severity="error")
+            return
+
+        try:
+            tz = get_zone(tz_str).key if tz_str else None
+        except ValueError as e:
+            self.notify(str(e), severity="error")
+            return
+
+        try:
+            tags = [normalize_tag(t) for t in tags_str.replace(",", " ").split()]
+        except ValueError as e:
+            self.notify(str(e), severity="error")
+            return
+
+        fields = dict(
+            title=title,
+            date=event_date,
+            time=event_time,
+            end_date=end_date,
+            end_time=end_time,
+            reminders=reminders,
+            tags=tags,
+            tz=tz,
+            description=desc,
+        )
+        try:
+            if self.event:
+                event = replace(self.event, **fields)
+            else:
+                event = Event(**fields)
+        except ValueError as e:
+            self.notify(str(e), severity="error")
+            return
 
+        if len(self.calendars) > 1:
+            self.calendar = self.query_one("#calendar-select", Select).value
         self.dismiss(event)
 
     def action_cancel(self) -> None:
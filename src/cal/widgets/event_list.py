@@ -1,39 +1,51 @@
 """Event list widget for displaying events."""
 
 from textual.app import ComposeResult
+from textual.content import Content
 from textual.widget import Widget
-from textual.widgets import Static, ListItem, ListView
+from textual.widgets import OptionList
+from textual.widgets.option_list import Option
 from textual.message import Message
 
+from .. import perf
 from ..models import Event
 
 
-class EventItem(ListItem):
-    """A single event item in the list."""
-
-    def __init__(self, event: Event, show_date: bool = False, show_full: bool = False) -> None:
-        super().__init__()
-        self.event = event
-        self.show_date = show_date
-        self.show_full = show_full
-
-    def compose(self) -> ComposeResult:
-        time_str = self.event.display_time
-        if self.show_date:
-            date_str = self.event.date.strftime("%a %d %b")
-            yield Static(f"{date_str}  {time_str}  {self.event.title}", classes="event-title")
-        else:
-            yield Static(f"{time_str}  {self.event.title}", classes="event-title")
-
-        if self.event.description:
-            desc = self.event.description
-            if not self.show_full and len(desc) > 50:
-                desc = desc[:47] + "..."
-            yield Static(f"  {desc}", classes="event-desc")
+def event_prompt(
+    event: Event,
+    show_date: bool = False,
+    show_full: bool = False,
+    has_conflict: bool = False,
+    color: str | None = None,
+) -> Content:
+    """The lines shown for an event: its title line and description, if any."""
+    time_str = event.display_time
+    title = f"! {event.title}" if has_conflict else event.title
+    line = f"{time_str}  {title}"
+    if event.tags:
+        line += "  " + " ".join(f"#{tag}" for tag in event.tags)
+    if show_date:
+        line = f"{event.date.strftime('%a %d %b')}  {line}"
+    parts: list = []
+    if color:
+        # Calendar color marker
+        parts.append(("● ", color))
+    parts.append((line, "bold $warning" if has_conflict else "bold"))
+
+    if event.description:
+        desc = event.description
+        if not show_full and len(desc) > 50:
+            desc = desc[:47] + "..."
+        parts.append((f"\n  {desc}", "$text-muted"))
+    return Content.assemble(*parts)
 
 
 class EventList(Widget):
-    """Widget for displaying a list of events."""
+    """Widget for displaying a list of events.
+
+    Events are options of one OptionList, which renders only the lines in
+    view: a list widget per event made long agendas slow to open.
+    """
 
     class EventSelected(Message):
         """Message when an event is selected."""
@@ -45,39 +57,61 @@ class EventList(Widget):
     def __init__(self, events: list[Event] | None = None, show_date: bool = False, show_full: bool = False, **kwargs) -> None:
         super().__init__(**kwargs)
         self._events = events or []
+        self._conflicts: set[str] = set()
+        self._colors: dict[str, str] = {}
         self.show_date = show_date
         self.show_full = show_full
 
     def compose(self) -> ComposeResult:
-        yield ListView(id="event-listview")
+        yield OptionList(id="event-listview")
 
     def on_mount(self) -> None:
         self._rebuild_list()
 
+    @perf.timed("list.rebuild")
     def _rebuild_list(self) -> None:
-        listview = self.query_one("#event-listview", ListView)
-        listview.clear()
-
+        options = self.query_one("#event-listview", OptionList)
         if not self._events:
-            listview.mount(ListItem(Static("No events")))
+            options.set_options([Option("No events", disabled=True)])
             return
 
+        items: list = []
         for event in self._events:
-            listview.mount(EventItem(event, show_date=self.show_date, show_full=self.show_full))
-
-    def set_events(self, events: list[Event]) -> None:
-        """Update the displayed events."""
+            if items:
+                items.append(None)
+            items.append(Option(event_prompt(
+                event,
+                show_date=self.show_date,
+                show_full=self.show_full,
+                has_conflict=event.id in self._conflicts,
+                color=self._colors.get(event.id),
+            )))
+        options.set_options(items)
+
+    def set_events(
+        self,
+        events: list[Event],
+        conflicts: set[str] | None = None,
+        colors: dict[str, str] | None = None,
+    ) -> None:
+        """Update the displayed events, marking those in `conflicts`.
+
+        `colors` maps event ids to the color of their calendar.
+        """
         self._events = events
+        self._conflicts = conflicts or set()
+        self._colors = colors or {}
         self._rebuild_list()
 
-    def on_list_view_selected(self, message: ListView.Selected) -> None:
-        if isinstance(message.item, EventItem):
-            self.post_message(self.EventSelected(message.item.event))
+    def on_option_list_option_selected(self, message: OptionList.OptionSelected) -> None:
+        message.stop()
+        if self._events:
+            self.post_message(self.EventSelected(self._events[message.option_index]))
 
     @property
     def selected_event(self) -> Event | None:
         """Get the currently selected event."""
-        listview = self.query_one("#event-listview", ListView)
-        if listview.highlighted_child and isinstance(listview.highlighted_child, EventItem):
-            return listview.highlighted_child.event
-        return None
+        index = self.query_one("#event-listview", OptionList).highlighted
+        if index is None or not self._events:
+            return None
+        return self._events[index]
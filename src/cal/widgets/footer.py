@@ -0,0 +1,20 @@
+"""Key bindings footer."""
+
+from textual.widgets import Footer
+
+
+class AppFooter(Footer):
+    """Footer that lets go of the keys it replaces.
+
+    Footer recomposes its keys whenever the bindings change, on every screen
+    pushed or popped. Each key binds its `compact` to the footer's, and
+    Textual only drops the watchers of removed keys when that value is set,
+    which it never is here: every modal opened kept a footer's worth of
+    dead widgets alive.
+    """
+
+    async def recompose(self) -> None:
+        await super().recompose()
+        # Runs the watchers without changing the value, dropping those of
+        # the keys just removed
+        self.mutate_reactive(Footer.compact)
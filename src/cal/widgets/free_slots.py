@@ -0,0 +1,114 @@
+"""Modal for finding free time slots."""
+
+from datetime import date, datetime, time, timedelta
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Input, Button, Label, ListItem, ListView
+from textual.containers import Vertical, Horizontal
+
+from ..freeslots import FreeSlot, find_free_slots
+
+
+class SlotItem(ListItem):
+    """A single free slot in the results list."""
+
+    def __init__(self, slot: FreeSlot) -> None:
+        super().__init__()
+        self.slot = slot
+
+    def compose(self) -> ComposeResult:
+        slot = self.slot
+        hours, minutes = divmod(int(slot.duration.total_seconds() // 60), 60)
+        free = f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+        yield Static(
+            f"{slot.start.strftime('%a %d %b')}  "
+            f"{slot.start.strftime('%H:%M')}-{slot.end.strftime('%H:%M')}  ({free} free)"
+        )
+
+
+class FreeSlotPicker(ModalScreen):
+    """Finds free slots and returns the chosen one as (start, end)."""
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+    ]
+
+    def __init__(self, storage, holiday_provider=None, start_date: date | None = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.storage = storage
+        self.holiday_provider = holiday_provider
+        self.start_date = start_date or date.today()
+        self._duration = timedelta(minutes=60)
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="free-slot-container"):
+            yield Static("  Find Free Slot", id="free-slot-title")
+            with Horizontal(id="free-slot-inputs"):
+                with Vertical():
+                    yield Label("Minutes:")
+                    yield Input(value="60", id="duration-input")
+                with Vertical():
+                    yield Label("Hours:")
+                    yield Input(value="09:00-17:00", id="hours-input")
+                with Vertical():
+                    yield Label("From:")
+                    yield Input(value=self.start_date.isoformat(), id="from-input")
+                with Vertical():
+                    yield Label("Days:")
+                    yield Input(value="90", id="days-input")
+            yield ListView(id="free-slot-results")
+            with Horizontal(id="form-buttons"):
+                yield Button("Find", variant="primary", id="find-btn")
+                yield Button("Cancel", variant="default", id="cancel-btn")
+
+    def on_mount(self) -> None:
+        self.query_one("#duration-input", Input).focus()
+        self._search()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "find-btn":
+            self._search()
+        elif event.button.id == "cancel-btn":
+            self.action_cancel()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self._search()
+
+    def _search(self) -> None:
+        try:
+            duration = timedelta(minutes=int(self.query_one("#duration-input", Input).value))
+            start_str, end_str = self.query_one("#hours-input", Input).value.split("-")
+            work_start = time.fromisoformat(start_str.strip())
+            work_end = time.fromisoformat(end_str.strip())
+            start_date = date.fromisoformat(self.query_one("#from-input", Input).value.strip())
+            days = int(self.query_one("#days-input", Input).value)
+        except ValueError:
+            self.notify("Use minutes, HH:MM-HH:MM, YYYY-MM-DD and days", severity="error")
+            return
+
+        self._duration = duration
+        slots = find_free_slots(
+            self.storage,
+            duration,
+            start_date,
+            start_date + timedelta(days=days - 1),
+            work_start=work_start,
+            work_end=work_end,
+            holiday_provider=self.holiday_provider,
+            not_before=datetime.now(),
+        )
+        results = self.query_one("#free-slot-results", ListView)
+        results.clear()
+        if slots:
+            results.extend(SlotItem(slot) for slot in slots)
+        else:
+            results.append(ListItem(Static("No free slots")))
+
+    def on_list_view_selected(self, message: ListView.Selected) -> None:
+        if isinstance(message.item, SlotItem):
+            start = message.item.slot.start
+            self.dismiss((start, start + self._duration))
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
@@ -1,10 +1,12 @@
 """Widget to display historical 'On This Day' events."""
 
 from datetime import date
+from typing import TYPE_CHECKING
 
 from textual.widgets import Static
 
-from ..historical_events import HistoricalEventsProvider
+if TYPE_CHECKING:
+    from ..historical_events import HistoricalEventsProvider
 
 
 class HistoricalEventWidget(Static):
@@ -12,19 +14,26 @@ class HistoricalEventWidget(Static):
 
     def __init__(
         self,
-        provider: HistoricalEventsProvider | None = None,
+        provider: "HistoricalEventsProvider | None" = None,
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
-        self.provider = provider or HistoricalEventsProvider()
+        self.provider = provider
 
     def on_mount(self) -> None:
         """Start loading event in background."""
         self.update("📜 Loading historical event...")
-        self.run_worker(self._fetch_event, exclusive=True, thread=True)
+        # Start after the first frame so provider setup never delays it
+        self.call_after_refresh(
+            self.run_worker, self._fetch_event, exclusive=True, thread=True
+        )
 
     def _fetch_event(self) -> str:
         """Fetch event in background thread."""
+        if self.provider is None:
+            from ..historical_events import HistoricalEventsProvider
+
+            self.provider = HistoricalEventsProvider()
         return self.provider.get_event_for_display(date.today())
 
     def on_worker_state_changed(self, event) -> None:
@@ -0,0 +1,64 @@
+"""Debug overlay showing hot-path timing statistics."""
+
+from datetime import datetime
+
+from rich.table import Table
+from rich.text import Text
+from textual.widgets import Static
+
+from .. import perf
+
+
+class PerfOverlay(Static):
+    """Shows per-operation counts, p50/p99 and the slowest recent operations."""
+
+    def on_mount(self) -> None:
+        # Mounting the overlay turns recording on if it was off
+        perf.enable()
+        self._timer = self.set_interval(1, self.refresh_stats)
+        self.refresh_stats()
+
+    def toggle(self) -> None:
+        """Show or hide the overlay."""
+        self.display = not self.display
+        if self.display:
+            self.refresh_stats()
+            self._timer.resume()
+        else:
+            self._timer.pause()
+
+    def refresh_stats(self) -> None:
+        """Redraw the statistics table."""
+        rec = perf.recorder()
+        if rec is None:
+            self.update(Text("Instrumentation is off", style="dim"))
+            return
+
+        table = Table(title="Performance", expand=True, box=None, padding=(0, 1))
+        table.add_column("operation")
+        table.add_column("count", justify="right")
+        table.add_column("p50 ms", justify="right")
+        table.add_column("p99 ms", justify="right")
+        table.add_column("total ms", justify="right")
+        # Workers record while this formats: work on a copy
+        for name, stats in sorted(rec.snapshot().items()):
+            table.add_row(
+                name,
+                str(stats.count),
+                f"{stats.percentile(0.5):.2f}",
+                f"{stats.percentile(0.99):.2f}",
+                f"{stats.total_ms:.1f}",
+            )
+
+        slowest = Table(title="Slowest recent", expand=True, box=None, padding=(0, 1))
+        slowest.add_column("at")
+        slowest.add_column("operation")
+        slowest.add_column("ms", justify="right")
+        for name, duration_ms, timestamp in rec.slowest():
+            at = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+            slowest.add_row(at, name, f"{duration_ms:.2f}")
+
+        grid = Table.grid(expand=True)
+        grid.add_row(table)
+        grid.add_row(slowest)
+        self.update(grid)
@@ -0,0 +1,151 @@
+"""Settings screen for the holiday region."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Input, Label, Button, Checkbox, OptionList
+from textual.widgets.option_list import Option
+from textual.containers import Vertical, Horizontal
+
+from ..regions import RegionCatalog
+
+
+@dataclass(frozen=True)
+class HolidaySettings:
+    """The holiday settings chosen on the settings screen."""
+
+    country: str
+    subdivision: Optional[str]
+    show_holidays: bool
+
+
+class SettingsScreen(ModalScreen):
+    """Type-to-filter pickers for the holiday country and subdivision.
+
+    The highlighted entry of each list is the choice. Returns
+    HolidaySettings, or None if cancelled. The region catalog is loaded in
+    a worker, since the first load builds it from the holidays library.
+    """
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+        ("ctrl+s", "save", "Save"),
+    ]
+
+    def __init__(self, holiday_provider, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.holiday_provider = holiday_provider
+        config = holiday_provider.config
+        self.country = config.country
+        self.subdivision = config.subdivision
+        self.show_holidays = config.show_holidays
+        self._catalog: Optional[RegionCatalog] = None
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="settings-container"):
+            yield Static("  Settings", id="settings-title")
+            yield Static("  Loading regions...", id="settings-region")
+            yield Label("Holiday country (type to filter):")
+            yield Input(placeholder="name or code", id="country-filter")
+            yield OptionList(id="country-list")
+            yield Label("Subdivision:")
+            yield Input(placeholder="name or code", id="subdivision-filter")
+            yield OptionList(id="subdivision-list")
+            yield Checkbox("Show holidays", value=self.show_holidays, id="show-holidays")
+            with Horizontal(id="form-buttons"):
+                yield Button("Save (ctrl+s)", variant="primary", id="save-btn")
+                yield Button("Cancel", variant="default", id="cancel-btn")
+
+    def on_mount(self) -> None:
+        self.query_one("#country-filter", Input).focus()
+        self.run_worker(self._load_catalog, thread=True, exclusive=True, group="regions")
+
+    def _load_catalog(self) -> None:
+        catalog = self.holiday_provider.catalog
+        self.app.call_from_thread(self._catalog_ready, catalog)
+
+    def _catalog_ready(self, catalog: RegionCatalog) -> None:
+        self._catalog = catalog
+        self._fill_countries(self.query_one("#country-filter", Input).value)
+        self._fill_subdivisions(self.query_one("#subdivision-filter", Input).value)
+
+    def _fill(self, list_id: str, options: list[Option], current: str) -> None:
+        """Replace a list's options, highlighting `current` if it is among them."""
+        option_list = self.query_one(list_id, OptionList)
+        option_list.set_options(options)
+        if options:
+            ids = [option.id for option in options]
+            option_list.highlighted = ids.index(current) if current in ids else 0
+
+    def _fill_countries(self, query: str) -> None:
+        regions = self._catalog.search_countries(query)
+        self._fill(
+            "#country-list",
+            [Option(f"{r.name} ({r.code})", id=r.code) for r in regions],
+            self.country,
+        )
+
+    def _fill_subdivisions(self, query: str) -> None:
+        regions = self._catalog.search_subdivisions(self.country, query)
+        options = [Option(f"{r.name} ({r.code})", id=r.code) for r in regions]
+        if not query.strip():
+            options.insert(0, Option("(whole country)", id=""))
+        self._fill("#subdivision-list", options, self.subdivision or "")
+        self._update_region()
+
+    def _update_region(self) -> None:
+        catalog = self._catalog
+        name = catalog.country_name(self.country) or self.country
+        if self.subdivision:
+            name += f" / {catalog.subdivision_name(self.country, self.subdivision) or self.subdivision}"
+        self.query_one("#settings-region", Static).update(f"  {name}")
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if self._catalog is None:
+            return
+        if event.input.id == "country-filter":
+            self._fill_countries(event.value)
+        elif event.input.id == "subdivision-filter":
+            self._fill_subdivisions(event.value)
+
+    def on_option_list_option_highlighted(self, event: OptionList.OptionHighlighted) -> None:
+        if event.option_list.id == "country-list":
+            if event.option.id != self.country:
+                self.country = event.option.id
+                self.subdivision = None
+                self._fill_subdivisions(self.query_one("#subdivision-filter", Input).value)
+        else:
+            self.subdivision = event.option.id or None
+            self._update_region()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "country-filter":
+            self.query_one("#subdivision-filter", Input).focus()
+        else:
+            self.action_save()
+
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        if event.option_list.id == "country-list":
+            self.query_one("#subdivision-filter", Input).focus()
+        else:
+            self.action_save()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "save-btn":
+            self.action_save()
+        else:
+            self.action_cancel()
+
+    def action_save(self) -> None:
+        if self._catalog is None:
+            return
+        self.dismiss(HolidaySettings(
+            self.country,
+            self.subdivision,
+            self.query_one("#show-holidays", Checkbox).value,
+        ))
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
@@ -0,0 +1,43 @@
+"""Modal for entering a tag filter."""
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static, Input, Label
+from textual.containers import Vertical
+
+from ..tags import TagFilter
+
+
+class TagFilterPrompt(ModalScreen):
+    """Asks for a tag filter and returns it (empty to clear)."""
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+    ]
+
+    def __init__(self, current: TagFilter, known_tags: list[str], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.current = current
+        self.known_tags = known_tags
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="tag-filter-container"):
+            yield Static("  Filter by Tags", id="tag-filter-title")
+            yield Label("+tag required, tag any of, -tag excluded (empty to clear)")
+            yield Input(value=str(self.current), placeholder="+oncall travel -optional", id="tag-filter-input")
+            known = " ".join(self.known_tags) if self.known_tags else "no tags yet"
+            yield Static(known, id="tag-filter-known")
+
+    def on_mount(self) -> None:
+        self.query_one("#tag-filter-input", Input).focus()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        try:
+            tag_filter = TagFilter.parse(event.value)
+        except ValueError as e:
+            self.notify(str(e), severity="error")
+            return
+        self.dismiss(tag_filter)
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
@@ -0,0 +1,184 @@
+"""Hour-by-hour timeline of a single day."""
+
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.text import Text
+from textual.widgets import Static
+
+from .. import perf
+from ..models import Event
+from ..tags import TagFilter
+
+FIRST_HOUR = 8
+LAST_HOUR = 18
+LABEL_WIDTH = 8
+CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Where a timed event sits on the timeline."""
+
+    event: Event
+    first_row: int
+    last_row: int
+    column: int
+    columns: int
+
+
+@dataclass(frozen=True)
+class DayLayout:
+    """All-day events plus the timed events placed in hour rows and columns."""
+
+    all_day: list[Event]
+    placements: list[Placement]
+    first_hour: int
+    last_hour: int
+
+
+def _rows(event: Event, day: date) -> tuple[int, int]:
+    """Hour rows [first, last) an event covers on a day."""
+    day_start = datetime.combine(day, time())
+    start = max(event.start_datetime, day_start)
+    end = min(event.end_datetime, day_start + timedelta(days=1))
+    first = int((start - day_start).total_seconds() // 3600)
+    last = -int(-(end - day_start).total_seconds() // 3600)
+    return first, max(last, first + 1)
+
+
+def layout_day(events: list[Event], day: date) -> DayLayout:
+    """Assign timed events to columns with interval partitioning.
+
+    Events are swept by first row, with a heap of the rows where each used
+    column frees up and a heap of free column numbers. Each event takes the
+    lowest free column. Events that overlap, directly or through a chain,
+    form a cluster and share its column count. O(n log n) per day.
+    """
+    all_day = [e for e in events if e.time is None]
+    spans = sorted(
+        ((_rows(e, day), e) for e in events if e.time is not None),
+        key=lambda span: (span[0], span[1].sort_key),
+    )
+
+    placed: list[tuple[Event, int, int, int]] = []
+    busy: list[tuple[int, int]] = []  # (last row, column)
+    free: list[int] = []
+    cluster_start = 0
+    width = 0
+    widths: list[int] = []
+
+    def close_cluster() -> None:
+        widths.extend([width] * (len(placed) - cluster_start))
+
+    for (first, last), event in spans:
+        while busy and busy[0][0] <= first:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if not busy:
+            # Nothing still open: the previous cluster is complete
+            close_cluster()
+            cluster_start, width, free = len(placed), 0, []
+        column = heapq.heappop(free) if free else width
+        width = max(width, column + 1)
+        heapq.heappush(busy, (last, column))
+        placed.append((event, first, last, column))
+    close_cluster()
+
+    placements = [
+        Placement(event, first, last, column, columns)
+        for (event, first, last, column), columns in zip(placed, widths)
+    ]
+    first_hour = min([FIRST_HOUR] + [p.first_row for p in placements])
+    last_hour = max([LAST_HOUR] + [p.last_row for p in placements])
+    return DayLayout(all_day, placements, first_hour, last_hour)
+
+
+class TimelineRenderable:
+    """Renders a DayLayout as hour rows, sized to the available width."""
+
+    def __init__(
+        self, layout: DayLayout, conflicts: set[str], colors: dict[str, str] | None = None
+    ) -> None:
+        self.layout = layout
+        self.conflicts = conflicts
+        self.colors = colors or {}
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        layout = self.layout
+        width = max(options.max_width - LABEL_WIDTH, 10)
+
+        if layout.all_day:
+            line = Text("All day".ljust(LABEL_WIDTH), style="dim")
+            line.append(", ".join(e.title for e in layout.all_day), style="bold")
+            yield line
+
+        by_row: dict[int, list[Placement]] = {}
+        for placement in layout.placements:
+            for row in range(placement.first_row, placement.last_row):
+                by_row.setdefault(row, []).append(placement)
+
+        for hour in range(layout.first_hour, layout.last_hour):
+            line = Text(f"{hour:02d}:00".ljust(LABEL_WIDTH), style="dim")
+            cursor = 0
+            for placement in sorted(by_row.get(hour, ()), key=lambda p: p.column):
+                col_width = width // placement.columns
+                start = placement.column * col_width
+                if start > cursor:
+                    line.append(" " * (start - cursor))
+                conflict = placement.event.id in self.conflicts
+                color = self.colors.get(placement.event.id, "")
+                if hour == placement.first_row:
+                    label = f"{'! ' if conflict else ''}{placement.event.display_time} {placement.event.title}"
+                    style = "bold yellow" if conflict else f"bold {color}".strip()
+                else:
+                    label = "│"
+                    style = "yellow" if conflict else (color or "dim")
+                cell = label[: col_width - 1].ljust(col_width - 1) + " "
+                line.append(cell, style=style)
+                cursor = start + col_width
+            yield line
+
+
+class DayTimeline(Static):
+    """Timeline of one day as a single renderable.
+
+    Layouts are cached per date and reused until the storage's version for
+    that date changes, so paging back to a day does not lay it out again.
+    """
+
+    def __init__(self, storage=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.storage = storage
+        self._cache: dict[date, tuple[tuple, DayLayout]] = {}
+
+    def _layout(self, day: date, tag_filter: TagFilter) -> DayLayout:
+        # A date's tag matches can only change along with its version
+        key = (self.storage.date_version(day), tag_filter)
+        cached = self._cache.get(day)
+        if cached and cached[0] == key:
+            return cached[1]
+        with perf.span("timeline.layout"):
+            events = self.storage.get_by_date(day)
+            if tag_filter:
+                events = tag_filter.select(self.storage).filter(events)
+            layout = layout_day(events, day)
+        self._cache.pop(day, None)
+        self._cache[day] = (key, layout)
+        if len(self._cache) > CACHE_SIZE:
+            # Drop the least recently stored date
+            del self._cache[next(iter(self._cache))]
+        return layout
+
+    def show_date(self, day: date, tag_filter: TagFilter | None = None) -> None:
+        """Render the timeline for a date, with only events matching a tag filter."""
+        if tag_filter is None:
+            tag_filter = TagFilter()
+        if self.storage is None:
+            self.update("")
+            return
+        layout = self._layout(day, tag_filter)
+        conflicts = self.storage.conflicting_ids(day) if layout.placements else set()
+        colors = self.storage.event_colors([p.event for p in layout.placements])
+        self.update(TimelineRenderable(layout, conflicts, colors))